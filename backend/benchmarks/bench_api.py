@@ -0,0 +1,198 @@
+"""
+Drive the FastAPI app in process against a database from
+benchmarks.synthetic_data, at a fixed concurrency, and report latency
+percentiles and throughput per endpoint as JSON. Requests go through httpx's
+ASGI transport, so the numbers cover routing, handlers, the pool and Postgres
+but not the network or uvicorn.
+
+    uv run python -m benchmarks.bench_api --concurrency 32 --requests 20000 --out after.json
+    uv run python -m benchmarks.bench_api --compare before.json after.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import UTC, datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+from psycopg.rows import dict_row
+
+from .synthetic_data import DEFAULT_NAME, bench_dsn
+
+QUERIES = ["ので", "のに", "because", "ながら", "kara", "must", "そう", "ことがある"]
+
+# method, path, query params, json body
+Call = Tuple[str, str, Dict[str, Any], Optional[Dict[str, Any]]]
+# name, share of traffic, and a builder taking the rng, user ids and grammar ids
+SCENARIOS: List[Tuple[str, float, Callable[[random.Random, List[int], List[int]], Call]]] = [
+    ("grammar_list", 0.10, lambda rng, users, grammar: ("GET", "/api/grammar", {}, None)),
+    ("grammar_page", 0.10, lambda rng, users, grammar: ("GET", "/api/grammar", {"page_size": 50}, None)),
+    ("grammar_random", 0.10, lambda rng, users, grammar: ("GET", "/api/grammar", {"limit": "true"}, None)),
+    (
+        "grammar_search",
+        0.10,
+        lambda rng, users, grammar: ("GET", "/api/grammar/search", {"q": rng.choice(QUERIES)}, None),
+    ),
+    ("journal_page", 0.15, lambda rng, users, grammar: ("GET", "/api/journal", {"limit": 50}, None)),
+    (
+        "srs_daily",
+        0.30,
+        lambda rng, users, grammar: ("GET", "/api/srs/daily", {"user_id": rng.choice(users)}, None),
+    ),
+    (
+        "srs_review",
+        0.15,
+        lambda rng, users, grammar: (
+            "POST",
+            "/api/srs/review",
+            {},
+            {"user_id": rng.choice(users), "grammar_id": rng.choice(grammar), "quality": rng.randint(0, 5)},
+        ),
+    ),
+]
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    # nearest rank, on an already sorted list
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+        **{f"p{q}_ms": round(percentile(ordered, q), 3) for q in (50, 95, 99)},
+        "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+    }
+
+
+def git_revision() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(concurrency: int, total: int, warmup: int, seed: int) -> Dict[str, Any]:
+    # the app reads DATABASE_URL at import, so import it only once that points at the bench db
+    from fushigi_backend.main import app
+
+    rng = random.Random(seed)
+    names = [name for name, _, _ in SCENARIOS]
+    builders = {name: build for name, _, build in SCENARIOS}
+    weights = [share for _, share, _ in SCENARIOS]
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+
+    async with app.router.lifespan_context(app):
+        from fushigi_backend.db.connect import get_pool
+
+        async with get_pool().connection() as conn, conn.cursor(row_factory=dict_row) as cur:
+            await cur.execute("SELECT id FROM users")
+            users = [row["id"] for row in await cur.fetchall()]
+            await cur.execute("SELECT id FROM grammar")
+            grammar = [row["id"] for row in await cur.fetchall()]
+
+        def plan(n: int) -> Iterator[Tuple[str, Call]]:
+            return iter([(name, builders[name](rng, users, grammar)) for name in rng.choices(names, weights, k=n)])
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+            async def worker(calls: Iterator[Tuple[str, Call]], record: bool) -> None:
+                # workers share one iterator, so each call is sent exactly once
+                for name, (method, path, params, body) in calls:
+                    start = time.perf_counter()
+                    response = await client.request(method, path, params=params, json=body)
+                    await response.aread()
+                    if record:
+                        latencies[name].append((time.perf_counter() - start) * 1000)
+                        errors[name] += response.status_code >= 400
+
+            warmup_calls = plan(warmup)
+            await asyncio.gather(*(worker(warmup_calls, False) for _ in range(concurrency)))
+            calls = plan(total)
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(calls, True) for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+
+    return {
+        "meta": {
+            "started_at": datetime.now(UTC).isoformat(),
+            "git_revision": git_revision(),
+            "python": sys.version.split()[0],
+            "concurrency": concurrency,
+            "requests": total,
+            "warmup": warmup,
+            "seed": seed,
+            "users": len(users),
+        },
+        "overall": summarize([x for xs in latencies.values() for x in xs], sum(errors.values()), elapsed),
+        "endpoints": {name: summarize(latencies[name], errors[name], elapsed) for name in names},
+    }
+
+
+def compare(before_path: str, after_path: str) -> None:
+    with open(before_path, encoding="utf-8") as f:
+        before = json.load(f)
+    with open(after_path, encoding="utf-8") as f:
+        after = json.load(f)
+
+    def change(old: float, new: float) -> str:
+        return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+    print(f"{before['meta']['git_revision']} -> {after['meta']['git_revision']}")
+    print(f"{'endpoint':<16} {'metric':>8} {'before':>10} {'after':>10} {'change':>9}")
+    rows = [("overall", before["overall"], after["overall"])]
+    rows += [(name, stats, after["endpoints"][name]) for name, stats in before["endpoints"].items()
+             if name in after["endpoints"]]
+    for name, old, new in rows:
+        for metric in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            print(f"{name:<16} {metric:>8} {old[metric]:>10} {new[metric]:>10} {change(old[metric], new[metric]):>9}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--name", default=DEFAULT_NAME, help="database created by benchmarks.synthetic_data")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight at once")
+    parser.add_argument("--requests", type=int, default=5_000, help="measured requests")
+    parser.add_argument("--warmup", type=int, default=200, help="unmeasured requests sent first")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="diff two saved reports and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    os.environ["DATABASE_URL"] = bench_dsn(args.name)
+    report = asyncio.run(run(args.concurrency, args.requests, args.warmup, args.seed))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    overall = report["overall"]
+    print(
+        f"{overall['requests']:,} requests at concurrency {args.concurrency}: {overall['rps']} req/s, "
+        f"p50 {overall['p50_ms']}ms, p95 {overall['p95_ms']}ms, p99 {overall['p99_ms']}ms, "
+        f"{overall['errors']} errors"
+    )
+
+
+if __name__ == "__main__":
+    main()
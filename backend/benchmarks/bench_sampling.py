@@ -0,0 +1,113 @@
+"""
+Compare in-memory grammar sampling against an ORDER BY RANDOM() style full sort
+as the catalog grows, and time the whole `GET /api/grammar?limit=true` handler
+with and without a tag filter.
+
+    uv run python -m benchmarks.bench_sampling
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from functools import partial
+from typing import Any, Callable, List, Sequence
+
+from starlette.requests import Request
+
+from fushigi_backend.catalog.cache import CatalogSnapshot, catalog
+from fushigi_backend.data.models import EnhancedNote, GrammarInDB
+from fushigi_backend.routes.grammar import list_grammar
+
+SIZES = [400, 1_000, 10_000, 100_000]
+TAGS = [f"tag-{i}" for i in range(60)]
+LEVELS = ["N5", "N4", "N3", "N2", "N1"]
+NOTE = EnhancedNote(nuance="", usage_tips="", common_mistakes="", situation="")
+
+
+def synthetic_entries(n: int, seed: int = 0) -> List[GrammarInDB]:
+    rng = random.Random(seed)
+    return [
+        GrammarInDB(
+            id=i,
+            usage=f"〜{i}",
+            meaning=f"meaning {i}",
+            level=rng.choice(LEVELS),
+            tags=rng.sample(TAGS, 3),
+            notes="",
+            examples=[],
+            enhanced_notes=NOTE,
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+def random_sort(ids: Sequence[int], k: int) -> List[int]:
+    return sorted(ids, key=lambda _: random.random())[:k]
+
+
+def time_per_call(fn: Callable[[], object], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+async def time_route(repeat: int, tags: Callable[[int], Any]) -> float:
+    """
+    Mean microseconds per `limit=true` call of the list handler, the way the
+    router calls it, with `tags(i)` as the tag filter of the i-th call.
+    """
+    request = Request({"type": "http", "method": "GET", "path": "/api/grammar", "headers": [], "query_string": b""})
+    start = time.perf_counter()
+    for i in range(repeat):
+        await list_grammar(
+            request,
+            limit=True,
+            seed=None,
+            tags=tags(i),
+            level=None,
+            match="all",
+            after=None,
+            page_size=None,
+            ids=None,
+            fields=None,
+        )
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", type=int, default=5, help="grammar points per draw")
+    parser.add_argument("--repeat", type=int, default=2_000, help="draws timed per measurement")
+    args = parser.parse_args()
+
+    print(
+        f"{'rows':>8} {'sample us':>10} {'excl us':>10} {'sort us':>12}"
+        f" {'route us':>10} {'tag us':>10} {'tag 1st us':>11}"
+    )
+    for n in SIZES:
+        snapshot = CatalogSnapshot(1, synthetic_entries(n))
+        catalog.snapshot = snapshot
+        catalog._checked_at = time.monotonic()
+        sampler = snapshot.sampler
+        exclude = set(range(1, n // 10))  # a user who has learnt 10% of the catalog
+
+        sample_us = time_per_call(partial(sampler.sample, args.k), args.repeat)
+        excl_us = time_per_call(partial(sampler.sample, args.k, exclude=exclude), args.repeat)
+        # what ORDER BY RANDOM() LIMIT k does: key every row, sort, keep k
+        sort_repeat = max(1, args.repeat // (n // 400))
+        sort_us = time_per_call(partial(random_sort, sampler.ids, args.k), sort_repeat)
+        # the first draw from a filter decodes its bitset, O(n); later ones reuse the ids
+        first_us = asyncio.run(time_route(len(TAGS), TAGS.__getitem__))
+        route_us = asyncio.run(time_route(args.repeat, lambda _: None))
+        tag_us = asyncio.run(time_route(args.repeat, lambda _: "tag-7"))
+        print(
+            f"{n:>8} {sample_us:>10.2f} {excl_us:>10.2f} {sort_us:>12.2f}"
+            f" {route_us:>10.2f} {tag_us:>10.2f} {first_us:>11.2f}"
+        )
+    catalog.snapshot = None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Time grammar search the way search-as-you-type calls it: every prefix of each
+query, one keystroke at a time, on the shipped catalog and on copies of it
+scaled up, plus how long building the index takes.
+
+    uv run python -m benchmarks.bench_search
+"""
+
+import argparse
+import time
+from typing import List
+
+from fushigi_backend.catalog.search import GrammarSearchIndex
+from fushigi_backend.data.load import load_defaults
+from fushigi_backend.data.models import GrammarInDB
+
+SCALES = [1, 10]
+QUERIES = [
+    "because",
+    "becuase",
+    "no",
+    "it is said that",
+    "kamoshiremasen",
+    "ので",
+    "かもしれない",
+    "te mo ii",
+    "to itte",
+    "giving advice",
+]
+
+
+def scaled_entries(scale: int) -> List[GrammarInDB]:
+    catalog = list(load_defaults())
+    return [
+        GrammarInDB(id=copy * len(catalog) + i, **g.model_dump())
+        for copy in range(scale)
+        for i, g in enumerate(catalog, start=1)
+    ]
+
+
+def time_query(index: GrammarSearchIndex, query: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        index.search(query)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="searches timed per query")
+    args = parser.parse_args()
+
+    for scale in SCALES:
+        entries = scaled_entries(scale)
+        start = time.perf_counter()
+        index = GrammarSearchIndex(entries)
+        build_ms = (time.perf_counter() - start) * 1e3
+        print(f"{len(entries)} grammar points, index built in {build_ms:.0f} ms")
+        print(f"{'query':>18} {'full us':>10} {'typing mean us':>15} {'typing max us':>14}")
+        for query in QUERIES:
+            full_us = time_query(index, query, args.repeat)
+            typing = [time_query(index, query[:end], args.repeat) for end in range(1, len(query) + 1)]
+            print(f"{query:>18} {full_us:>10.1f} {sum(typing) / len(typing):>15.1f} {max(typing):>14.1f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
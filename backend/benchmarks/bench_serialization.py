@@ -0,0 +1,104 @@
+"""
+Compare response encoding per endpoint: the old path (model_validate per row,
+then FastAPI's response_model validating and serializing the list again) against
+the single-pass TypeAdapter encoder, trusted rows through orjson, and the
+pre-encoded grammar catalog.
+
+    uv run python -m benchmarks.bench_serialization
+"""
+
+import argparse
+import json
+import time
+from datetime import UTC, date, datetime, timedelta
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+import orjson
+from pydantic import BaseModel, TypeAdapter
+
+from fushigi_backend.catalog.cache import CatalogSnapshot
+from fushigi_backend.data.load import load_defaults
+from fushigi_backend.data.models import GrammarInDB, JournalEntryInDB, SRSSchedule
+from fushigi_backend.routes.encoding import ORJSON_OPTIONS
+
+
+def grammar_rows() -> List[Dict[str, Any]]:
+    return [{"id": i, **g.model_dump()} for i, g in enumerate(load_defaults(), start=1)]
+
+
+def journal_rows(n: int) -> List[Dict[str, Any]]:
+    start = datetime(2025, 8, 1, tzinfo=UTC)
+    return [
+        {
+            "id": i,
+            "user_id": 1,
+            "title": f"Entry {i}",
+            "content": "今日は雨なので、家で本を読みました。明日は晴れるといいな。" * 4,
+            "created_at": start + timedelta(minutes=i),
+            "private": i % 3 == 0,
+        }
+        for i in range(n)
+    ]
+
+
+def schedule_rows(n: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "user_id": 1,
+            "grammar_id": i,
+            "ease_factor": 2.36,
+            "interval_days": 6,
+            "repetition": 2,
+            "due_date": date(2025, 8, 7),
+        }
+        for i in range(n)
+    ]
+
+
+def old_path(model: Type[BaseModel], rows: List[Dict[str, Any]]) -> bytes:
+    adapter = TypeAdapter(List[model])  # type: ignore[valid-type]
+    # the handler builds a model per row...
+    models = [model.model_validate(row) for row in rows]
+    # ...then response_model validates the list again and JSONResponse encodes it
+    content = adapter.dump_python(adapter.validate_python(models), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def adapter_path(adapter: TypeAdapter, rows: List[Dict[str, Any]]) -> bytes:
+    return adapter.dump_json(adapter.validate_python(rows))
+
+
+def time_per_call(fn: Callable[[], bytes], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100, help="rows per journal/srs response")
+    parser.add_argument("--repeat", type=int, default=200, help="encodes timed per measurement")
+    args = parser.parse_args()
+
+    grammar = grammar_rows()
+    snapshot = CatalogSnapshot(1, TypeAdapter(List[GrammarInDB]).validate_python(grammar))
+    endpoints: List[Tuple[str, Type[BaseModel], List[Dict[str, Any]], Optional[Callable[[], bytes]]]] = [
+        ("GET /api/grammar", GrammarInDB, grammar, lambda: snapshot.encode(snapshot.entries)),
+        ("GET /api/journal", JournalEntryInDB, journal_rows(args.rows), None),
+        ("POST /api/srs/review/batch", SRSSchedule, schedule_rows(args.rows), None),
+    ]
+
+    print(f"{'endpoint':<28} {'rows':>6} {'old us':>10} {'adapter us':>11} {'orjson us':>10} {'cached us':>10}")
+    for name, model, rows, cached in endpoints:
+        adapter = TypeAdapter(List[model])  # type: ignore[valid-type]
+        old_us = time_per_call(partial(old_path, model, rows), args.repeat)
+        adapter_us = time_per_call(partial(adapter_path, adapter, rows), args.repeat)
+        orjson_us = time_per_call(partial(orjson.dumps, rows, option=ORJSON_OPTIONS), args.repeat)
+        cached_us = "-" if cached is None else f"{time_per_call(cached, args.repeat):.1f}"
+        print(f"{name:<28} {len(rows):>6} {old_us:>10.1f} {adapter_us:>11.1f} {orjson_us:>10.1f} {cached_us:>10}")
+
+
+if __name__ == "__main__":
+    main()
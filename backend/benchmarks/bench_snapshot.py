@@ -0,0 +1,75 @@
+"""
+Compare catalog startup from grammar.json against the compiled snapshot, at
+the shipped catalog size and scaled up. Every measurement runs in a fresh
+interpreter so memory is not polluted by earlier runs (Linux only, it reads
+/proc/self/status).
+
+    uv run python -m benchmarks.bench_snapshot
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+from fushigi_backend.data.snapshot import DEFAULT_SOURCE, build_snapshot
+
+# load the catalog, touch `touch` entries (-1 for all), report seconds and resident
+# memory held afterwards (VmRSS, since ru_maxrss survives exec from the parent)
+PROBE = """
+import json, re, sys, time
+from fushigi_backend.data.load import load_defaults
+def rss():
+    with open("/proc/self/status") as f:
+        return int(re.search(r"VmRSS:\\s+(\\d+)", f.read()).group(1))
+before = rss()
+start = time.perf_counter()
+entries = load_defaults(sys.argv[1], use_snapshot=sys.argv[2] == "snapshot")
+loaded = time.perf_counter() - start
+touch = int(sys.argv[3])
+for g in entries if touch < 0 else (entries[i] for i in range(min(touch, len(entries)))):
+    g.usage
+total = time.perf_counter() - start
+after = rss()
+print(json.dumps({"load_ms": loaded * 1000, "total_ms": total * 1000, "rss_kb": after - before}))
+"""
+
+
+def scaled_catalog(directory: Path, scale: int) -> Path:
+    grammar = json.loads(DEFAULT_SOURCE.read_text(encoding="utf-8"))["grammar"]
+    path = directory / f"grammar_x{scale}.json"
+    path.write_text(json.dumps({"grammar": grammar * scale}, ensure_ascii=False, indent=2), encoding="utf-8")
+    build_snapshot(path)
+    return path
+
+
+def probe(path: Path, mode: str, touch: int) -> Dict[str, float]:
+    out = subprocess.run([sys.executable, "-c", PROBE, str(path), mode, str(touch)], capture_output=True, check=True)
+    return json.loads(out.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 100], help="catalog size multipliers")
+    parser.add_argument("--touch", type=int, default=10, help="entries read after a lazy load")
+    args = parser.parse_args()
+
+    print(f"{'scale':>6} {'source':<16} {'load ms':>10} {'total ms':>10} {'rss MiB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scales:
+            path = scaled_catalog(Path(tmp), scale)
+            runs: List[tuple] = [
+                ("json", "json", -1),
+                (f"snapshot, {args.touch}", "snapshot", args.touch),
+                ("snapshot, all", "snapshot", -1),
+            ]
+            for label, mode, touch in runs:
+                r = probe(path, mode, touch)
+                print(f"{scale:>6} {label:<16} {r['load_ms']:>10.1f} {r['total_ms']:>10.1f} {r['rss_kb'] / 1024:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Time sentence segmentation plus grammar tagging of synthetic journal entries
+against the full default catalog, next to a naive substring scan per pattern.
+
+    uv run python -m benchmarks.bench_tagging --entries 10000
+"""
+
+import argparse
+import random
+import time
+from typing import List, Tuple
+
+from fushigi_backend.catalog.matcher import GrammarMatcher, expand_usage, segment_sentences
+from fushigi_backend.data.load import load_defaults
+from fushigi_backend.data.models import GrammarInDB
+
+
+def synthetic_entries(catalog: List[GrammarInDB], n: int, seed: int = 0) -> List[str]:
+    # journal entries stitched together from the catalog's own example sentences
+    rng = random.Random(seed)
+    sentences = [e.japanese for g in catalog for e in g.examples if e.japanese]
+    return ["\n".join(rng.choices(sentences, k=rng.randint(3, 12))) for _ in range(n)]
+
+
+def naive_match(patterns: List[Tuple[int, Tuple[str, ...]]], sentence: str) -> List[int]:
+    matched = []
+    for grammar_id, fragments in patterns:
+        position = 0
+        for fragment in fragments:
+            position = sentence.find(fragment, position)
+            if position < 0:
+                break
+            position += len(fragment)
+        else:
+            matched.append(grammar_id)
+    return matched
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=10_000)
+    args = parser.parse_args()
+
+    catalog = [GrammarInDB(id=i, **g.model_dump()) for i, g in enumerate(load_defaults(), start=1)]
+
+    start = time.perf_counter()
+    matcher = GrammarMatcher.from_entries(catalog)
+    compile_ms = (time.perf_counter() - start) * 1000
+    patterns = [(g.id, fragments) for g in catalog for fragments in expand_usage(g.usage)]
+    entries = synthetic_entries(catalog, args.entries)
+
+    start = time.perf_counter()
+    sentences = [s for content in entries for s in segment_sentences(content)]
+    segment_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tags = sum(len(matcher.match(s)) for s in sentences)
+    automaton_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    naive_tags = sum(len(set(naive_match(patterns, s))) for s in sentences)
+    naive_s = time.perf_counter() - start
+
+    print(f"catalog: {len(catalog)} grammar points, {len(patterns)} patterns, compiled in {compile_ms:.1f} ms")
+    print(f"input: {len(entries):,} entries, {len(sentences):,} sentences (segmented in {segment_s:.2f}s)")
+    print(f"automaton: {automaton_s:.2f}s, {len(sentences) / automaton_s:,.0f} sentences/s, {tags:,} tags")
+    print(f"naive scan: {naive_s:.2f}s, {len(sentences) / naive_s:,.0f} sentences/s, {naive_tags:,} tags")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Create a throwaway Postgres database filled with synthetic users, journal
+entries and srs cards for the share of the catalog each user has started, for
+the API load benchmark. The server in DATABASE_URL only hosts it; nothing in that
+database is touched.
+
+    uv run python -m benchmarks.synthetic_data --users 1000 --entries 50
+    uv run python -m benchmarks.synthetic_data --drop
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from typing import Any, List, Tuple
+
+from psycopg import AsyncConnection, sql
+from psycopg.conninfo import make_conninfo
+
+from fushigi_backend.data.load import load_defaults
+from fushigi_backend.db.generate import generate_db
+
+SQL_DIR = Path(__file__).resolve().parent.parent / "sql"
+DEFAULT_NAME = "fushigi_bench"
+
+
+def bench_dsn(name: str = DEFAULT_NAME) -> str:
+    """
+    DATABASE_URL pointed at the benchmark database instead.
+    """
+    return make_conninfo(os.environ["DATABASE_URL"], dbname=name)
+
+
+async def recreate_database(name: str, drop_only: bool = False) -> None:
+    async with await AsyncConnection.connect(os.environ["DATABASE_URL"], autocommit=True) as admin:
+        await admin.execute(sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(sql.Identifier(name)))
+        if not drop_only:
+            await admin.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(name)))
+
+
+async def apply_migrations(conn: AsyncConnection) -> None:
+    # same files, same order as docker-entrypoint-initdb.d
+    for path in sorted(SQL_DIR.glob("*.sql")):
+        await conn.execute(path.read_text(encoding="utf-8").encode())
+
+
+async def load_users(conn: AsyncConnection, n: int) -> List[int]:
+    async with conn.cursor() as cur:
+        async with cur.copy("COPY users (username, password_hash) FROM STDIN") as copy:
+            for i in range(n):
+                await copy.write_row((f"bench-{i}", "x"))
+        await cur.execute("SELECT id FROM users ORDER BY id")
+        return [row[0] for row in await cur.fetchall()]
+
+
+async def load_journal(conn: AsyncConnection, user_ids: List[int], per_user: int, rng: random.Random) -> int:
+    # entries stitched together from the catalog's example sentences, as in bench_tagging
+    sentences = [e.japanese for g in load_defaults() for e in g.examples if e.japanese]
+    now = datetime.now(UTC)
+    rows = 0
+    async with conn.cursor() as cur, cur.copy(
+        "COPY journal_entry (user_id, title, content, created_at, private) FROM STDIN"
+    ) as copy:
+        for user_id in user_ids:
+            for i in range(per_user):
+                content = "\n".join(rng.choices(sentences, k=rng.randint(3, 12)))
+                created_at = now - timedelta(minutes=rng.randrange(365 * 24 * 60))
+                await copy.write_row((user_id, f"Entry {i}", content, created_at, rng.random() < 0.3))
+                rows += 1
+    return rows
+
+
+async def load_srs(conn: AsyncConnection, user_ids: List[int], learnt_share: float, rng: random.Random) -> int:
+    """
+    srs rows for about `learnt_share` of each user's grammar points, reviewed
+    before with due dates spread around today. The rest have no row, i.e. are
+    new, as in the app.
+    """
+    today = date.today()
+    rows = 0
+    async with conn.cursor() as cur:
+        await cur.execute("SELECT id FROM grammar ORDER BY id")
+        grammar_ids = [row[0] for row in await cur.fetchall()]
+        async with cur.copy(
+            "COPY srs (user_id, grammar_id, ease_factor, interval_days, repetition, due_date, last_reviewed)"
+            " FROM STDIN"
+        ) as copy:
+            for user_id in user_ids:
+                for grammar_id in grammar_ids:
+                    if rng.random() >= learnt_share:
+                        continue
+                    repetition = rng.randint(1, 6)
+                    interval = rng.choice([1, 6, 15, 38, 90, 200][:repetition])
+                    due = today + timedelta(days=rng.randint(-10, interval))
+                    row: Tuple[Any, ...] = (
+                        user_id, grammar_id, round(rng.uniform(1.3, 2.8), 2), interval, repetition, due, today
+                    )
+                    await copy.write_row(row)
+                    rows += 1
+    return rows
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--name", default=DEFAULT_NAME, help="database to (re)create")
+    parser.add_argument("--users", type=int, default=100, help="synthetic users on top of the seeded tester")
+    parser.add_argument("--entries", type=int, default=50, help="journal entries per user")
+    parser.add_argument("--learnt-share", type=float, default=0.3, help="share of the catalog each user has started")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--drop", action="store_true", help="drop the database and exit")
+    args = parser.parse_args()
+
+    await recreate_database(args.name, drop_only=args.drop)
+    if args.drop:
+        print(f"Dropped {args.name}")
+        return
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    async with await AsyncConnection.connect(bench_dsn(args.name), autocommit=True) as conn:
+        await apply_migrations(conn)
+        await generate_db(conn, load_defaults())
+        user_ids = await load_users(conn, args.users)
+        entries = await load_journal(conn, user_ids, args.entries, rng)
+        cards = await load_srs(conn, user_ids, args.learnt_share, rng)
+        await conn.execute("ANALYZE")
+
+    print(
+        f"Loaded {len(user_ids):,} users, {entries:,} journal entries and {cards:,} srs rows "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    print(f"DATABASE_URL={bench_dsn(args.name)!r}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,220 @@
+import asyncio
+import bisect
+import gzip
+import hashlib
+import os
+import time
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from psycopg import AsyncConnection
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+from pydantic import TypeAdapter
+
+from ..data.models import GrammarInDB, GrammarSummary
+from ..db.connect import get_pool
+from ..metrics import timed
+from .facets import FacetIndex
+from .matcher import GrammarMatcher
+from .sampling import GrammarSampler
+from .search import GrammarSearchIndex
+
+# how long a process trusts its copy of the catalog before checking the revision
+REFRESH_INTERVAL = float(os.environ.get("CATALOG_REFRESH_SECONDS", "30"))
+
+grammar_list_adapter = TypeAdapter(List[GrammarInDB])
+summary_list_adapter = TypeAdapter(List[GrammarSummary])
+
+
+class CatalogSnapshot:
+    """
+    Read-only copy of the grammar table at one catalog revision.
+
+    Every entry is encoded to JSON once up front, so any list response (full,
+    page, filter, search, sample) is a join of ready bytes and the full list is
+    a memory copy. The full list is also kept gzipped, with an ETag for
+    conditional requests.
+
+    `row_revisions` maps grammar ids to the revision that last changed them
+    and `tombstones` deleted ids to the revision that removed them; rows
+    missing from `row_revisions` count as changed at `revision`.
+    """
+
+    def __init__(
+        self,
+        revision: int,
+        entries: List[GrammarInDB],
+        row_revisions: Optional[Dict[int, int]] = None,
+        tombstones: Optional[Dict[int, int]] = None,
+    ) -> None:
+        self.revision = revision
+        self.entries = entries
+        self.ids: List[int] = [g.id for g in entries]
+        self.by_id: Dict[int, GrammarInDB] = {g.id: g for g in entries}
+        self.row_revisions: Dict[int, int] = row_revisions or {}
+        self.tombstones: Dict[int, int] = tombstones or {}
+        self.encoded: Dict[int, bytes] = {g.id: g.model_dump_json().encode() for g in entries}
+        self._projections: Dict[FrozenSet[str], Dict[int, bytes]] = {}
+        self.payload: bytes = self.encode(entries)
+        # mtime=0 keeps the bytes identical across processes and rebuilds
+        self.payload_gzip: bytes = gzip.compress(self.payload, compresslevel=9, mtime=0)
+        # the digest tells apart equal revision numbers from different databases
+        self.etag = f'"{revision}-{hashlib.blake2b(self.payload, digest_size=8).hexdigest()}"'
+        self.sampler = GrammarSampler.from_entries(entries)
+        self.matcher = GrammarMatcher.from_entries(entries)
+        self.search = GrammarSearchIndex(entries)
+        self.facets = FacetIndex(entries)
+
+    def project(self, fields: Optional[FrozenSet[str]] = None) -> Dict[int, bytes]:
+        """
+        Per-entry JSON holding only `fields` (every field for None). Each field
+        set is encoded once, on first use, and kept for the life of the snapshot.
+        """
+        if fields is None:
+            return self.encoded
+        encoded = self._projections.get(fields)
+        if encoded is None:
+            encoded = {g.id: g.model_dump_json(include=set(fields)).encode() for g in self.entries}
+            self._projections[fields] = encoded
+        return encoded
+
+    @timed("serialize")
+    def encode(self, entries: Sequence[GrammarInDB], fields: Optional[FrozenSet[str]] = None) -> bytes:
+        encoded = self.project(fields)
+        return b"[" + b",".join([encoded[g.id] for g in entries]) + b"]"
+
+    @timed("serialize")
+    def encode_lines(self, entries: Sequence[GrammarInDB], fields: Optional[FrozenSet[str]] = None) -> bytes:
+        encoded = self.project(fields)
+        return b"".join([encoded[g.id] + b"\n" for g in entries])
+
+    def changes_since(self, since: int) -> Tuple[List[GrammarInDB], List[int]]:
+        """
+        Entries changed and ids deleted after revision `since`, both in id order.
+        """
+        upserts = [g for g in self.entries if self.row_revisions.get(g.id, self.revision) > since]
+        deleted = sorted(i for i, rev in self.tombstones.items() if rev > since)
+        return upserts, deleted
+
+    def page(
+        self,
+        after: Optional[int],
+        size: Optional[int],
+        entries: Optional[List[GrammarInDB]] = None,
+    ) -> List[GrammarInDB]:
+        """
+        Entries with an id greater than `after`, in id order. Pages the whole
+        catalog unless given an id-ordered subset of it, e.g. a facet filter.
+        """
+        if entries is None:
+            entries, ids = self.entries, self.ids
+        else:
+            ids = [g.id for g in entries]
+        start = 0 if after is None else bisect.bisect_right(ids, after)
+        return entries[start:] if size is None else entries[start : start + size]
+
+
+async def fetch_revision(conn: AsyncConnection) -> int:
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await cur.execute("SELECT revision FROM catalog_revision")
+        row = await cur.fetchone()
+    return 0 if row is None else row["revision"]
+
+
+async def fetch_entries(conn: AsyncConnection) -> List[GrammarInDB]:
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await cur.execute(
+            """
+            SELECT id, usage, meaning, level, tags, notes, examples, enhanced_notes
+            FROM grammar
+            ORDER BY id
+            """  # snapshot paging relies on id order
+        )
+        rows = await cur.fetchall()
+    return grammar_list_adapter.validate_python(rows)
+
+
+async def fetch_summaries(conn: AsyncConnection) -> List[GrammarSummary]:
+    """
+    The catalog without notes and examples, for callers that only need to
+    pick grammar points: skips reading (and detoasting) the JSONB columns.
+    """
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await cur.execute("SELECT id, usage, meaning, level, tags FROM grammar ORDER BY id")
+        rows = await cur.fetchall()
+    return summary_list_adapter.validate_python(rows)
+
+
+async def fetch_row_revisions(conn: AsyncConnection) -> Tuple[Dict[int, int], Dict[int, int]]:
+    """
+    Revision of every grammar row, and of every deleted one (its tombstone).
+    """
+    async with conn.cursor() as cur:
+        await cur.execute("SELECT id, revision FROM grammar")
+        row_revisions = {grammar_id: rev for grammar_id, rev in await cur.fetchall()}
+        await cur.execute("SELECT grammar_id, revision FROM grammar_tombstone")
+        tombstones = {grammar_id: rev for grammar_id, rev in await cur.fetchall()}
+    return row_revisions, tombstones
+
+
+class GrammarCatalog:
+    """
+    Process-wide cache of the grammar catalog.
+
+    Every write to the grammar table bumps `catalog_revision` (see the grammar
+    triggers). At most once per `refresh_interval` seconds a request checks
+    that counter and rebuilds the snapshot if it moved; everyone else is served
+    from memory without touching the pool.
+    """
+
+    def __init__(
+        self,
+        pool_factory: Callable[[], AsyncConnectionPool] = get_pool,
+        refresh_interval: float = REFRESH_INTERVAL,
+    ) -> None:
+        self.pool_factory = pool_factory
+        self.refresh_interval = refresh_interval
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self.snapshot is not None and time.monotonic() - self._checked_at < self.refresh_interval
+
+    async def get(self) -> CatalogSnapshot:
+        snapshot = self.snapshot
+        if snapshot is not None and (self._is_fresh() or self._lock.locked()):
+            # another request is already refreshing, keep serving the old copy
+            return snapshot
+
+        async with self._lock:
+            if not self._is_fresh():
+                await self.refresh()
+        assert self.snapshot is not None
+        return self.snapshot
+
+    async def refresh(self) -> CatalogSnapshot:
+        async with self.pool_factory().connection() as conn:
+            return await self.load(conn)
+
+    async def load(self, conn: AsyncConnection) -> CatalogSnapshot:
+        """
+        Bring the snapshot up to date over `conn`. Used directly by the
+        pre-fork server to build the catalog once in the master, before any
+        pool or event loop exists in the workers.
+        """
+        # read the revision before the rows so a concurrent reload can only
+        # make the snapshot look older than it is, never newer
+        revision = await fetch_revision(conn)
+        if self.snapshot is None or self.snapshot.revision != revision:
+            entries = await fetch_entries(conn)
+            row_revisions, tombstones = await fetch_row_revisions(conn)
+            self.snapshot = CatalogSnapshot(revision, entries, row_revisions, tombstones)
+        self._checked_at = time.monotonic()
+        return self.snapshot
+
+    def invalidate(self) -> None:
+        self._checked_at = 0.0
+
+
+catalog = GrammarCatalog()
@@ -0,0 +1,89 @@
+from collections import defaultdict
+from typing import Dict, List, Literal, Sequence, Tuple
+
+from ..data.models import GrammarInDB
+
+TagMatch = Literal["all", "any"]
+
+# filter combinations whose ids a FacetIndex keeps, oldest dropped first
+MAX_CACHED_FILTERS = 1024
+
+
+class FacetIndex:
+    """
+    Per-tag and per-level bitsets over catalog positions.
+
+    Bit i of a bitset is set when the i-th catalog entry has that tag (or
+    level), so AND/OR filters are single big-int operations and a facet count
+    is a popcount, instead of scanning every entry's tag array.
+    """
+
+    def __init__(self, entries: List[GrammarInDB]) -> None:
+        self.entries = entries
+        self.everything = (1 << len(entries)) - 1
+        tags: Dict[str, int] = defaultdict(int)
+        levels: Dict[str, int] = defaultdict(int)
+        for position, entry in enumerate(entries):
+            bit = 1 << position
+            for tag in entry.tags:
+                tags[tag] |= bit
+            if entry.level:
+                levels[entry.level] |= bit
+        self.tags = dict(tags)
+        self.levels = dict(levels)
+        self._ids: Dict[Tuple[Tuple[str, ...], Tuple[str, ...], TagMatch], List[int]] = {}
+
+    def filter(self, tags: Sequence[str] = (), levels: Sequence[str] = (), match: TagMatch = "all") -> int:
+        """
+        Bitset of entries carrying all (or any) of `tags` and one of `levels`.
+        Empty filters don't restrict anything.
+        """
+        bits = self.everything
+        if tags:
+            if match == "all":
+                for tag in tags:
+                    bits &= self.tags.get(tag, 0)
+            else:
+                bits = 0
+                for tag in tags:
+                    bits |= self.tags.get(tag, 0)
+        if levels:
+            level_bits = 0
+            for level in levels:
+                level_bits |= self.levels.get(level, 0)
+            bits &= level_bits
+        return bits
+
+    def members(self, bits: int) -> List[GrammarInDB]:
+        """
+        Entries in a bitset, in catalog order.
+        """
+        if bits == self.everything:
+            return self.entries
+        # one pass over the binary string beats peeling off bits one at a time
+        flags = bin(bits)[:1:-1]
+        return [self.entries[i] for i, flag in enumerate(flags) if flag == "1"]
+
+    def ids(self, tags: Sequence[str] = (), levels: Sequence[str] = (), match: TagMatch = "all") -> List[int]:
+        """
+        Ids of the entries matching a filter, in catalog order. Each combination
+        is decoded once and kept, so drawing from the same filter again costs
+        a dict lookup rather than a pass over the catalog.
+        """
+        key = (tuple(tags), tuple(levels), match)
+        ids = self._ids.get(key)
+        if ids is None:
+            ids = [g.id for g in self.members(self.filter(tags, levels, match))]
+            if len(self._ids) >= MAX_CACHED_FILTERS:
+                del self._ids[next(iter(self._ids))]
+            self._ids[key] = ids
+        return ids
+
+    def counts(self, bits: int) -> Dict[str, Dict[str, int]]:
+        """
+        How many entries in `bits` carry each tag and each level.
+        """
+        return {
+            "tags": {tag: n for tag, tag_bits in self.tags.items() if (n := (tag_bits & bits).bit_count())},
+            "levels": {level: n for level, level_bits in self.levels.items() if (n := (level_bits & bits).bit_count())},
+        }
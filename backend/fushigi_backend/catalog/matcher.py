@@ -0,0 +1,158 @@
+import re
+from collections import defaultdict
+from itertools import product
+from typing import Dict, Iterable, List, Set, Tuple
+
+from ..data.models import GrammarInDB
+
+SENTENCE_END = re.compile(r"(?<=[。！？!?])|\n")
+
+# anything standing in for a word rather than literal text: 〜, 「」/「N」 slots,
+# bare latin letters (N, V, A), ellipses, the ＋ used in formulas and ー used as
+# a dash (but not as a long vowel after katakana)
+PLACEHOLDER = re.compile(r"〜|～|「[^」]*」|[A-Za-z]+|。。。|＋|(?<![ァ-ヺ])ー|\s|、")
+OPTIONAL_GROUP = re.compile(r"[（(]([^）)]*)[）)]")
+
+# polite or plain endings that conjugate away in real sentences
+CONJUGATING_ENDINGS = ("ます", "です", "だ")
+
+# literal text shorter than this (lone particles like で or に) matches nearly
+# every sentence, so such patterns are skipped
+MIN_PATTERN_CHARS = 2
+# same idea for the conjugation stems, where あり would match ありがとう
+MIN_STEM_CHARS = 3
+
+
+def segment_sentences(content: str) -> List[str]:
+    """
+    Split journal text into sentences on 。！？ (and ASCII !?) and newlines,
+    keeping the punctuation with its sentence.
+    """
+    return [s.strip() for s in SENTENCE_END.split(content) if s.strip()]
+
+
+def expand_usage(usage: str) -> List[Tuple[str, ...]]:
+    """
+    Turn a catalog `usage` string into the literal fragments a sentence must
+    contain, in order, for the grammar point to match.
+
+    `〜こそ・〜からこそ` gives [("こそ",), ("からこそ",)] and
+    `〜から〜にかけて` gives [("から", "にかけて")]. A bracketed group is a choice
+    between its ・ separated options, or optional when it has just one.
+    """
+    variants: Set[Tuple[str, ...]] = set()
+    for alternative in re.split(r"[・･](?![^（(]*[）)])", usage):
+        groups = OPTIONAL_GROUP.findall(alternative)
+        choices = [g.split("・") if "・" in g else [g, ""] for g in groups]
+        template = OPTIONAL_GROUP.sub("\0", alternative)
+        for picked in product(*choices):
+            text = template
+            for option in picked:
+                text = text.replace("\0", option, 1)
+            fragments = tuple(f for f in PLACEHOLDER.split(text) if f)
+            if fragments and sum(map(len, fragments)) >= MIN_PATTERN_CHARS:
+                variants.add(fragments)
+                variants.update(_stems(fragments))
+    return sorted(variants)
+
+
+def _stems(fragments: Tuple[str, ...]) -> List[Tuple[str, ...]]:
+    last = fragments[-1]
+    for ending in CONJUGATING_ENDINGS:
+        stem = last[: -len(ending)]
+        if last.endswith(ending) and len(stem) >= MIN_STEM_CHARS:
+            return [fragments[:-1] + (stem,)]
+    return []
+
+
+class GrammarMatcher:
+    """
+    Aho-Corasick automaton over every literal fragment of every grammar usage.
+
+    One left-to-right pass over a sentence finds all fragment occurrences; a
+    grammar point matches when all fragments of one of its patterns occur in
+    order. Cost is linear in sentence length plus matches, independent of how
+    many grammar points are in the catalog.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[int, Tuple[str, ...]]]) -> None:
+        self.patterns: List[Tuple[int, Tuple[int, ...]]] = []
+        self.patterns_by_fragment: Dict[int, List[int]] = defaultdict(list)
+        fragment_ids: Dict[str, int] = {}
+        for grammar_id, fragments in patterns:
+            ids = tuple(fragment_ids.setdefault(f, len(fragment_ids)) for f in fragments)
+            for fragment_id in set(ids):
+                self.patterns_by_fragment[fragment_id].append(len(self.patterns))
+            self.patterns.append((grammar_id, ids))
+
+        self.fragment_lengths = [0] * len(fragment_ids)
+        for fragment, fragment_id in fragment_ids.items():
+            self.fragment_lengths[fragment_id] = len(fragment)
+        self._compile(fragment_ids)
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[GrammarInDB]) -> "GrammarMatcher":
+        return cls((g.id, fragments) for g in entries for fragments in expand_usage(g.usage))
+
+    def _compile(self, fragment_ids: Dict[str, int]) -> None:
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[int]] = [[]]
+        for fragment, fragment_id in fragment_ids.items():
+            node = 0
+            for char in fragment:
+                if char not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[node][char] = len(self.goto) - 1
+                node = self.goto[node][char]
+            self.output[node].append(fragment_id)
+
+        # breadth first so every fail link points at an already finished node
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[child] = target if target != child else 0
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def occurrences(self, text: str) -> Dict[int, List[int]]:
+        """
+        Start offsets of every fragment found in `text`, keyed by fragment id.
+        """
+        found: Dict[int, List[int]] = defaultdict(list)
+        node = 0
+        for end, char in enumerate(text, start=1):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            for fragment_id in self.output[node]:
+                found[fragment_id].append(end - self.fragment_lengths[fragment_id])
+        return found
+
+    def match(self, sentence: str) -> List[int]:
+        """
+        Ids of grammar points used in the sentence, in catalog pattern order.
+        """
+        found = self.occurrences(sentence)
+        candidates = sorted({p for fragment_id in found for p in self.patterns_by_fragment[fragment_id]})
+        matched: List[int] = []
+        for index in candidates:
+            grammar_id, fragments = self.patterns[index]
+            if grammar_id not in matched and self._in_order(fragments, found):
+                matched.append(grammar_id)
+        return matched
+
+    def _in_order(self, fragments: Tuple[int, ...], found: Dict[int, List[int]]) -> bool:
+        position = 0
+        for fragment_id in fragments:
+            starts = [s for s in found.get(fragment_id, ()) if s >= position]
+            if not starts:
+                return False
+            position = starts[0] + self.fragment_lengths[fragment_id]
+        return True
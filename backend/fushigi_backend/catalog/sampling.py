@@ -0,0 +1,70 @@
+import os
+import random
+from typing import Collection, Iterable, List, Optional, Sequence, Union
+
+from ..data.models import GrammarInDB, GrammarSummary
+
+_shared_rng = random.Random()
+# forked workers would otherwise all draw the same "random" sequence
+os.register_at_fork(after_in_child=_shared_rng.seed)
+
+
+class GrammarSampler:
+    """
+    Draws random grammar ids from an in-memory index.
+
+    Replaces `ORDER BY RANDOM() LIMIT k`, which sorts the whole table per call.
+    A draw costs O(k) no matter how large the catalog gets, and passing `seed`
+    makes it reproducible for the same catalog and arguments.
+    """
+
+    def __init__(self, ids: Iterable[int]) -> None:
+        self.ids: List[int] = list(ids)
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Union[GrammarInDB, GrammarSummary]]) -> "GrammarSampler":
+        return cls(g.id for g in entries)
+
+    def sample(
+        self,
+        k: int,
+        *,
+        seed: Optional[int] = None,
+        exclude: Collection[int] = (),
+        within: Optional[Sequence[int]] = None,
+    ) -> List[int]:
+        """
+        Pick up to k distinct ids from the catalog (or `within`) not in `exclude`.
+
+        Args:
+            k: how many ids to return
+            seed: fixes the draw so the same call returns the same ids
+            exclude: ids that must not be returned
+            within: ids to draw from instead of the whole catalog, e.g. FacetIndex members
+
+        Returns:
+            list of at most k ids, fewer only if not enough candidates exist
+        """
+        pool = self.ids if within is None else within
+        rng = _shared_rng if seed is None else random.Random(seed)
+        if k <= 0 or not pool:
+            return []
+        if not exclude:
+            return rng.sample(pool, min(k, len(pool)))
+
+        # rejection sampling stays O(k) while exclusions are a small part of the pool
+        picked: List[int] = []
+        seen = set()
+        for _ in range(4 * k + 16):
+            if len(picked) == k:
+                return picked
+            grammar_id = pool[rng.randrange(len(pool))]
+            if grammar_id in seen or grammar_id in exclude:
+                continue
+            seen.add(grammar_id)
+            picked.append(grammar_id)
+
+        # exclusions cover most of the pool, fall back to a linear scan
+        remaining = [i for i in pool if i not in seen and i not in exclude]
+        picked.extend(rng.sample(remaining, min(k - len(picked), len(remaining))))
+        return picked
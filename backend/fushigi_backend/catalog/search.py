@@ -0,0 +1,574 @@
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from ..data.models import GrammarInDB
+
+TOKEN_SPLIT = re.compile(r"[\s\W_]+")
+KATAKANA = re.compile(r"[ァ-ヶ]")
+FORM_SPLIT = re.compile(r"[・()]")  # alternatives in a normalized usage, 〜（以上は・上は）
+
+# how much a hit in each field counts towards the ranking
+FIELD_WEIGHTS = {
+    "usage": 4.0,
+    "meaning": 3.0,
+    "japanese": 1.0,
+    "romaji": 1.0,
+    "english": 0.5,
+}
+
+# BM25 term frequency saturation and field length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# added on top of BM25 when the whole query appears as one piece, by field;
+# a query spelling out a grammar point beats any number of scattered words
+PHRASE_BOOSTS = {
+    "usage_exact": 20.0,
+    "usage_form": 16.0,  # one of the usage's alternatives, 上は of 〜（以上は・上は）
+    "usage": 10.0,
+    "meaning_exact": 6.0,  # one of the meaning's ; separated glosses
+    "meaning": 4.0,  # several words found together
+    "examples": 3.0,
+}
+
+# a query that only starts like a usage, e.g. "te mo ii" of 〜ても, gets the
+# usage boost in proportion to how much of it matched, from this many
+# characters of romaji or kana on
+PREFIX_MIN_ROMAJI = 4
+PREFIX_MIN_JAPANESE = 2
+
+# an English word that example translations keep using wherever a point's
+# kana shows up in the Japanese, across the whole catalog, likely translates
+# the point: "because" for ので, "if" for なら. Scored by the Dice overlap of
+# the two sets of sentences times the word's rarity, once at least this many
+# sentences agree.
+ALIGNMENT_WEIGHT = 10.0
+ALIGNMENT_MIN_SENTENCES = 2
+
+# romaji is matched on character n-grams of the text with spaces removed,
+# since its word breaks are inconsistent ("tottemo", "totte mo", "mite mo")
+ROMAJI_GRAM = 3
+ROMAJI_MARK = "#"  # keeps romaji n-grams apart from English words
+
+# typo tolerance: an unknown query word stands in for known words sharing
+# this share of bigrams (Dice), at a discount
+FUZZY_MIN_LENGTH = 4
+FUZZY_MIN_SIMILARITY = 0.6
+FUZZY_DISCOUNT = 0.7
+
+HIRAGANA_ROMAJI = {
+    "あ": "a",
+    "い": "i",
+    "う": "u",
+    "え": "e",
+    "お": "o",
+    "か": "ka",
+    "き": "ki",
+    "く": "ku",
+    "け": "ke",
+    "こ": "ko",
+    "さ": "sa",
+    "し": "shi",
+    "す": "su",
+    "せ": "se",
+    "そ": "so",
+    "た": "ta",
+    "ち": "chi",
+    "つ": "tsu",
+    "て": "te",
+    "と": "to",
+    "な": "na",
+    "に": "ni",
+    "ぬ": "nu",
+    "ね": "ne",
+    "の": "no",
+    "は": "ha",
+    "ひ": "hi",
+    "ふ": "fu",
+    "へ": "he",
+    "ほ": "ho",
+    "ま": "ma",
+    "み": "mi",
+    "む": "mu",
+    "め": "me",
+    "も": "mo",
+    "や": "ya",
+    "ゆ": "yu",
+    "よ": "yo",
+    "ら": "ra",
+    "り": "ri",
+    "る": "ru",
+    "れ": "re",
+    "ろ": "ro",
+    "わ": "wa",
+    "を": "o",
+    "ん": "n",
+    "が": "ga",
+    "ぎ": "gi",
+    "ぐ": "gu",
+    "げ": "ge",
+    "ご": "go",
+    "ざ": "za",
+    "じ": "ji",
+    "ず": "zu",
+    "ぜ": "ze",
+    "ぞ": "zo",
+    "だ": "da",
+    "ぢ": "ji",
+    "づ": "zu",
+    "で": "de",
+    "ど": "do",
+    "ば": "ba",
+    "び": "bi",
+    "ぶ": "bu",
+    "べ": "be",
+    "ぼ": "bo",
+    "ぱ": "pa",
+    "ぴ": "pi",
+    "ぷ": "pu",
+    "ぺ": "pe",
+    "ぽ": "po",
+    "ぁ": "a",
+    "ぃ": "i",
+    "ぅ": "u",
+    "ぇ": "e",
+    "ぉ": "o",
+    "ゔ": "vu",
+}
+SMALL_Y = {"ゃ": "a", "ゅ": "u", "ょ": "o"}
+
+
+def normalize(text: str) -> str:
+    """
+    Fold text so equivalent spellings meet: full/half width (NFKC), case,
+    katakana to hiragana, and latin diacritics (ū -> u) without touching
+    Japanese dakuten.
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = KATAKANA.sub(lambda m: chr(ord(m.group()) - 0x60), text)
+    decomposed = unicodedata.normalize("NFD", text)
+    stripped = "".join(c for c in decomposed if not (unicodedata.combining(c) and ord(c) < 0x3000))
+    return unicodedata.normalize("NFC", stripped)
+
+
+def romanize(text: str) -> str:
+    """
+    Hepburn reading of normalized (hiragana) text, so a romaji query can find
+    a usage written in kana. Latin text is kept; kanji and other characters
+    have no reading here and break the text into lines, so no reading runs
+    across them.
+    """
+    out: List[str] = []
+    double = False
+    for char in text:
+        if char == "っ":
+            double = True
+            continue
+        if char == "ー":
+            continue
+        if char in SMALL_Y and out and len(out[-1]) > 1 and out[-1].endswith("i"):
+            stem = out.pop()[:-1]
+            syllable = stem + SMALL_Y[char] if stem.endswith(("sh", "ch", "j")) else stem + "y" + SMALL_Y[char]
+        elif char in HIRAGANA_ROMAJI:
+            syllable = HIRAGANA_ROMAJI[char]
+            if double and syllable[0] not in "aiueon":
+                syllable = ("t" if syllable.startswith("ch") else syllable[0]) + syllable
+        else:
+            syllable = char if char.isascii() else "\n"
+        double = False
+        out.append(syllable)
+    return "".join(out)
+
+
+def compact(text: str) -> str:
+    return TOKEN_SPLIT.sub("", text)
+
+
+def bigrams(token: str) -> Set[str]:
+    return {token[i : i + 2] for i in range(len(token) - 1)} or {token}
+
+
+def word_terms(text: str) -> List[str]:
+    """
+    Latin words of normalized text, and pairs of adjacent words so a phrase
+    ranks above its words scattered about.
+    """
+    words = [token for token in TOKEN_SPLIT.split(text) if token and token.isascii()]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def japanese_terms(text: str) -> List[str]:
+    """
+    Character bigrams of the Japanese in normalized text, which has no spaces
+    to split words on.
+    """
+    result: List[str] = []
+    for token in TOKEN_SPLIT.split(text):
+        if token and not token.isascii():
+            result.extend([token[i : i + 2] for i in range(len(token) - 1)] or [token])
+    return result
+
+
+def romaji_runs(text: str) -> List[str]:
+    """
+    Lines of romaji with spaces and punctuation removed, what romaji n-grams
+    and phrases are matched against.
+    """
+    return [run for line in text.split("\n") if (run := compact(line)) and run.isascii()]
+
+
+def romaji_terms(text: str) -> List[str]:
+    return [
+        ROMAJI_MARK + run[i : i + ROMAJI_GRAM] for run in romaji_runs(text) for i in range(len(run) - ROMAJI_GRAM + 1)
+    ]
+
+
+def spaced(text: str) -> str:
+    return f" {' '.join(token for token in TOKEN_SPLIT.split(text) if token)} "
+
+
+def usage_pieces(usage: str) -> List[str]:
+    """
+    The kana/kanji runs of a normalized usage long enough to look for in a
+    sentence, e.g. "ので" of "〜ので".
+    """
+    return [piece for piece in TOKEN_SPLIT.split(usage) if len(piece) > 1 and not piece.isascii()]
+
+
+Example = Tuple[str, str, str]  # normalized japanese, romaji, english
+
+
+def fields(usage: str, meaning: str, examples: List[Example]) -> Iterable[Tuple[str, List[str]]]:
+    reading = romanize(usage)
+    yield "usage", japanese_terms(usage) + word_terms(reading) + romaji_terms(reading)
+    yield "meaning", word_terms(meaning)
+    yield "japanese", [term for japanese, _, _ in examples for term in japanese_terms(japanese)]
+    yield "romaji", [term for _, romaji, _ in examples for term in word_terms(romaji) + romaji_terms(romaji)]
+    yield "english", [term for _, _, english in examples for term in word_terms(english)]
+
+
+class GrammarSearchIndex:
+    """
+    In-memory inverted index over grammar usage, meaning and examples.
+
+    Japanese is indexed as character bigrams, English as words and word
+    pairs, and romaji (of the examples and of the usage read in Hepburn) both
+    as words and as character trigrams. A result is ranked by BM25F: a rare
+    term counts more than a common one, and a hit in a short field more than
+    in a long one, so a point isn't ranked up for having many or wordy
+    examples. English words the catalog's translations consistently give for
+    a usage count towards it as well (see ALIGNMENT_WEIGHT). Every term's
+    contribution to every document is computed when the index is built, so a
+    query only adds up arrays. On top of that, the whole query found as one
+    piece in the usage, the meaning or an example gets a fixed boost, and a
+    query only starting like a usage part of one; the n-gram postings narrow
+    down where to look. Results tie-break on id, never on catalog position.
+    Query words the index doesn't know are matched to similarly spelled ones,
+    which tolerates typos.
+    """
+
+    def __init__(self, entries: List[GrammarInDB]) -> None:
+        self.entries = entries
+        vocabulary: Dict[str, int] = {}
+        # one row per (term, document, field) hit
+        hit_terms: List[int] = []
+        hit_docs: List[int] = []
+        hit_fields: List[int] = []
+        hit_counts: List[int] = []
+        columns = {name: i for i, name in enumerate(FIELD_WEIGHTS)}
+        lengths = np.zeros((len(entries), len(FIELD_WEIGHTS)))
+        self.unigrams: Dict[str, Set[int]] = defaultdict(set)
+        self.headlines: List[str] = []
+        # the first keystroke of a search, ranked on first use
+        self.by_character: Dict[str, List[int]] = {}
+        self.forms: List[List[str]] = []
+        self.readings: List[List[str]] = []
+        self.spoken: Dict[str, Dict[int, str]] = defaultdict(dict)
+        form_bigrams: Dict[str, Set[int]] = defaultdict(set)
+        self.meanings: List[str] = []
+        self.glosses: List[Set[str]] = []
+        self.japanese: List[List[str]] = []
+        self.romaji: List[List[str]] = []
+        usages = [normalize(entry.usage) for entry in entries]
+        examples = [
+            [(normalize(e.japanese), normalize(e.romaji), normalize(e.english)) for e in entry.examples]
+            for entry in entries
+        ]
+        for doc, entry in enumerate(entries):
+            usage = usages[doc]
+            meaning = normalize(entry.meaning)
+            for name, field_terms in fields(usage, meaning, examples[doc]):
+                field = columns[name]
+                counts = Counter(field_terms)
+                lengths[doc, field] = len(field_terms)
+                hit_terms.extend(vocabulary.setdefault(term, len(vocabulary)) for term in counts)
+                hit_counts.extend(counts.values())
+                hit_docs.extend([doc] * len(counts))
+                hit_fields.extend([field] * len(counts))
+
+            for char in set(usage + meaning + "".join("".join(example) for example in examples[doc])):
+                self.unigrams[char].add(doc)
+            self.headlines.append(f"{usage}\n{meaning}")
+            # the whole usage, then its alternatives
+            self.forms.append(
+                [compact(usage)] + [form for piece in FORM_SPLIT.split(usage) if (form := compact(piece))]
+            )
+            self.readings.append(romaji_runs(romanize(usage)))
+            for i, form in enumerate(self.forms[-1]):
+                for gram in japanese_terms(form):
+                    form_bigrams[gram].add(doc)
+                if "\n" not in (reading := romanize(form)):
+                    self.spoken[reading].setdefault(doc, "usage_form" if i else "usage_exact")
+            self.meanings.append(spaced(meaning))
+            self.glosses.append({spaced(gloss) for gloss in re.split(r"[;,]", meaning)})
+            self.japanese.append([compact(japanese) for japanese, _, _ in examples[doc]])
+            self.romaji.append([run for _, romaji, _ in examples[doc] for run in romaji_runs(romaji)])
+
+        # each term's BM25F share of each document's score, fixed for the life of the index
+        count = max(1, len(entries))
+        docs = np.array(hit_docs, dtype=np.intp)
+        field_ids = np.array(hit_fields, dtype=np.intp)
+        weights = np.array(list(FIELD_WEIGHTS.values()))
+        average = np.maximum(1.0, lengths.mean(axis=0)) if entries else np.ones(len(FIELD_WEIGHTS))
+        norm = 1 - BM25_B + BM25_B * lengths[docs, field_ids] / average[field_ids]
+        pairs, pair_of_hit = np.unique(np.array(hit_terms, dtype=np.intp) * count + docs, return_inverse=True)
+        frequency = np.bincount(pair_of_hit, weights=weights[field_ids] * np.array(hit_counts) / norm)
+        pair_terms = pairs // count
+        df = np.bincount(pair_terms, minlength=len(vocabulary))
+        idf = np.log(1 + (count - df + 0.5) / (df + 0.5))
+        shares = idf[pair_terms] * frequency * (BM25_K1 + 1) / (frequency + BM25_K1)
+
+        alignments = self.align(usages, [example for doc_examples in examples for example in doc_examples])
+        aligned = [
+            (vocabulary.setdefault(term, len(vocabulary)) * count + doc, share) for term, doc, share in alignments
+        ]
+        if aligned:
+            keys, extra = zip(*aligned)
+            pairs, pair_of_share = np.unique(np.concatenate([pairs, keys]), return_inverse=True)
+            shares = np.bincount(pair_of_share, weights=np.concatenate([shares, extra]))
+        pair_terms, pair_docs = pairs // count, pairs % count
+        bounds = np.searchsorted(pair_terms, np.arange(len(vocabulary) + 1))
+        self.postings: Dict[str, Tuple[NDArray[np.intp], NDArray[np.float64]]] = {
+            term: (pair_docs[bounds[i] : bounds[i + 1]], shares[bounds[i] : bounds[i + 1]])
+            for term, i in vocabulary.items()
+        }
+        self.documents: Dict[str, FrozenSet[int]] = {}
+        # usage forms join what the postings split apart, にしても・にしろ into にしてもにしろ
+        self.form_bigrams = {gram: frozenset(docs) for gram, docs in form_bigrams.items()}
+        self.ids = np.array([entry.id for entry in entries], dtype=np.int64)
+
+        # latin words by edge-padded bigram, to find stand-ins for misspelled words
+        self.spelling_terms = [
+            term for term in self.postings if term.isascii() and " " not in term and not term.startswith(ROMAJI_MARK)
+        ]
+        spellings: Dict[str, List[int]] = defaultdict(list)
+        for i, term in enumerate(self.spelling_terms):
+            for gram in bigrams(f"^{term}$"):
+                spellings[gram].append(i)
+        self.spellings = {gram: np.array(terms, dtype=np.intp) for gram, terms in spellings.items()}
+        self.spelling_sizes = np.array([len(bigrams(f"^{term}$")) for term in self.spelling_terms])
+
+    @staticmethod
+    def align(usages: List[str], examples: List[Example]) -> List[Tuple[str, int, float]]:
+        """
+        (English word, document, score) for how consistently the catalog's
+        example translations use the word where the document's usage appears
+        in the Japanese. See ALIGNMENT_WEIGHT. A sentence with a longer usage
+        in it, as としても is to として, counts for the longer one only.
+        """
+        english = [{term for term in word_terms(sentence) if " " not in term} for _, _, sentence in examples]
+        frequency = Counter(term for words in english for term in words)
+        by_bigram: Dict[str, Set[int]] = defaultdict(set)
+        for i, (japanese, _, _) in enumerate(examples):
+            for gram in japanese_terms(japanese):
+                by_bigram[gram].add(i)
+        pieces = {piece for usage in usages for piece in usage_pieces(usage)}
+        sentences: Dict[str, Set[int]] = {}
+        for piece in pieces:
+            candidates = set.intersection(*(by_bigram.get(gram, set()) for gram in japanese_terms(piece)))
+            sentences[piece] = {i for i in candidates if piece in examples[i][0]}
+        for piece in pieces:
+            for longer in pieces:
+                if piece in longer and piece != longer:
+                    sentences[piece] -= sentences[longer]
+        alignments: List[Tuple[str, int, float]] = []
+        for doc, usage in enumerate(usages):
+            found = set().union(*(sentences[piece] for piece in usage_pieces(usage)))
+            for term, both in Counter(term for i in found for term in english[i]).items():
+                if both >= ALIGNMENT_MIN_SENTENCES:
+                    dice = 2 * both / (len(found) + frequency[term])
+                    alignments.append((term, doc, ALIGNMENT_WEIGHT * dice * math.log(len(examples) / frequency[term])))
+        return alignments
+
+    def similar_terms(self, word: str) -> List[str]:
+        """
+        Known words spelled like `word`, e.g. "because" for "becuase". Word
+        edges count as bigrams, so swapped letters in the middle still match.
+        """
+        grams = [self.spellings[gram] for gram in bigrams(f"^{word}$") if gram in self.spellings]
+        if not grams:
+            return []
+        shared = np.bincount(np.concatenate(grams), minlength=len(self.spelling_terms))
+        similarity = 2 * shared / (len(bigrams(f"^{word}$")) + self.spelling_sizes)
+        return [self.spelling_terms[i] for i in np.flatnonzero(similarity >= FUZZY_MIN_SIMILARITY)]
+
+    def stand_in(self, word: str) -> Tuple[NDArray[np.intp], NDArray[np.float64]]:
+        """
+        Postings for a word the index doesn't know: the best share of each
+        document among similarly spelled words, at a discount.
+        """
+        best: Dict[int, float] = {}
+        for term in self.similar_terms(word):
+            docs, shares = self.postings[term]
+            for doc, share in zip(docs.tolist(), shares.tolist()):
+                best[doc] = max(best.get(doc, 0.0), share * FUZZY_DISCOUNT)
+        return np.fromiter(best, dtype=np.intp, count=len(best)), np.fromiter(best.values(), dtype=np.float64)
+
+    def documents_of(self, term: str) -> FrozenSet[int]:
+        if term not in self.documents:
+            postings = self.postings.get(term)
+            self.documents[term] = frozenset(postings[0].tolist()) if postings is not None else frozenset()
+        return self.documents[term]
+
+    def containing(self, query_terms: List[str], index: Optional[Dict[str, FrozenSet[int]]] = None) -> FrozenSet[int]:
+        """
+        Documents holding every one of `query_terms`: where a phrase made of
+        them can be, before checking the text itself. Looks the terms up in
+        the postings, or in `index` when given.
+        """
+        lookup = self.documents_of if index is None else (lambda term: index.get(term, frozenset()))
+        sets = sorted((lookup(term) for term in set(query_terms)), key=len)
+        if not sets:
+            return frozenset()
+        found = sets[0]
+        for docs in sets[1:]:
+            found = found & docs
+        return found
+
+    def usage_docs(self, phrase: str) -> Dict[int, str]:
+        """
+        Documents whose usage contains `phrase`, as written or read in romaji,
+        and which of the PHRASE_BOOSTS for the usage that earns them.
+        """
+        found: Dict[int, str]
+        if phrase.isascii():
+            # a form has to be all kana to be read whole, one broken up by kanji only contains the phrase
+            found = dict(self.spoken.get(phrase, {}))
+            grams, pieces = romaji_terms(phrase), self.readings
+        else:
+            found = {}
+            grams, pieces = japanese_terms(phrase), self.forms
+        # a phrase too short for n-grams is likely found inside a longer reading by chance
+        index = None if pieces is self.readings else self.form_bigrams
+        for doc in self.containing(grams, index) if grams else ():
+            if doc in found or not any(phrase in piece for piece in pieces[doc]):
+                continue
+            if pieces is self.forms and phrase in pieces[doc]:
+                found[doc] = "usage_form" if pieces[doc].index(phrase) else "usage_exact"
+            else:
+                found[doc] = "usage"
+        return found
+
+    def phrase_docs(self, phrase: str, words: str) -> Dict[int, float]:
+        """
+        Documents containing the whole query as one piece, with their boost:
+        in the usage, the meaning or an example. When no usage contains it,
+        those containing its longest start get part of the usage boost.
+        `phrase` is the query without spaces, `words` its words space padded.
+        """
+        boosts: Dict[int, float] = defaultdict(float)
+        ascii = phrase.isascii()
+        shortest = PREFIX_MIN_ROMAJI if ascii else PREFIX_MIN_JAPANESE
+        found = self.usage_docs(phrase)
+        for doc, boost in found.items():
+            boosts[doc] += PHRASE_BOOSTS[boost]
+        end = len(phrase) - 1
+        while not found and end >= shortest:
+            found = self.usage_docs(phrase[:end])
+            for doc in found:
+                boosts[doc] += PHRASE_BOOSTS["usage"] * end / len(phrase)
+            end -= 1
+
+        if ascii:
+            for doc in self.containing(romaji_terms(phrase)):
+                if any(phrase in run for run in self.romaji[doc]):
+                    boosts[doc] += PHRASE_BOOSTS["examples"]
+            tokens = words.split()
+            pairs = [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for doc in self.containing(pairs or tokens):
+                if words in self.glosses[doc]:
+                    boosts[doc] += PHRASE_BOOSTS["meaning_exact"]
+                if pairs and words in self.meanings[doc]:
+                    boosts[doc] += PHRASE_BOOSTS["meaning"]
+        else:
+            for doc in self.containing(japanese_terms(phrase)):
+                if any(phrase in sentence for sentence in self.japanese[doc]):
+                    boosts[doc] += PHRASE_BOOSTS["examples"]
+        return boosts
+
+    def search(self, query: str, limit: int = 20, min_coverage: float = 0.6) -> List[GrammarInDB]:
+        """
+        Best matches for `query`, most relevant first.
+
+        Args:
+            query: text in kana, kanji, romaji or English
+            limit: most results to return
+            min_coverage: share of the query's words, or of its Japanese or
+                romaji n-grams, a result must contain, unless it contains the
+                whole query
+        """
+        normalized = normalize(query).strip()
+        if not normalized:
+            return []
+
+        if len(normalized) == 1:
+            if normalized not in self.by_character:
+                self.by_character[normalized] = sorted(
+                    self.unigrams.get(normalized, set()),
+                    key=lambda d: (normalized not in self.headlines[d], self.entries[d].id),
+                )
+            return [self.entries[d] for d in self.by_character[normalized][:limit]]
+
+        phrase = compact(normalized)
+        words = [token for token in TOKEN_SPLIT.split(normalized) if token and token.isascii()]
+        # each reading of the query is scored on its own and must cover enough of itself
+        readings = {
+            "words": word_terms(normalized),
+            "japanese": japanese_terms(normalized),
+            "romaji": romaji_terms(phrase) if phrase.isascii() else [],
+        }
+        scores = np.zeros(len(self.entries))
+        covered = np.zeros(len(self.entries), dtype=bool)
+        for reading, query_terms in readings.items():
+            if not query_terms:
+                continue
+            singles = [term for term in dict.fromkeys(query_terms) if " " not in term]
+            # n-grams overlap, so their sum is averaged down to about one term's worth
+            scale = 1.0 if reading == "words" else 1 / len(singles)
+            matched = np.zeros(len(self.entries), dtype=np.int64)
+            for term in dict.fromkeys(query_terms):
+                postings = self.postings.get(term)
+                if postings is None:
+                    if reading != "words" or " " in term or len(term) < FUZZY_MIN_LENGTH:
+                        continue
+                    postings = self.stand_in(term)
+                docs, shares = postings
+                scores[docs] += shares * scale
+                if " " not in term:
+                    matched[docs] += 1
+            covered |= matched >= max(1, math.ceil(min_coverage * len(singles)))
+
+        boosts = self.phrase_docs(phrase, f" {' '.join(words)} ") if words or not phrase.isascii() else {}
+        if boosts:
+            boosted = np.fromiter(boosts, dtype=np.intp, count=len(boosts))
+            scores[boosted] += np.fromiter(boosts.values(), dtype=np.float64, count=len(boosts))
+            covered[boosted] = True
+        found = np.flatnonzero(covered)
+        ranked = found[np.lexsort((self.ids[found], -scores[found]))]
+        return [self.entries[doc] for doc in ranked[:limit]]
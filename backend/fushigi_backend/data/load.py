@@ -1,14 +1,22 @@
 import json
 from pathlib import Path
-from typing import List, Union
+from typing import Sequence, Union
 
 from .models import Grammar, GrammarWrapper
+from .snapshot import DEFAULT_SOURCE, open_snapshot
 
 
-def load_defaults(path: Union[Path, str, None] = None) -> List[Grammar]:
-    if path is None:
-        path = Path(__file__).parent / "grammar.json"
-    else:
-        path = Path(path)
+def load_defaults(path: Union[Path, str, None] = None, use_snapshot: bool = True) -> Sequence[Grammar]:
+    """
+    Grammar entries from `path` (grammar.json by default). When a snapshot
+    built from the file's current contents sits next to it (see
+    `fushigi_backend.data.snapshot`), entries are read lazily from that
+    instead of parsing the whole JSON document.
+    """
+    path = DEFAULT_SOURCE if path is None else Path(path)
+    if use_snapshot:
+        snapshot = open_snapshot(path)
+        if snapshot is not None:
+            return snapshot
     with open(path, "r", encoding="utf-8") as f:
         return GrammarWrapper(**json.load(f)).grammar
@@ -1,7 +1,8 @@
-from datetime import datetime
-from typing import List
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 # for backend, db creation
@@ -37,6 +38,42 @@ class GrammarInDB(Grammar):
     model_config = ConfigDict(from_attributes=True)
 
 
+# slim row for table views: everything but notes and examples
+class GrammarSummary(BaseModel):
+    id: int
+    usage: str
+    meaning: str
+    level: str
+    tags: List[str]
+    model_config = ConfigDict(from_attributes=True)
+
+
+# `fields=` projection: id plus whichever fields were asked for
+class GrammarProjection(BaseModel):
+    id: int
+    usage: Optional[str] = None
+    meaning: Optional[str] = None
+    level: Optional[str] = None
+    tags: Optional[List[str]] = None
+    notes: Optional[str] = None
+    examples: Optional[List[Example]] = None
+    enhanced_notes: Optional[EnhancedNote] = None
+
+
+class GrammarFacets(BaseModel):
+    total: int
+    tags: Dict[str, int]
+    levels: Dict[str, int]
+
+
+# delta sync: what a client at revision `since` is missing
+class GrammarChanges(BaseModel):
+    revision: int
+    reset: bool  # client is ahead of this catalog, replace everything with `upserts`
+    upserts: List[GrammarInDB]
+    deleted: List[int]
+
+
 class JournalEntry(BaseModel):
     title: str
     content: str
@@ -49,7 +86,51 @@ class JournalEntryInDB(JournalEntry):
     user_id: int
     model_config = ConfigDict(from_attributes=True)
 
+
+# offline sync: the client names each entry so a retried batch can't duplicate it
+class JournalEntryImport(JournalEntry):
+    idempotency_key: UUID
+    created_at: Optional[datetime] = None  # when written offline, defaults to now
+
+
+class JournalImportBatch(BaseModel):
+    entries: List[JournalEntryImport] = Field(min_length=1, max_length=1000)
+
+
+class JournalImportResult(BaseModel):
+    idempotency_key: UUID
+    id: int
+    created: bool  # false when an earlier request already stored this key
+
 class SRSReview(BaseModel):
     user_id: int
     grammar_id: int
     quality: int  # 0-5 quality rating; 5 = perfect
+
+class SRSSchedule(BaseModel):
+    user_id: int
+    grammar_id: int
+    ease_factor: float
+    interval_days: int
+    repetition: int
+    due_date: date
+
+
+class RetentionPoint(BaseModel):
+    elapsed_days: int  # bucket lower bound, days since the previous review
+    reviews: int
+    retention: float  # share recalled, quality >= 3
+
+
+class EaseBucket(BaseModel):
+    ease_factor: float  # bucket lower bound
+    cards: int
+
+
+class SRSAnalytics(BaseModel):
+    user_id: int
+    reviews: int
+    lapses: int
+    lapse_rate: float  # lapses per review of an already learnt card
+    retention: List[RetentionPoint]
+    ease: List[EaseBucket]
@@ -0,0 +1,161 @@
+"""
+Compiled, memory-mappable copy of grammar.json.
+
+    uv run python -m fushigi_backend.data.snapshot [source.json] [target.snapshot]
+
+Layout (little endian):
+
+    magic    8 bytes   b"FGSNAP1\\0"
+    source  32 bytes   sha256 of the grammar.json bytes it was built from
+    size     uint64    size of that grammar.json
+    mtime    uint64    its modification time in ns
+    count    uint32    number of entries
+    offsets  uint64 * (count + 1), entry i is data[offsets[i]:offsets[i + 1]]
+    data     each entry as compact JSON, already validated at build time
+
+Opening a snapshot reads the header and offset table only. Entries are parsed
+into `Grammar` models on first access, so a process that touches a handful of
+entries never pays for the rest, and the untouched bytes stay in the shared
+page cache instead of the process heap.
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Union, overload
+
+from .models import Grammar, GrammarWrapper
+
+MAGIC = b"FGSNAP1\0"
+HEADER = struct.Struct("<8s32sQQI")
+OFFSET = struct.Struct("<Q")
+
+DEFAULT_SOURCE = Path(__file__).parent / "grammar.json"
+
+
+def snapshot_path(source: Path) -> Path:
+    return source.with_suffix(".snapshot")
+
+
+def source_digest(source: Path) -> bytes:
+    with open(source, "rb") as f:
+        return hashlib.file_digest(f, "sha256").digest()
+
+
+class GrammarSnapshot(Sequence[Grammar]):
+    """
+    Read-only sequence of `Grammar` backed by an mmapped snapshot file.
+    Decoded entries are kept, so each one is parsed at most once.
+    """
+
+    def __init__(self, path: Union[Path, str]) -> None:
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.digest, self.source_size, self.source_mtime, self._count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a grammar snapshot")
+        self._offsets = HEADER.size
+        self._data = self._offsets + OFFSET.size * (self._count + 1)
+        self._decoded: List[Optional[Grammar]] = [None] * self._count
+
+    def __len__(self) -> int:
+        return self._count
+
+    @overload
+    def __getitem__(self, index: int) -> Grammar: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Grammar]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Grammar, List[Grammar]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        i = index + self._count if index < 0 else index
+        if not 0 <= i < self._count:
+            raise IndexError("snapshot index out of range")
+        entry = self._decoded[i]
+        if entry is None:
+            entry = Grammar.model_validate_json(self.raw(i))
+            self._decoded[i] = entry
+        return entry
+
+    def __iter__(self) -> Iterator[Grammar]:
+        for i in range(self._count):
+            yield self[i]
+
+    def raw(self, index: int) -> bytes:
+        """
+        The JSON bytes of entry `index`, without building a model.
+        """
+        start, end = struct.unpack_from("<2Q", self._map, self._offsets + OFFSET.size * index)
+        return self._map[self._data + start : self._data + end]
+
+    def close(self) -> None:
+        self._map.close()
+
+
+def build_snapshot(source: Union[Path, str] = DEFAULT_SOURCE, target: Union[Path, str, None] = None) -> Path:
+    """
+    Validate `source` and write its snapshot next to it (or to `target`).
+    The file is written under a temporary name and renamed into place, so
+    readers never see a partial snapshot.
+    """
+    source = Path(source)
+    target = snapshot_path(source) if target is None else Path(target)
+    stat = source.stat()
+    raw = source.read_bytes()
+    entries = [g.model_dump_json().encode() for g in GrammarWrapper.model_validate_json(raw).grammar]
+
+    offsets = [0]
+    for blob in entries:
+        offsets.append(offsets[-1] + len(blob))
+
+    tmp = target.with_name(target.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, hashlib.sha256(raw).digest(), stat.st_size, stat.st_mtime_ns, len(entries)))
+        f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        f.writelines(entries)
+    os.replace(tmp, target)
+    return target
+
+
+def open_snapshot(source: Union[Path, str], target: Union[Path, str, None] = None) -> Optional[GrammarSnapshot]:
+    """
+    The snapshot of `source` if one exists and was built from its current
+    contents, otherwise None. An unchanged size and mtime are trusted; anything
+    else (a fresh checkout, a touched file) is settled by the checksum.
+    """
+    source = Path(source)
+    target = snapshot_path(source) if target is None else Path(target)
+    if not target.exists():
+        return None
+    try:
+        snapshot = GrammarSnapshot(target)
+    except (ValueError, struct.error):
+        return None
+    stat = source.stat()
+    if (snapshot.source_size, snapshot.source_mtime) == (stat.st_size, stat.st_mtime_ns):
+        return snapshot
+    if snapshot.digest != source_digest(source):
+        snapshot.close()
+        return None
+    return snapshot
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", nargs="?", type=Path, default=DEFAULT_SOURCE)
+    parser.add_argument("target", nargs="?", type=Path, default=None)
+    args = parser.parse_args()
+
+    target = build_snapshot(args.source, args.target)
+    print(f"Wrote {target} ({target.stat().st_size} bytes)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
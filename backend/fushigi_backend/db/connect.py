@@ -1,27 +1,100 @@
 import os
-from typing import AsyncGenerator, Optional
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, Optional
 
 from psycopg import AsyncConnection
 from psycopg.rows import dict_row
 from psycopg_pool import AsyncConnectionPool
 
+from ..metrics import observe_phase
+from .timing import TimedCursor
+
 DATABASE_URL = os.environ["DATABASE_URL"]
+
+# pool sizing, tune against the stats served at /internal/pool
+DB_POOL_MIN_SIZE = int(os.environ.get("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", "10"))
+# seconds to establish a new connection, and to wait for a free one at checkout
+DB_CONNECT_TIMEOUT = int(os.environ.get("DB_CONNECT_TIMEOUT", "10"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+# seconds an idle connection above min size is kept before being closed
+DB_POOL_MAX_IDLE = float(os.environ.get("DB_POOL_MAX_IDLE", "600"))
+# executions of the same query on a connection before psycopg prepares it server
+# side. psycopg's default of 5 leaves one-off queries alone while the hot paths
+# get prepared within a few requests. Behind pgbouncer in transaction mode a
+# prepared statement can land on another server connection, so set "none" there.
+DB_PREPARE_THRESHOLD = os.environ.get("DB_PREPARE_THRESHOLD", "5")
+
 _pool: Optional[AsyncConnectionPool] = None
 
 
+def connection_kwargs() -> Dict[str, Any]:
+    return {
+        "connect_timeout": DB_CONNECT_TIMEOUT,
+        "prepare_threshold": None if DB_PREPARE_THRESHOLD == "none" else int(DB_PREPARE_THRESHOLD),
+    }
+
+
+async def configure_connection(conn: AsyncConnection) -> None:
+    # set once per physical connection instead of on every checkout
+    conn.row_factory = dict_row  # type: ignore[assignment]
+    conn.cursor_factory = TimedCursor
+
+
 def get_pool() -> AsyncConnectionPool:
+    """
+    The process-wide pool. It is created closed: the app lifespan (or a script)
+    opens it with `open_pool` and closes it with `close_pool`.
+    """
     global _pool
     if _pool is None:
-        _pool = AsyncConnectionPool(DATABASE_URL)
+        _pool = AsyncConnectionPool(
+            DATABASE_URL,
+            min_size=DB_POOL_MIN_SIZE,
+            max_size=DB_POOL_MAX_SIZE,
+            timeout=DB_POOL_TIMEOUT,
+            max_idle=DB_POOL_MAX_IDLE,
+            kwargs=connection_kwargs(),
+            configure=configure_connection,
+            open=False,
+        )
     return _pool
 
 
+async def open_pool() -> AsyncConnectionPool:
+    """
+    Open the pool and wait until `min_size` connections are ready, so the first
+    requests don't pay the connect cost.
+    """
+    pool = get_pool()
+    await pool.open(wait=True, timeout=DB_CONNECT_TIMEOUT)
+    return pool
+
+
+async def close_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+@asynccontextmanager
+async def pool_connection() -> AsyncIterator[AsyncConnection]:
+    """
+    `get_pool().connection()`, with the wait for a free connection recorded as
+    pool time in /metrics and the request's Server-Timing header.
+    """
+    start = time.perf_counter()
+    async with get_pool().connection() as conn:
+        observe_phase("pool", time.perf_counter() - start)
+        yield conn
+
+
 async def connect_to_db() -> AsyncConnection:
-    return await AsyncConnection.connect(DATABASE_URL)
+    return await AsyncConnection.connect(DATABASE_URL, **connection_kwargs())
 
 
 async def get_connection() -> AsyncGenerator[AsyncConnection, None]:
-    pool = get_pool()
-    async with pool.connection() as conn:
-        conn.row_factory = dict_row  # type: ignore[assignment]
+    async with pool_connection() as conn:
         yield conn
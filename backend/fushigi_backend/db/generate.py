@@ -1,31 +1,111 @@
-from typing import List
+from collections import Counter
+from typing import Iterable, Iterator, Tuple
 
 from psycopg import AsyncConnection
-from psycopg.types.json import Json
+from psycopg.rows import dict_row
+from pydantic import BaseModel
 
 from ..data.models import Grammar
 
 
-async def generate_db(conn: AsyncConnection, grammar_data: List[Grammar]) -> None:
-    async with conn.cursor() as cur:
-        for g in grammar_data:
-            await cur.execute(
-                """
-                INSERT INTO grammar
-                    (usage, meaning, level, tags, notes, examples, enhanced_notes)
-                VALUES
-                    (%s, %s, %s, %s, %s, %s, %s)
-                """,
-                (
-                    g.usage,
-                    g.meaning,
-                    g.level,
-                    g.tags,
-                    g.notes,
-                    Json(
-                        [e.model_dump() for e in g.examples]
-                    ),  # like json dumps for jsonb type in db
-                    Json(g.enhanced_notes.model_dump()),  # same
-                ),
+class LoadSummary(BaseModel):
+    inserted: int
+    updated: int
+    unchanged: int
+
+
+def with_variants(grammar_data: Iterable[Grammar]) -> Iterator[Tuple[int, Grammar]]:
+    """
+    Pair each grammar point with its occurrence number among points sharing the
+    same usage and meaning, completing the (usage, meaning, variant) natural key.
+    """
+    seen: Counter = Counter()
+    for g in grammar_data:
+        key = (g.usage, g.meaning)
+        yield seen[key], g
+        seen[key] += 1
+
+
+async def generate_db(conn: AsyncConnection, grammar_data: Iterable[Grammar]) -> LoadSummary:
+    """
+    Bulk load grammar points, safe to rerun.
+
+    Rows are streamed into a temp staging table with binary COPY and merged into
+    `grammar` by natural key in one statement, so the cost is one COPY plus one
+    upsert regardless of catalog size. Rows that already match are left alone,
+    so a rerun with no changes keeps the catalog revision where it was.
+    """
+    async with conn.transaction(), conn.cursor(row_factory=dict_row) as cur:
+        await cur.execute(
+            """
+            CREATE TEMP TABLE grammar_staging (
+                usage TEXT NOT NULL,
+                meaning TEXT NOT NULL,
+                variant SMALLINT NOT NULL,
+                level TEXT,
+                tags TEXT[] NOT NULL,
+                notes TEXT,
+                examples JSONB NOT NULL,
+                enhanced_notes JSONB NOT NULL
+            ) ON COMMIT DROP
+            """
+        )
+        async with cur.copy(
+            """
+            COPY grammar_staging
+                (usage, meaning, variant, level, tags, notes, examples, enhanced_notes)
+            FROM STDIN (FORMAT BINARY)
+            """
+        ) as copy:
+            copy.set_types(["text", "text", "int2", "text", "text[]", "text", "jsonb", "jsonb"])
+            for variant, g in with_variants(grammar_data):
+                await copy.write_row(
+                    (
+                        g.usage,
+                        g.meaning,
+                        variant,
+                        g.level,
+                        g.tags,
+                        g.notes,
+                        [e.model_dump() for e in g.examples],  # dumped as jsonb by set_types
+                        g.enhanced_notes.model_dump(),  # same
+                    )
+                )
+
+        await cur.execute(
+            """
+            WITH upserted AS (
+                INSERT INTO grammar AS g
+                    (usage, meaning, variant, level, tags, notes, examples, enhanced_notes)
+                SELECT usage, meaning, variant, level, tags, notes, examples, enhanced_notes
+                FROM grammar_staging
+                ON CONFLICT (usage, meaning, variant) DO UPDATE SET
+                    level = EXCLUDED.level,
+                    tags = EXCLUDED.tags,
+                    notes = EXCLUDED.notes,
+                    examples = EXCLUDED.examples,
+                    enhanced_notes = EXCLUDED.enhanced_notes
+                WHERE (g.level, g.tags, g.notes, g.examples, g.enhanced_notes)
+                    IS DISTINCT FROM
+                    (EXCLUDED.level, EXCLUDED.tags, EXCLUDED.notes, EXCLUDED.examples, EXCLUDED.enhanced_notes)
+                RETURNING (xmax = 0) AS inserted  -- xmax is only 0 for freshly inserted rows
             )
-        await conn.commit()
+            SELECT
+                (SELECT COUNT(*) FROM grammar_staging) AS staged,
+                COUNT(*) FILTER (WHERE inserted) AS inserted,
+                COUNT(*) FILTER (WHERE NOT inserted) AS updated
+            FROM upserted
+            """
+        )
+        counts = await cur.fetchone()
+        assert counts is not None
+        summary = LoadSummary(
+            inserted=counts["inserted"],
+            updated=counts["updated"],
+            unchanged=counts["staged"] - counts["inserted"] - counts["updated"],
+        )
+        # no revision bump here: the grammar triggers bump catalog_revision
+        # once for this transaction if any row changed, which is what tells
+        # running API processes and syncing clients the catalog moved
+
+    return summary
@@ -0,0 +1,83 @@
+from typing import Dict, List, Sequence
+from uuid import UUID
+
+from psycopg import AsyncConnection
+from psycopg.rows import dict_row
+
+from ..data.models import JournalEntryImport, JournalImportResult
+
+# The batch goes in as parallel arrays: one statement, one round trip, however
+# many entries. Keys that already exist for the user are skipped by the unique
+# index and reported with their stored id, so replaying a batch is a no-op.
+IMPORT_QUERY = """
+    WITH incoming AS (
+        SELECT *
+        FROM unnest(
+            %(keys)s::uuid[], %(titles)s::text[], %(contents)s::text[],
+            %(private)s::boolean[], %(created_at)s::timestamptz[]
+        ) WITH ORDINALITY AS t(idempotency_key, title, content, private, created_at, ord)
+    ),
+    inserted AS (
+        INSERT INTO journal_entry (user_id, idempotency_key, title, content, private, created_at)
+        SELECT %(user_id)s, idempotency_key, title, content, private, COALESCE(created_at, CURRENT_TIMESTAMP)
+        FROM incoming
+        ORDER BY ord
+        ON CONFLICT (user_id, idempotency_key) DO NOTHING
+        RETURNING id, idempotency_key
+    )
+    SELECT i.idempotency_key, COALESCE(n.id, e.id) AS id, n.id IS NOT NULL AS created
+    FROM incoming i
+    LEFT JOIN inserted n USING (idempotency_key)
+    LEFT JOIN journal_entry e
+      ON e.user_id = %(user_id)s AND e.idempotency_key = i.idempotency_key
+    ORDER BY i.ord
+"""
+
+# a concurrent request holding the same keys commits after our statement's
+# snapshot was taken; look those ids up again in a fresh snapshot
+LOOKUP_QUERY = """
+    SELECT idempotency_key, id
+    FROM journal_entry
+    WHERE user_id = %(user_id)s AND idempotency_key = ANY(%(keys)s::uuid[])
+"""
+
+
+async def import_journal_entries(
+    conn: AsyncConnection,
+    user_id: int,
+    entries: Sequence[JournalEntryImport],
+) -> List[JournalImportResult]:
+    """
+    Insert a batch of offline journal entries, skipping any whose idempotency
+    key the user has already sent.
+
+    Args:
+        conn: connection to write with, committed on success
+        user_id: owner of the entries
+        entries: entries with distinct idempotency keys
+
+    Returns:
+        one result per entry, in request order, with the entry's id and
+        whether this call created it
+    """
+    params = {
+        "user_id": user_id,
+        "keys": [e.idempotency_key for e in entries],
+        "titles": [e.title for e in entries],
+        "contents": [e.content for e in entries],
+        "private": [e.private for e in entries],
+        "created_at": [e.created_at for e in entries],
+    }
+    async with conn.transaction(), conn.cursor(row_factory=dict_row) as cur:
+        await cur.execute(IMPORT_QUERY, params)
+        rows = await cur.fetchall()
+
+        racing = [row["idempotency_key"] for row in rows if row["id"] is None]
+        if racing:
+            await cur.execute(LOOKUP_QUERY, {"user_id": user_id, "keys": racing})
+            found: Dict[UUID, int] = {row["idempotency_key"]: row["id"] for row in await cur.fetchall()}
+            for row in rows:
+                if row["id"] is None:
+                    row["id"] = found[row["idempotency_key"]]
+
+    return [JournalImportResult(**row) for row in rows]
@@ -0,0 +1,77 @@
+from typing import List, Sequence, Tuple
+
+from psycopg import AsyncConnection
+from psycopg.rows import dict_row
+
+from ..catalog.matcher import GrammarMatcher, segment_sentences
+
+
+async def tag_journal_entries(
+    conn: AsyncConnection,
+    matcher: GrammarMatcher,
+    entries: Sequence[Tuple[int, str]],
+) -> int:
+    """
+    Split journal entries into sentences and record which grammar points each
+    sentence uses, replacing any earlier tagging of the same entries.
+
+    All entries are written together: sentence ids are reserved up front so
+    sentences and their tags each go in with one multi-row INSERT.
+
+    Args:
+        conn: connection to write with, committed on success
+        matcher: compiled grammar matcher from the current catalog
+        entries: (journal_entry_id, content) pairs
+
+    Returns:
+        number of grammar tags written
+    """
+    entry_ids: List[int] = []
+    sentences: List[str] = []
+    for entry_id, content in entries:
+        for sentence in segment_sentences(content):
+            entry_ids.append(entry_id)
+            sentences.append(sentence)
+
+    async with conn.transaction(), conn.cursor(row_factory=dict_row) as cur:
+        touched = [entry_id for entry_id, _ in entries]
+        await cur.execute(
+            """
+            DELETE FROM tagged_sentence
+            WHERE sentence_id IN (SELECT id FROM sentence WHERE journal_entry_id = ANY(%s))
+            """,
+            (touched,),
+        )
+        await cur.execute("DELETE FROM sentence WHERE journal_entry_id = ANY(%s)", (touched,))
+        if not sentences:
+            return 0
+
+        await cur.execute(
+            "SELECT nextval(pg_get_serial_sequence('sentence', 'id')) AS id FROM generate_series(1, %s)",
+            (len(sentences),),
+        )
+        sentence_ids = [row["id"] for row in await cur.fetchall()]
+        await cur.execute(
+            """
+            INSERT INTO sentence (id, journal_entry_id, content)
+            SELECT * FROM unnest(%s::int[], %s::int[], %s::text[])
+            """,
+            (sentence_ids, entry_ids, sentences),
+        )
+
+        tagged_sentence_ids: List[int] = []
+        tagged_grammar_ids: List[int] = []
+        for sentence_id, sentence in zip(sentence_ids, sentences):
+            for grammar_id in matcher.match(sentence):
+                tagged_sentence_ids.append(sentence_id)
+                tagged_grammar_ids.append(grammar_id)
+        if tagged_sentence_ids:
+            await cur.execute(
+                """
+                INSERT INTO tagged_sentence (sentence_id, grammar_id)
+                SELECT * FROM unnest(%s::int[], %s::int[])
+                """,
+                (tagged_sentence_ids, tagged_grammar_ids),
+            )
+
+    return len(tagged_sentence_ids)
@@ -0,0 +1,35 @@
+import time
+from typing import Any, Iterable, Optional
+
+from psycopg import AsyncCursor
+from psycopg.abc import Params, Query
+from psycopg.rows import Row
+
+from ..metrics import observe_query
+
+
+class TimedCursor(AsyncCursor[Row]):
+    """
+    Client-side cursor that reports every statement's duration to /metrics and
+    to the current request's Server-Timing "db" phase. Client-side cursors
+    fetch the whole result inside execute(), so that is where the time goes.
+    """
+
+    async def execute(self, query: Query, params: Optional[Params] = None, **kwargs: Any) -> "TimedCursor[Row]":
+        start = time.perf_counter()
+        failed = True
+        try:
+            await super().execute(query, params, **kwargs)  # type: ignore[arg-type]
+            failed = False
+            return self
+        finally:
+            observe_query(query, time.perf_counter() - start, failed)
+
+    async def executemany(self, query: Query, params_seq: Iterable[Params], **kwargs: Any) -> None:
+        start = time.perf_counter()
+        failed = True
+        try:
+            await super().executemany(query, params_seq, **kwargs)
+            failed = False
+        finally:
+            observe_query(query, time.perf_counter() - start, failed)
@@ -0,0 +1,94 @@
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Any, Awaitable, Callable, Dict
+
+from psycopg.rows import dict_row
+
+from ..catalog.cache import catalog
+from ..data.load import load_defaults
+from ..db.connect import pool_connection
+from ..db.generate import generate_db
+from ..db.tagging import tag_journal_entries
+from ..srs.queue import materialize_daily_queues
+from .queue import enqueue
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+HANDLERS: Dict[str, Handler] = {}
+
+# local time the next day's SRS queues are built, before anyone asks for them
+QUEUE_BUILD_TIME = time(0, 5)
+
+
+class PermanentJobError(Exception):
+    """
+    Raised by a handler when retrying can't help, e.g. a malformed payload.
+    """
+
+
+def handler(kind: str) -> Callable[[Handler], Handler]:
+    def register(fn: Handler) -> Handler:
+        HANDLERS[kind] = fn
+        return fn
+
+    return register
+
+
+@handler("tag_journal_entries")
+async def run_tag_journal_entries(payload: Dict[str, Any]) -> None:
+    """
+    Split new journal entries into sentences and tag their grammar.
+    payload: {"entry_ids": [int, ...]}
+    """
+    entry_ids = payload.get("entry_ids")
+    if not isinstance(entry_ids, list):
+        raise PermanentJobError("payload needs entry_ids")
+    snapshot = await catalog.get()
+    async with pool_connection() as conn:
+        async with conn.cursor(row_factory=dict_row) as cur:
+            # read the content now rather than carrying it in the payload
+            await cur.execute("SELECT id, content FROM journal_entry WHERE id = ANY(%s)", (entry_ids,))
+            entries = [(row["id"], row["content"]) for row in await cur.fetchall()]
+        tags = await tag_journal_entries(conn, snapshot.matcher, entries)
+    logger.info("Tagged %s grammar uses in %s journal entries", tags, len(entries))
+
+
+@handler("reload_catalog")
+async def run_reload_catalog(payload: Dict[str, Any]) -> None:
+    """
+    Load grammar.json (or its snapshot) into the grammar table, as tools_main.
+    API processes pick the new revision up on their next catalog check.
+    """
+    async with pool_connection() as conn:
+        summary = await generate_db(conn, load_defaults())
+    catalog.invalidate()
+    logger.info(
+        "Reloaded grammar catalog (%s inserted, %s updated, %s unchanged)",
+        summary.inserted,
+        summary.updated,
+        summary.unchanged,
+    )
+
+
+@handler("materialize_daily_queues")
+async def run_materialize_daily_queues(payload: Dict[str, Any]) -> None:
+    """
+    Build a day's SRS queues ahead of the morning spike, then schedule the
+    next day's run. payload: {"day": "YYYY-MM-DD"} (default today)
+    """
+    day = date.fromisoformat(payload["day"]) if "day" in payload else date.today()
+    snapshot = await catalog.get()
+    async with pool_connection() as conn:
+        built = await materialize_daily_queues(conn, snapshot.sampler, day)
+        next_day = day + timedelta(days=1)
+        # the key makes overlapping schedules (or a rerun of this job) harmless
+        await enqueue(
+            conn,
+            "materialize_daily_queues",
+            {"day": next_day.isoformat()},
+            run_at=datetime.combine(next_day, QUEUE_BUILD_TIME).astimezone(),
+            dedupe_key=f"materialize_daily_queues:{next_day.isoformat()}",
+        )
+    logger.info("Built %s daily review queues for %s", built, day)
@@ -0,0 +1,156 @@
+import random
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from psycopg import AsyncConnection
+from psycopg.rows import dict_row
+from psycopg.types.json import Jsonb
+from pydantic import BaseModel
+
+# retry delays grow 10s, 20s, 40s, ... up to an hour, with jitter so a burst
+# of failures doesn't come back as a burst
+RETRY_BASE_SECONDS = 10.0
+RETRY_MAX_SECONDS = 3600.0
+
+
+class Job(BaseModel):
+    id: int
+    kind: str
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+
+
+async def enqueue(
+    conn: AsyncConnection,
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    *,
+    run_at: Optional[datetime] = None,
+    dedupe_key: Optional[str] = None,
+    max_attempts: int = 5,
+) -> Optional[int]:
+    """
+    Queue a job for the worker. Runs in the caller's transaction, so a job
+    enqueued next to the write it follows up on exists only if that commits.
+
+    Args:
+        conn: connection to insert with
+        kind: handler name, see `jobs.handlers`
+        payload: JSON arguments for the handler
+        run_at: don't start before this time (default: now)
+        dedupe_key: skip if an unfinished job with this key already exists
+        max_attempts: runs before the job is marked failed
+
+    Returns:
+        the job id, or None when deduplicated
+    """
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await cur.execute(
+            """
+            INSERT INTO job (kind, payload, run_at, dedupe_key, max_attempts)
+            VALUES (%s, %s, COALESCE(%s, CURRENT_TIMESTAMP), %s, %s)
+            ON CONFLICT (dedupe_key) WHERE status IN ('queued', 'running') DO NOTHING
+            RETURNING id
+            """,
+            (kind, Jsonb(payload or {}), run_at, dedupe_key, max_attempts),
+        )
+        row = await cur.fetchone()
+    return None if row is None else row["id"]
+
+
+async def claim_jobs(conn: AsyncConnection, limit: int, visibility_timeout: float) -> List[Job]:
+    """
+    Take up to `limit` runnable jobs. SKIP LOCKED lets any number of workers
+    claim concurrently without waiting on each other. Claimed jobs stay
+    hidden for `visibility_timeout` seconds; one not finished by then (its
+    worker died) is handed out again.
+    """
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await cur.execute(
+            """
+            UPDATE job SET
+                status = 'running',
+                attempts = attempts + 1,
+                run_at = CURRENT_TIMESTAMP + make_interval(secs => %s)
+            WHERE id IN (
+                SELECT id
+                FROM job
+                WHERE status IN ('queued', 'running')
+                  AND run_at <= CURRENT_TIMESTAMP
+                  AND attempts < max_attempts
+                ORDER BY run_at
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, kind, payload, attempts, max_attempts
+            """,
+            (visibility_timeout, limit),
+        )
+        rows = await cur.fetchall()
+    await conn.commit()
+    return [Job(**row) for row in rows]
+
+
+async def complete_job(conn: AsyncConnection, job: Job) -> None:
+    # matching attempts too: if the job timed out and was claimed again, the
+    # newer run owns it
+    await conn.execute(
+        """
+        UPDATE job SET status = 'done', finished_at = CURRENT_TIMESTAMP, last_error = NULL
+        WHERE id = %s AND attempts = %s
+        """,
+        (job.id, job.attempts),
+    )
+    await conn.commit()
+
+
+def retry_delay(attempts: int) -> float:
+    delay = min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+async def fail_job(conn: AsyncConnection, job: Job, error: str, retry: bool = True) -> None:
+    """
+    Record a failed run: back to the queue after a backoff, or failed for good
+    once attempts are used up (or `retry` is False).
+    """
+    if retry and job.attempts < job.max_attempts:
+        await conn.execute(
+            """
+            UPDATE job SET
+                status = 'queued',
+                run_at = CURRENT_TIMESTAMP + make_interval(secs => %s),
+                last_error = %s
+            WHERE id = %s AND attempts = %s
+            """,
+            (retry_delay(job.attempts), error, job.id, job.attempts),
+        )
+    else:
+        await conn.execute(
+            """
+            UPDATE job SET status = 'failed', finished_at = CURRENT_TIMESTAMP, last_error = %s
+            WHERE id = %s AND attempts = %s
+            """,
+            (error, job.id, job.attempts),
+        )
+    await conn.commit()
+
+
+async def reap_jobs(conn: AsyncConnection, keep_days: int) -> None:
+    """
+    Fail jobs whose last attempt timed out, and forget finished jobs older
+    than `keep_days`.
+    """
+    await conn.execute(
+        """
+        UPDATE job SET status = 'failed', finished_at = CURRENT_TIMESTAMP,
+            last_error = COALESCE(last_error, 'visibility timeout expired')
+        WHERE status = 'running' AND run_at <= CURRENT_TIMESTAMP AND attempts >= max_attempts
+        """
+    )
+    await conn.execute(
+        "DELETE FROM job WHERE status = 'done' AND finished_at < CURRENT_TIMESTAMP - make_interval(days => %s)",
+        (keep_days,),
+    )
+    await conn.commit()
@@ -0,0 +1,171 @@
+"""
+Background job worker: claims jobs from the `job` table and runs their
+handlers (see jobs/handlers.py). Run as many processes as the load needs;
+SKIP LOCKED keeps them from claiming the same job.
+
+    uv run python -m fushigi_backend.jobs.worker --concurrency 4
+    uv run python -m fushigi_backend.jobs.worker --enqueue reload_catalog
+    uv run python -m fushigi_backend.jobs.worker --enqueue materialize_daily_queues --payload '{"day": "2025-09-01"}'
+
+SIGTERM or SIGINT stops claiming and waits for running jobs to finish.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import time
+from typing import Callable, Dict, Optional, Set
+
+from psycopg_pool import AsyncConnectionPool
+
+from ..db.connect import close_pool, get_pool, open_pool
+from .handlers import HANDLERS, Handler, PermanentJobError
+from .queue import Job, claim_jobs, complete_job, enqueue, fail_job, reap_jobs
+
+logger = logging.getLogger(__name__)
+
+JOB_CONCURRENCY = int(os.environ.get("JOB_CONCURRENCY", "4"))
+# seconds a claimed job stays hidden from other workers; handlers are cut off
+# at this point so a job is never run twice at once
+JOB_VISIBILITY_TIMEOUT = float(os.environ.get("JOB_VISIBILITY_TIMEOUT", "300"))
+# seconds between polls while the queue is empty
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", "1"))
+# days finished jobs are kept, and seconds between clean-ups
+JOB_KEEP_DAYS = int(os.environ.get("JOB_KEEP_DAYS", "7"))
+REAP_INTERVAL = 300.0
+
+
+class Worker:
+    def __init__(
+        self,
+        concurrency: int = JOB_CONCURRENCY,
+        visibility_timeout: float = JOB_VISIBILITY_TIMEOUT,
+        poll_interval: float = JOB_POLL_INTERVAL,
+        handlers: Optional[Dict[str, Handler]] = None,
+        pool_factory: Callable[[], AsyncConnectionPool] = get_pool,
+    ) -> None:
+        self.concurrency = concurrency
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+        self.handlers = HANDLERS if handlers is None else handlers
+        self.pool_factory = pool_factory
+        self.running: Set[asyncio.Task[None]] = set()
+
+    async def run_job(self, job: Job) -> None:
+        start = time.perf_counter()
+        error: Optional[str] = None
+        retry = True
+        try:
+            fn = self.handlers.get(job.kind)
+            if fn is None:
+                raise PermanentJobError(f"no handler for {job.kind!r}")
+            await asyncio.wait_for(fn(job.payload), timeout=self.visibility_timeout)
+        except PermanentJobError as e:
+            error, retry = str(e), False
+        except asyncio.TimeoutError:
+            error = f"timed out after {self.visibility_timeout:.0f}s"
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+            error = f"{type(e).__name__}: {e}"
+
+        try:
+            async with self.pool_factory().connection() as conn:
+                if error is None:
+                    await complete_job(conn, job)
+                else:
+                    await fail_job(conn, job, error, retry=retry)
+        except Exception:
+            # the visibility timeout hands the job out again
+            logger.exception("Could not record the result of job %s", job.id)
+        logger.info(
+            "Job %s (%s) attempt %s %s in %.2fs",
+            job.id,
+            job.kind,
+            job.attempts,
+            "done" if error is None else f"failed: {error}",
+            time.perf_counter() - start,
+        )
+
+    async def claim(self) -> int:
+        free = self.concurrency - len(self.running)
+        if free <= 0:
+            return 0
+        async with self.pool_factory().connection() as conn:
+            jobs = await claim_jobs(conn, free, self.visibility_timeout)
+        for job in jobs:
+            task = asyncio.create_task(self.run_job(job))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+        return len(jobs)
+
+    async def run(self, stop: asyncio.Event) -> None:
+        reaped_at = 0.0
+        while not stop.is_set():
+            claimed = 0
+            try:
+                if time.monotonic() - reaped_at > REAP_INTERVAL:
+                    async with self.pool_factory().connection() as conn:
+                        await reap_jobs(conn, JOB_KEEP_DAYS)
+                    reaped_at = time.monotonic()
+                claimed = await self.claim()
+            except Exception:
+                logger.exception("Failed to claim jobs")
+
+            # a full claim means more may be waiting; otherwise idle until the next poll
+            if claimed == 0 or len(self.running) >= self.concurrency:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+        if self.running:
+            logger.info("Waiting for %s running jobs", len(self.running))
+            await asyncio.gather(*self.running, return_exceptions=True)
+
+
+async def run_worker(concurrency: int, visibility_timeout: float, poll_interval: float) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await open_pool()
+    try:
+        logger.info("Worker started, %s concurrent jobs, handlers: %s", concurrency, ", ".join(sorted(HANDLERS)))
+        await Worker(concurrency, visibility_timeout, poll_interval).run(stop)
+    finally:
+        await close_pool()
+    logger.info("Worker stopped")
+
+
+async def enqueue_one(kind: str, payload: Dict) -> None:
+    await open_pool()
+    try:
+        async with get_pool().connection() as conn:
+            job_id = await enqueue(conn, kind, payload)
+    finally:
+        await close_pool()
+    print(f"Enqueued {kind} as job {job_id}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=JOB_CONCURRENCY, help="jobs run at once")
+    parser.add_argument("--visibility-timeout", type=float, default=JOB_VISIBILITY_TIMEOUT)
+    parser.add_argument("--poll-interval", type=float, default=JOB_POLL_INTERVAL)
+    parser.add_argument("--enqueue", metavar="KIND", choices=sorted(HANDLERS), help="queue one job and exit")
+    parser.add_argument("--payload", type=json.loads, default={}, help="JSON payload for --enqueue")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if args.enqueue:
+        asyncio.run(enqueue_one(args.enqueue, args.payload))
+    else:
+        asyncio.run(run_worker(args.concurrency, args.visibility_timeout, args.poll_interval))
+
+
+if __name__ == "__main__":
+    main()
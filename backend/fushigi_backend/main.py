@@ -1,12 +1,42 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from .catalog.cache import catalog
+from .db.connect import close_pool, open_pool
+from .metrics import TimingMiddleware
 from .routes.grammar import router as grammar_router
+from .routes.internal import router as internal_router
 from .routes.journal import router as journal_router
+from .routes.metrics import router as metrics_router
+from .routes.srs import router as srs_router
+from .srs.review_log import review_log
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # warm the pool and the grammar catalog so the first request doesn't pay for them
+    await open_pool()
+    try:
+        await catalog.get()
+        review_log.start()
+        try:
+            yield
+        finally:
+            # write out buffered reviews while the pool is still open
+            await review_log.stop()
+    finally:
+        await close_pool()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.include_router(journal_router)
 app.include_router(grammar_router)
+app.include_router(srs_router)
+app.include_router(internal_router)
+app.include_router(metrics_router)
 
 app.add_middleware(
     CORSMiddleware,
@@ -14,4 +44,6 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+app.add_middleware(TimingMiddleware)
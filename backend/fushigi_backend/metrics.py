@@ -0,0 +1,143 @@
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from prometheus_client import Counter, Histogram
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# sub-millisecond resolution for single statements and pool checkouts
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from request to the last response byte, by route template and status",
+    ["method", "route", "status"],
+)
+QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "Time per SQL statement, by verb and main table",
+    ["statement"],
+    buckets=FAST_BUCKETS,
+)
+QUERY_ERRORS = Counter("db_query_errors_total", "SQL statements that raised", ["statement"])
+POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    buckets=FAST_BUCKETS,
+)
+SERIALIZATION = Histogram(
+    "serialization_duration_seconds",
+    "Time spent encoding response bodies",
+    buckets=FAST_BUCKETS,
+)
+
+PHASE_HISTOGRAMS = {"pool": POOL_WAIT, "serialize": SERIALIZATION}
+
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+STATEMENT_VERB = re.compile(r"^\s*(\w+)")
+STATEMENT_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|COPY)\s+([\w.]+)", re.IGNORECASE)
+
+
+def statement_label(query: Any) -> str:
+    """
+    Low cardinality name for a statement: its verb and first table, e.g.
+    "SELECT srs". Queries built with psycopg.sql are reported as "composed".
+    """
+    if isinstance(query, bytes):
+        query = query.decode(errors="replace")
+    if not isinstance(query, str):
+        return "composed"
+    verb = STATEMENT_VERB.match(query)
+    table = STATEMENT_TABLE.search(query)
+    return " ".join(m.group(1) for m in (verb, table) if m).upper() if verb else "unknown"
+
+
+def add_timing(phase: str, seconds: float) -> None:
+    timings = _timings.get()
+    if timings is not None:
+        timings[phase] = timings.get(phase, 0.0) + seconds
+
+
+def observe_query(query: Any, seconds: float, failed: bool = False) -> None:
+    label = statement_label(query)
+    QUERY_LATENCY.labels(label).observe(seconds)
+    if failed:
+        QUERY_ERRORS.labels(label).inc()
+    add_timing("db", seconds)
+
+
+def observe_phase(phase: str, seconds: float) -> None:
+    """
+    Count time towards the current request's `phase` ("pool" or "serialize")
+    and that phase's histogram.
+    """
+    PHASE_HISTOGRAMS[phase].observe(seconds)
+    add_timing(phase, seconds)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_phase(phase, time.perf_counter() - start)
+
+
+def server_timing(timings: Dict[str, float], total: float) -> str:
+    parts = [f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in timings.items()]
+    return ", ".join(parts + [f"total;dur={total * 1000:.2f}"])
+
+
+class TimingMiddleware:
+    """
+    Records request latency per route template and status, and adds a
+    `Server-Timing` header splitting the time spent before the response
+    started into db, pool and serialize phases.
+
+    Plain ASGI rather than BaseHTTPMiddleware so streaming responses pass
+    through untouched.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        token = _timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+        recorded = False
+
+        def record() -> None:
+            nonlocal recorded
+            if not recorded:
+                recorded = True
+                # the route template keeps label cardinality bounded, raw paths would not
+                route = getattr(scope.get("route"), "path", "unmatched")
+                REQUEST_LATENCY.labels(scope["method"], route, str(status)).observe(time.perf_counter() - start)
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers: List[Any] = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(timings, time.perf_counter() - start).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                # stop the clock once the body is out, before any background tasks run
+                record()
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
+            record()
@@ -1,45 +1,269 @@
-from typing import List, Optional
+import bisect
+import json
+from typing import AsyncIterator, FrozenSet, List, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from psycopg import AsyncConnection
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from psycopg.errors import DatabaseError
-from psycopg.rows import dict_row
 
-from ..data.models import GrammarInDB
-from ..db.connect import get_connection
+from ..catalog.cache import CatalogSnapshot, catalog
+from ..catalog.facets import TagMatch
+from ..data.models import GrammarChanges, GrammarFacets, GrammarInDB, GrammarProjection, GrammarSummary
+from .pagination import (
+    MAX_PAGE_SIZE,
+    NDJSON,
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+    wants_ndjson,
+)
 
 router = APIRouter(prefix="/api/grammar", tags=["grammar"])
 
+STREAM_CHUNK_SIZE = 500
 
-@router.get("", response_model=List[GrammarInDB])
-async def list_grammar(
-    conn: AsyncConnection = Depends(get_connection),
-    limit: Optional[bool] = False
-) -> List[GrammarInDB]:
+GRAMMAR_FIELDS = frozenset(GrammarInDB.model_fields)
+# `fields=summary`: what the table views show
+SUMMARY_FIELDS = frozenset(GrammarSummary.model_fields)
 
-    params: dict = {}
-    if limit:
-        query = f"""
-                SELECT id, usage, meaning, level, tags, notes, examples, enhanced_notes
-                FROM grammar
-                ORDER BY RANDOM()
-                LIMIT 5
-            """  # noqa: F541
-    else:
-        query = f"""
-            SELECT id, usage, meaning, level, tags, notes, examples, enhanced_notes
-            FROM grammar
-            ORDER BY id
-        """  # noqa: F541
 
+async def get_snapshot() -> CatalogSnapshot:
     try:
-        async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(query, params)
-            rows = await cur.fetchall()
+        return await catalog.get()
     except DatabaseError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Database error: {e}",
         )
 
-    return [GrammarInDB.model_validate(row) for row in rows]
+
+def split_csv(value: Optional[str]) -> List[str]:
+    return [part.strip() for part in value.split(",") if part.strip()] if value else []
+
+
+def parse_fields(value: Optional[str]) -> Optional[FrozenSet[str]]:
+    """
+    Field set for `fields=`, always including id; None means every field.
+    """
+    parts = split_csv(value)
+    if not parts:
+        return None
+    fields = set(SUMMARY_FIELDS) if "summary" in parts else set()
+    fields.update(part for part in parts if part != "summary")
+    unknown = fields - GRAMMAR_FIELDS
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+        )
+    fields.add("id")
+    return None if fields == GRAMMAR_FIELDS else frozenset(fields)
+
+
+def parse_ids(value: str) -> List[int]:
+    try:
+        ids = sorted({int(part) for part in split_csv(value)})
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids must be integers")
+    if len(ids) > MAX_PAGE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_PAGE_SIZE} ids per request",
+        )
+    return ids
+
+
+def contains_id(ids: List[int], grammar_id: int) -> bool:
+    # snapshot lists are in id order
+    i = bisect.bisect_left(ids, grammar_id)
+    return i < len(ids) and ids[i] == grammar_id
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # weak comparison, as for any GET
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def accepts_gzip(request: Request) -> bool:
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.partition(";")
+        if coding.strip().lower() == "gzip":
+            q = params.replace(" ", "").removeprefix("q=")
+            try:
+                return not q or float(q) > 0
+            except ValueError:
+                return False
+    return False
+
+
+def full_list_response(request: Request, snapshot: CatalogSnapshot) -> Response:
+    """
+    The whole catalog, gzipped when the client takes it, or a bodiless 304 when
+    the client's copy is still current.
+    """
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(request, snapshot.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if accepts_gzip(request):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=snapshot.payload_gzip, media_type="application/json", headers=headers)
+    return Response(content=snapshot.payload, media_type="application/json", headers=headers)
+
+
+async def stream_grammar(
+    snapshot: CatalogSnapshot,
+    entries: List[GrammarInDB],
+    fields: Optional[FrozenSet[str]] = None,
+) -> AsyncIterator[bytes]:
+    for start in range(0, len(entries), STREAM_CHUNK_SIZE):
+        yield snapshot.encode_lines(entries[start : start + STREAM_CHUNK_SIZE], fields)
+
+
+@router.get("", response_model=Union[List[GrammarInDB], List[GrammarProjection]])
+async def list_grammar(
+    request: Request,
+    limit: Optional[bool] = False,
+    seed: Optional[int] = None,
+    tags: Optional[str] = None,
+    level: Optional[str] = None,
+    match: TagMatch = "all",
+    after: Optional[str] = None,
+    page_size: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    ids: Optional[str] = None,
+    fields: Optional[str] = None,
+) -> Response:
+    """
+    Grammar points in id order. `tags` and `level` take comma separated values;
+    `match=any` keeps points with any of the tags instead of all of them, and
+    `ids` limits the list to the given points (unknown ids are skipped). Pass
+    `page_size` to page, then send the `X-Next-Cursor` header back as `after`
+    for the following page. Ask for `Accept: application/x-ndjson` to stream
+    instead. `limit=true` returns five random points instead. The unfiltered
+    list carries an ETag; send it back as `If-None-Match` to get a 304 when
+    the catalog hasn't changed.
+
+    `fields` picks the fields returned, comma separated; `fields=summary` is
+    id, usage, meaning, level and tags, without the notes and examples. A
+    projected list only carries the requested fields of `GrammarProjection`.
+    """
+    snapshot = await get_snapshot()
+    projection = parse_fields(fields)
+
+    if limit:
+        # five random grammar points, optionally reproducible and filtered; the
+        # snapshot keeps each filter's ids, so a repeated draw stays O(k)
+        within: Optional[List[int]] = None
+        if tags or level:
+            within = snapshot.facets.ids(split_csv(tags), split_csv(level), match)
+        if ids is not None:
+            requested = [i for i in parse_ids(ids) if i in snapshot.by_id]
+            within = requested if within is None else [i for i in requested if contains_id(within, i)]
+        sample = snapshot.sampler.sample(5, seed=seed, within=within)
+        return Response(
+            content=snapshot.encode([snapshot.by_id[i] for i in sample], projection),
+            media_type="application/json",
+        )
+
+    filtered: Optional[List[GrammarInDB]] = None
+    if ids is not None:
+        filtered = [snapshot.by_id[i] for i in parse_ids(ids) if i in snapshot.by_id]
+    if tags or level:
+        bits = snapshot.facets.filter(split_csv(tags), split_csv(level), match)
+        members = snapshot.facets.members(bits)
+        if filtered is None:
+            filtered = members
+        else:
+            keep = {g.id for g in members}
+            filtered = [g for g in filtered if g.id in keep]
+
+    after_id: Optional[int] = None
+    if after is not None:
+        (after_id,) = decode_cursor(after, 1)
+        if not isinstance(after_id, int):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    if wants_ndjson(request):
+        return StreamingResponse(
+            stream_grammar(snapshot, snapshot.page(after_id, None, filtered), projection),
+            media_type=NDJSON,
+        )
+
+    if after_id is None and page_size is None and filtered is None and projection is None:
+        return full_list_response(request, snapshot)
+
+    # one extra entry tells us whether there is a next page
+    entries = snapshot.page(after_id, None if page_size is None else page_size + 1, filtered)
+    headers = {}
+    if page_size is not None and len(entries) > page_size:
+        entries = entries[:page_size]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(entries[-1].id)
+
+    return Response(content=snapshot.encode(entries, projection), media_type="application/json", headers=headers)
+
+
+@router.get("/changes", response_model=GrammarChanges)
+async def grammar_changes(since: int = Query(..., ge=0)) -> Response:
+    """
+    Delta sync: grammar points added or changed and ids deleted after catalog
+    revision `since`. Keep the returned `revision` for the next call; start
+    from `since=0` to get everything. With nothing new the reply is a few bytes.
+    `reset` means the client is ahead of this catalog (e.g. it was rebuilt) and
+    should replace its copy with `upserts`.
+    """
+    snapshot = await get_snapshot()
+    reset = since > snapshot.revision
+    upserts, deleted = (snapshot.entries, []) if reset else snapshot.changes_since(since)
+    content = b'{"revision":%d,"reset":%s,"upserts":%s,"deleted":%s}' % (
+        snapshot.revision,
+        b"true" if reset else b"false",
+        snapshot.encode(upserts),
+        json.dumps(deleted).encode(),
+    )
+    return Response(content=content, media_type="application/json")
+
+
+@router.get("/facets", response_model=GrammarFacets)
+async def grammar_facets(
+    tags: Optional[str] = None,
+    level: Optional[str] = None,
+    match: TagMatch = "all",
+) -> GrammarFacets:
+    """
+    How many grammar points carry each tag and level within the current filter,
+    using the same `tags`/`level`/`match` parameters as the list.
+    """
+    snapshot = await get_snapshot()
+    bits = snapshot.facets.filter(split_csv(tags), split_csv(level), match)
+    counts = snapshot.facets.counts(bits)
+    return GrammarFacets(total=bits.bit_count(), tags=counts["tags"], levels=counts["levels"])
+
+
+@router.get("/search", response_model=List[GrammarInDB])
+async def search_grammar(
+    q: str,
+    limit: int = Query(20, ge=1, le=100),
+) -> Response:
+    """
+    Ranked fuzzy search over usage, meaning and example sentences/romaji, served
+    from an in-memory index so it can back search-as-you-type.
+    """
+    snapshot = await get_snapshot()
+    return Response(content=snapshot.encode(snapshot.search.search(q, limit=limit)), media_type="application/json")
+
+
+# declared last so it doesn't shadow /changes, /facets and /search
+@router.get("/{grammar_id}", response_model=GrammarInDB)
+async def get_grammar(grammar_id: int) -> Response:
+    """
+    One grammar point with its notes and examples, for loading detail on demand
+    next to a `fields=summary` list.
+    """
+    snapshot = await get_snapshot()
+    encoded = snapshot.encoded.get(grammar_id)
+    if encoded is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Grammar point not found")
+    return Response(content=encoded, media_type="application/json")
@@ -0,0 +1,19 @@
+from typing import Dict
+
+from fastapi import APIRouter
+
+from ..db.connect import get_pool
+
+router = APIRouter(prefix="/internal", tags=["internal"], include_in_schema=False)
+
+
+@router.get("/pool")
+async def pool_stats() -> Dict[str, int]:
+    """
+    Connection pool gauges and counters since startup, as reported by
+    psycopg_pool: `requests_waiting` is the current queue for a connection,
+    `requests_wait_ms`/`requests_queued` give the average checkout wait,
+    `usage_ms` the time connections spent checked out, and
+    `connections_errors`/`connections_lost` count failed and broken connections.
+    """
+    return get_pool().get_stats()
@@ -1,33 +1,55 @@
-from typing import List
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from psycopg import AsyncConnection
 from psycopg.errors import DatabaseError
 from psycopg.rows import dict_row
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 from ..data.models import (
     JournalEntry,
     JournalEntryInDB,
+    JournalImportBatch,
+    JournalImportResult,
 )
-from ..db.connect import get_connection
-
+from ..db.connect import get_connection, pool_connection
+from ..db.journal import import_journal_entries
+from ..jobs.queue import enqueue
+from .encoding import encode_row_lines, encode_rows
+from .pagination import (
+    MAX_PAGE_SIZE,
+    NDJSON,
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+    wants_ndjson,
+)
+from .users import get_current_user_id
 
 router = APIRouter(prefix="/api/journal", tags=["journal"])
 
 class ResponseID(BaseModel):
     id: int
 
+async def enqueue_tagging(conn: AsyncConnection, entry_ids: List[int]) -> None:
+    """
+    Have the job worker fill `sentence`/`tagged_sentence` for new entries, so
+    tagging never adds to journal POST latency. Call inside the transaction
+    that inserts the entries: the job exists exactly when they do.
+    """
+    await enqueue(conn, "tag_journal_entries", {"entry_ids": entry_ids})
+
+
 @router.post("", response_model=ResponseID)
 async def create_journal_entry(
     entry: JournalEntry,
+    user_id: int = Depends(get_current_user_id),
     conn: AsyncConnection = Depends(get_connection),
 ):
-    print("ENTRY TYPE:", type(entry))
-    print("ENTRY FIELDS:", entry.model_dump())
     async with conn.transaction():
         async with conn.cursor(row_factory=dict_row) as cur:
-            print(entry)
             await cur.execute(
                 """
                 INSERT INTO journal_entry (user_id, title, content, private)
@@ -35,7 +57,7 @@ async def create_journal_entry(
                 RETURNING id
                 """,
                 {
-                    "user_id": 1,  # temporary
+                    "user_id": user_id,
                     "title": entry.title,
                     "content": entry.content,
                     "private": entry.private,
@@ -48,25 +70,104 @@ async def create_journal_entry(
                     detail="Failed to insert journal entry and get ID",
                 )
             entry_id = row["id"]
+        await enqueue_tagging(conn, [entry_id])
 
     return ResponseID(id=entry_id)
 
 
-@router.get("", response_model=List[JournalEntryInDB])
-async def list_journal_entries(
+@router.post("/batch", response_model=List[JournalImportResult])
+async def import_journal_batch(
+    batch: JournalImportBatch,
+    user_id: int = Depends(get_current_user_id),
     conn: AsyncConnection = Depends(get_connection),
-) -> List[JournalEntryInDB]:
-    params = {"uid": 1}
+) -> List[JournalImportResult]:
+    """
+    Store entries written offline in one round trip. Each entry carries a
+    client-generated `idempotency_key`; resending a batch (e.g. after a
+    timeout) returns the same ids without creating duplicates.
+    """
+    keys = [e.idempotency_key for e in batch.entries]
+    if len(set(keys)) != len(keys):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Duplicate idempotency_key in batch",
+        )
+    try:
+        async with conn.transaction():
+            results = await import_journal_entries(conn, user_id, batch.entries)
+            created = [r.id for r in results if r.created]
+            if created:
+                await enqueue_tagging(conn, created)
+    except DatabaseError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {e}",
+        )
+    return results
+
+
+journal_list_adapter = TypeAdapter(List[JournalEntryInDB])
+
+JOURNAL_COLUMNS = "id, user_id, title, content, created_at, private"
+STREAM_CHUNK_SIZE = 500
+
+
+def journal_page_query(user_id: int, after: Optional[str]) -> Tuple[str, dict]:
+    params: dict = {"uid": user_id}
+    keyset = ""
+    if after is not None:
+        created_at, entry_id = decode_cursor(after, 2)
+        try:
+            params["after_created_at"] = datetime.fromisoformat(created_at)
+            params["after_id"] = int(entry_id)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        keyset = "AND (created_at, id) < (%(after_created_at)s, %(after_id)s)"
 
     query = f"""
-        SELECT id, user_id, title, content, created_at, private
+        SELECT {JOURNAL_COLUMNS}
         FROM journal_entry
         WHERE user_id = %(uid)s
-        ORDER BY created_at DESC
-    """  # noqa: F541
+          {keyset}
+        ORDER BY created_at DESC, id DESC
+        LIMIT %(limit)s
+    """
+    return query, params
+
+
+async def stream_journal_entries(query: str, params: dict) -> AsyncIterator[bytes]:
+    """
+    Newline delimited JSON export read through a server-side cursor, so memory
+    stays flat no matter how many entries the user has.
+    """
+    async with pool_connection() as conn, conn.cursor(name="journal_export", row_factory=dict_row) as cur:
+        await cur.execute(query, params)
+        while rows := await cur.fetchmany(STREAM_CHUNK_SIZE):
+            yield encode_row_lines(journal_list_adapter, rows)
 
+
+@router.get("", response_model=List[JournalEntryInDB])
+async def list_journal_entries(
+    request: Request,
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    user_id: int = Depends(get_current_user_id),
+) -> Response:
+    """
+    Newest entries first. Pass `limit` to page, then send the `X-Next-Cursor`
+    header back as `after` for the following page. Ask for
+    `Accept: application/x-ndjson` to stream everything instead.
+    """
+    query, params = journal_page_query(user_id, after)
+
+    if wants_ndjson(request):
+        params["limit"] = None
+        return StreamingResponse(stream_journal_entries(query, params), media_type=NDJSON)
+
+    # one extra row tells us whether there is a next page
+    params["limit"] = None if limit is None else limit + 1
     try:
-        async with conn.cursor(row_factory=dict_row) as cur:
+        async with pool_connection() as conn, conn.cursor(row_factory=dict_row) as cur:
             await cur.execute(query, params)
             rows = await cur.fetchall()
     except DatabaseError as e:
@@ -75,4 +176,13 @@ async def list_journal_entries(
             detail=f"Database error: {e}",
         )
 
-    return [JournalEntryInDB.model_validate(row) for row in rows]
+    headers = {}
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1]["created_at"].isoformat(), rows[-1]["id"])
+
+    return Response(
+        content=encode_rows(journal_list_adapter, rows),
+        media_type="application/json",
+        headers=headers,
+    )
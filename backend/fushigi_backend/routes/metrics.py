@@ -0,0 +1,48 @@
+import os
+from typing import Iterator
+
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+from prometheus_client.registry import Collector
+
+from ..db.connect import get_pool
+
+router = APIRouter(tags=["internal"], include_in_schema=False)
+
+
+class PoolCollector(Collector):
+    """
+    psycopg_pool's own gauges, read at scrape time.
+    """
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        stats = get_pool().get_stats()
+        for key in ("pool_size", "pool_available", "requests_waiting"):
+            yield GaugeMetricFamily(f"db_{key}", f"psycopg_pool {key}", value=stats.get(key, 0))
+
+
+REGISTRY.register(PoolCollector())
+
+
+def scrape_registry() -> CollectorRegistry:
+    """
+    The registry to expose. Under the multi-worker server (PROMETHEUS_MULTIPROC_DIR
+    set) histograms and counters are summed over every worker's files, while the
+    pool gauges are those of the worker answering the scrape.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry)
+    registry.register(PoolCollector())
+    return registry
+
+
+@router.get("/metrics")
+async def metrics() -> Response:
+    """
+    Request, query, pool and serialization metrics in Prometheus text format.
+    """
+    return Response(content=generate_latest(scrape_registry()), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,32 @@
+import base64
+import json
+from typing import Any, List
+
+from fastapi import HTTPException, Request, status
+
+NDJSON = "application/x-ndjson"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(*parts: Any) -> str:
+    """
+    Opaque, URL safe cursor for the last row of a page.
+    """
+    raw = json.dumps(list(parts), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, length: int) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        parts = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError:
+        parts = None
+    if not isinstance(parts, list) or len(parts) != length:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return parts
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON in request.headers.get("accept", "")
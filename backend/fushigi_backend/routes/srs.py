@@ -1,140 +1,180 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import UTC, date, datetime
+from typing import Dict, List, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Response
 from psycopg import AsyncConnection
-from psycopg.errors import DatabaseError
+from psycopg.errors import DatabaseError, ForeignKeyViolation
 from psycopg.rows import dict_row
-from datetime import date, timedelta
-from typing import List, Dict
+from pydantic import TypeAdapter
 
-from ..data.models import GrammarInDB, SRSReview
+from ..catalog.cache import catalog
+from ..data.models import GrammarInDB, SRSAnalytics, SRSReview, SRSSchedule
 from ..db.connect import get_connection
+from ..metrics import timed
+from ..srs.analytics import fetch_srs_analytics
+from ..srs.queue import enroll_cards, get_daily_queue
+from ..srs.review_log import ReviewLogRow, review_log
+from ..srs.sm2 import sm2_update
 
 router = APIRouter(prefix="/api/srs", tags=["srs"])
 
 @router.get("/daily", response_model=List[GrammarInDB])
-async def get_daily_srs(user_id: int, conn: AsyncConnection = Depends(get_connection)):
-    params = (user_id, date.today())
-    query = """
-        SELECT gp.*
-        FROM srs
-        JOIN grammar gp ON srs.grammar_id = gp.id
-        WHERE srs.user_id = %s
-          AND srs.repetition > 0
-          AND srs.due_date <= %s
-        ORDER BY srs.due_date, srs.ease_factor
-        LIMIT 5
-    """
+async def get_daily_srs(user_id: int, conn: AsyncConnection = Depends(get_connection)) -> Response:
     try:
-        async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(query, params)
-            reviews = await cur.fetchall()
+        snapshot = await catalog.get()
+        ids = await get_daily_queue(conn, snapshot.sampler, user_id, date.today())
     except DatabaseError as e:
         raise HTTPException(status_code=500, detail=f"Database error: {e}")
 
-    count = len(reviews)
-    if count < 5:
-        needed = 5 - count
-        params_new = (user_id, needed)
-        query_new = """
-            SELECT gp.*
-            FROM srs
-            JOIN grammar gp ON srs.grammar_id = gp.id
-            WHERE srs.user_id = %s
-              AND srs.repetition = 0
-            ORDER BY RANDOM()
-            LIMIT %s
-        """
-        try:
-            async with conn.cursor(row_factory=dict_row) as cur:
-                await cur.execute(query_new, params_new)
-                new = await cur.fetchall()
-                reviews.extend(new)
-        except DatabaseError as e:
-            raise HTTPException(status_code=500, detail=f"Database error: {e}")
+    # grammar bodies come from the catalog cache rather than a JOIN
+    return Response(
+        content=snapshot.encode([snapshot.by_id[i] for i in ids if i in snapshot.by_id]),
+        media_type="application/json",
+    )
 
-    return [GrammarInDB.model_validate(row) for row in reviews]
+MAX_REVIEW_BATCH = 1000
 
-@router.post("/review")
-async def submit_srs_review(review: SRSReview, conn: AsyncConnection = Depends(get_connection)):
-    params = (review.user_id, review.grammar_id)
-    select_query = "SELECT * FROM srs WHERE user_id = %s AND grammar_id = %s"
+srs_schedule_list_adapter = TypeAdapter(List[SRSSchedule])
 
-    try:
-        async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(select_query, params)
-            record = await cur.fetchone()
-        if record is None:
-            raise HTTPException(status_code=404, detail="SRS record not found")
-
-        updated = sm2_update(
-            ease_factor=record["ease_factor"],
-            interval_days=record["interval_days"],
-            repetition=record["repetition"],
-            quality=review.quality,
-        )
 
-        update_query = """
-            UPDATE srs SET
-                ease_factor = %s,
-                interval_days = %s,
-                repetition = %s,
-                due_date = %s,
-                last_reviewed = CURRENT_DATE
-            WHERE id = %s
-        """
-        update_params = (
-            updated["ease_factor"],
-            updated["interval_days"],
-            updated["repetition"],
-            updated["due_date"],
-            record["id"],
+async def apply_reviews(conn: AsyncConnection, reviews: List[SRSReview]) -> List[SRSSchedule]:
+    """
+    Apply reviews in submission order inside one transaction.
+
+    Cards reviewed for the first time are enrolled on the spot, then the
+    affected srs rows are locked and read with a single SELECT ... FOR UPDATE,
+    SM-2 runs in Python (repeated reviews of a card chain off each other), and
+    every new schedule is written back with a single UPDATE ... FROM unnest(...).
+    Three statements per batch instead of two per card, and no lost updates.
+    Once committed, every review is handed to the write-behind review log.
+    """
+    if not reviews:
+        return []
+
+    lock_query = """
+        SELECT id, user_id, grammar_id, ease_factor, interval_days, repetition, last_reviewed
+        FROM srs
+        WHERE (user_id, grammar_id) IN (
+            SELECT * FROM unnest(%s::int[], %s::int[])
         )
+        FOR UPDATE
+    """
+    update_query = """
+        UPDATE srs SET
+            ease_factor = u.ease_factor,
+            interval_days = u.interval_days,
+            repetition = u.repetition,
+            due_date = u.due_date,
+            last_reviewed = CURRENT_DATE
+        FROM unnest(%s::int[], %s::float8[], %s::int[], %s::int[], %s::date[])
+            AS u(id, ease_factor, interval_days, repetition, due_date)
+        WHERE srs.id = u.id
+    """
 
-        async with conn.cursor() as cur:
-            await cur.execute(update_query, update_params)
-            await conn.commit()
+    cards = sorted({(r.user_id, r.grammar_id) for r in reviews})
+    today = date.today()
+    reviewed_at = datetime.now(UTC)
+    log: List[ReviewLogRow] = []
+    async with conn.transaction():
+        try:
+            await enroll_cards(conn, cards)
+        except ForeignKeyViolation:
+            raise HTTPException(status_code=404, detail="Unknown user or grammar point")
+
+        async with conn.cursor(row_factory=dict_row) as cur:
+            await cur.execute(
+                lock_query,
+                ([r.user_id for r in reviews], [r.grammar_id for r in reviews]),
+            )
+            records = {(row["user_id"], row["grammar_id"]): row for row in await cur.fetchall()}
+
+            schedules: Dict[Tuple[int, int], SRSSchedule] = {}
+            for review in reviews:
+                key = (review.user_id, review.grammar_id)
+                record = records[key]
+                before = (record["ease_factor"], record["interval_days"], record["repetition"])
+                last_reviewed = record["last_reviewed"]
+                updated = sm2_update(
+                    ease_factor=record["ease_factor"],
+                    interval_days=record["interval_days"],
+                    repetition=record["repetition"],
+                    quality=review.quality,
+                )
+                record.update(updated, last_reviewed=today)
+                log.append(
+                    (
+                        review.user_id,
+                        review.grammar_id,
+                        reviewed_at,
+                        review.quality,
+                        None if last_reviewed is None else (today - last_reviewed).days,
+                        *before,
+                        record["ease_factor"],
+                        record["interval_days"],
+                        record["repetition"],
+                    )
+                )
+                schedules[key] = SRSSchedule.model_validate(
+                    {"user_id": review.user_id, "grammar_id": review.grammar_id, **updated}
+                )
+
+            touched = [records[key] for key in schedules]
+            await cur.execute(
+                update_query,
+                (
+                    [r["id"] for r in touched],
+                    [r["ease_factor"] for r in touched],
+                    [r["interval_days"] for r in touched],
+                    [r["repetition"] for r in touched],
+                    [r["due_date"] for r in touched],
+                ),
+            )
+
+    review_log.add(log)
+    return list(schedules.values())
 
+@router.post("/review")
+async def submit_srs_review(review: SRSReview, conn: AsyncConnection = Depends(get_connection)):
+    try:
+        await apply_reviews(conn, [review])
     except DatabaseError as e:
         raise HTTPException(status_code=500, detail=f"Database error: {e}")
 
     return {"message": "SRS updated"}
 
-def sm2_update(
-    ease_factor: float,
-    interval_days: int,
-    repetition: int,
-    quality: int,
-) -> Dict[str, object]:
+@router.post("/review/batch", response_model=List[SRSSchedule])
+async def submit_srs_review_batch(
+    reviews: List[SRSReview],
+    conn: AsyncConnection = Depends(get_connection),
+) -> Response:
     """
-    SM-2 SRS algorithm update.
+    Apply many reviews atomically, e.g. a backlog synced by an offline client.
+    Reviews of the same card are applied in the order given. Returns the final
+    schedule of every card touched.
+    """
+    if len(reviews) > MAX_REVIEW_BATCH:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {MAX_REVIEW_BATCH} reviews per batch",
+        )
+    try:
+        schedules = await apply_reviews(conn, reviews)
+    except DatabaseError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {e}")
+
+    # already validated models, encode directly instead of letting FastAPI re-validate
+    with timed("serialize"):
+        content = srs_schedule_list_adapter.dump_json(schedules)
+    return Response(content=content, media_type="application/json")
 
-    Args:
-        ease_factor: current ease factor
-        interval_days: current interval in days
-        repetition: how many successful repetitions so far
-        quality: integer 0-5 rating (5=perfect)
 
-    Returns:
-        dict with updated ease_factor, interval_days, repetition, due_date
+@router.get("/analytics", response_model=SRSAnalytics)
+async def get_srs_analytics(user_id: int, conn: AsyncConnection = Depends(get_connection)) -> SRSAnalytics:
     """
-    if quality < 3:
-        repetition = 0
-        interval_days = 1
-    else:
-        if repetition == 0:
-            interval_days = 1
-        elif repetition == 1:
-            interval_days = 6
-        else:
-            interval_days = int(interval_days * ease_factor)
-        repetition += 1
-
-    ease_factor += 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
-    ease_factor = max(ease_factor, 1.3)
-
-    due_date = date.today() + timedelta(days=interval_days)
-    return {
-        "ease_factor": ease_factor,
-        "interval_days": interval_days,
-        "repetition": repetition,
-        "due_date": due_date,
-    }
+    Retention curve, lapse rate and ease distribution from the user's review
+    log. Reviews reach the log in batches, so the last few seconds may be missing.
+    """
+    try:
+        return SRSAnalytics.model_validate(await fetch_srs_analytics(conn, user_id))
+    except DatabaseError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {e}")
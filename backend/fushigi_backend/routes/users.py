@@ -0,0 +1,9 @@
+import os
+
+# there are no accounts yet: every request acts as this user until auth lands,
+# and routes take it from `get_current_user_id` so only that function changes then
+DEFAULT_USER_ID = int(os.environ.get("DEFAULT_USER_ID", "1"))
+
+
+async def get_current_user_id() -> int:
+    return DEFAULT_USER_ID
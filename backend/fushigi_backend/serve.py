@@ -0,0 +1,216 @@
+"""
+Production entry point: a pre-fork master that loads the grammar catalog and
+builds its indexes once, then forks uvicorn workers that share the listening
+socket and, copy-on-write, the catalog pages.
+
+    uv run python -m fushigi_backend.serve --workers 4 --db-connection-budget 80
+
+Each worker gets `budget // workers` pooled Postgres connections, so the whole
+server stays within the budget however many workers run. Leave headroom under
+`max_connections` for migrations, tools_main and other clients.
+
+SIGTERM or SIGINT to the master is forwarded to the workers, which stop
+accepting, finish in-flight requests (up to `--graceful-timeout` seconds) and
+close their pools before exiting. A worker that dies on its own is replaced.
+"""
+
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import signal
+import socket
+import tempfile
+import time
+from pathlib import Path
+from types import FrameType
+from typing import Dict, Optional
+
+import uvicorn
+
+logger = logging.getLogger("uvicorn.error")
+
+# a worker dying faster than this after its start is restarted after a pause,
+# so a broken deploy (e.g. Postgres unreachable) doesn't fork in a tight loop
+RESTART_BACKOFF = 1.0
+
+STOP_SIGNALS = {signal.SIGINT, signal.SIGTERM}
+
+
+def pool_size_for(budget: int, workers: int) -> int:
+    if workers < 1:
+        raise ValueError("need at least one worker")
+    if budget < workers:
+        raise ValueError(f"a budget of {budget} connections can't give each of {workers} workers one")
+    return budget // workers
+
+
+def configure_environment(workers: int, budget: int) -> None:
+    """
+    Size each worker's pool from the budget and set up shared metrics storage.
+    Must run before anything imports `db.connect` or `prometheus_client`, both
+    read their settings at import time.
+    """
+    max_size = pool_size_for(budget, workers)
+    if "DB_POOL_MAX_SIZE" in os.environ:
+        max_size = min(max_size, int(os.environ["DB_POOL_MAX_SIZE"]))
+    os.environ["DB_POOL_MAX_SIZE"] = str(max_size)
+    os.environ["DB_POOL_MIN_SIZE"] = str(min(int(os.environ.get("DB_POOL_MIN_SIZE", "2")), max_size))
+
+    if workers > 1:
+        # one process per worker, so /metrics has to sum their files
+        directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+        if directory is None:
+            os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="fushigi-metrics-")
+        else:
+            for stale in Path(directory).glob("*.db"):
+                stale.unlink()
+
+
+async def preload_catalog() -> None:
+    # imported here so configure_environment runs first
+    from .catalog.cache import catalog
+    from .db.connect import connect_to_db
+
+    # a plain connection, closed before forking: sockets and event loops must
+    # not be shared with the workers, only the built snapshot
+    async with await connect_to_db() as conn:
+        snapshot = await catalog.load(conn)
+    logger.info("Loaded grammar catalog revision %s (%s entries)", snapshot.revision, len(snapshot.entries))
+
+
+def run_worker(config: uvicorn.Config, sock: socket.socket) -> None:
+    gc.enable()
+    for sig in STOP_SIGNALS:
+        signal.signal(sig, signal.SIG_DFL)
+    signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+    # uvicorn installs its own handlers: stop accepting, drain, run lifespan shutdown
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Master:
+    def __init__(self, config: uvicorn.Config, sock: socket.socket, workers: int) -> None:
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        self.children: Dict[int, float] = {}  # pid -> start time
+        self.stopping = False
+
+    def spawn(self) -> None:
+        # keep stop signals pending across the fork, so neither side handles
+        # one before it knows about the new child
+        signal.pthread_sigmask(signal.SIG_BLOCK, STOP_SIGNALS)
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.config, self.sock)
+            except BaseException:
+                logger.exception("Worker crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+        logger.info("Started worker %s", pid)
+
+    def stop(self, signum: int, frame: Optional[FrameType]) -> None:
+        if not self.stopping:
+            logger.info("Received %s, draining %s workers", signal.Signals(signum).name, len(self.children))
+        self.stopping = True
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def reap(self, pid: int) -> None:
+        if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+            from prometheus_client import multiprocess
+
+            multiprocess.mark_process_dead(pid)
+
+    def run(self) -> None:
+        for sig in STOP_SIGNALS:
+            signal.signal(sig, self.stop)
+        for _ in range(self.workers):
+            self.spawn()
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started = self.children.pop(pid, None)
+            if started is None:
+                continue
+            self.reap(pid)
+            if self.stopping:
+                continue
+            logger.warning("Worker %s exited with %s, restarting", pid, os.waitstatus_to_exitcode(status))
+            if time.monotonic() - started < RESTART_BACKOFF:
+                time.sleep(RESTART_BACKOFF)
+            if not self.stopping:
+                self.spawn()
+
+        self.sock.close()
+        logger.info("All workers stopped")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.environ.get("SERVER_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("SERVER_PORT", "8000")))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("SERVER_WORKERS", str(os.cpu_count() or 1))),
+        help="worker processes (default: one per core)",
+    )
+    parser.add_argument(
+        "--db-connection-budget",
+        type=int,
+        default=int(os.environ.get("DB_CONNECTION_BUDGET", "80")),
+        help="Postgres connections shared by all workers' pools",
+    )
+    parser.add_argument(
+        "--graceful-timeout",
+        type=int,
+        default=int(os.environ.get("SERVER_GRACEFUL_TIMEOUT", "30")),
+        help="seconds a stopping worker waits for in-flight requests",
+    )
+    args = parser.parse_args()
+
+    try:
+        configure_environment(args.workers, args.db_connection_budget)
+    except ValueError as e:
+        parser.error(str(e))
+
+    from .main import app
+
+    config = uvicorn.Config(
+        app,
+        host=args.host,
+        port=args.port,
+        lifespan="on",
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+    sock = config.bind_socket()
+
+    # keep the collector off the preloaded objects, then move them to the
+    # permanent generation so no worker's collection dirties the shared pages
+    gc.disable()
+    asyncio.run(preload_catalog())
+    gc.freeze()
+
+    logger.info(
+        "Serving with %s workers, %s pooled connections each",
+        args.workers,
+        os.environ["DB_POOL_MAX_SIZE"],
+    )
+    Master(config, sock, args.workers).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# purposefully empty
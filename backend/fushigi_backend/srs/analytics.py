@@ -0,0 +1,75 @@
+from typing import Any, Dict
+
+from psycopg import AsyncConnection
+from psycopg.rows import dict_row
+
+# lower bounds, in days, of the retention curve's buckets
+RETENTION_BUCKETS = [0, 1, 2, 4, 7, 14, 30, 60, 120, 240]
+# SM-2 ease never goes below 1.3; bucket it in steps of this size
+EASE_BUCKET_WIDTH = 0.1
+
+
+async def fetch_srs_analytics(conn: AsyncConnection, user_id: int) -> Dict[str, Any]:
+    """
+    Aggregate a user's review history in Postgres, so only the figures cross
+    the wire:
+
+    - retention: share of reviews recalled (quality >= 3) by days since the
+      card's previous review
+    - lapses: reviews of cards already learnt (repetition > 0) that failed
+    - ease: current ease factor distribution over the user's cards
+    """
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await cur.execute(
+            """
+            SELECT
+                count(*) AS reviews,
+                count(*) FILTER (WHERE repetition_before > 0) AS mature_reviews,
+                count(*) FILTER (WHERE repetition_before > 0 AND quality < 3) AS lapses
+            FROM srs_review_log
+            WHERE user_id = %(user_id)s
+            """,
+            {"user_id": user_id},
+        )
+        totals = await cur.fetchone()
+        assert totals is not None
+
+        await cur.execute(
+            """
+            SELECT
+                (%(buckets)s::int[])[width_bucket(GREATEST(elapsed_days, 0), %(buckets)s::int[])] AS elapsed_days,
+                count(*) AS reviews,
+                avg((quality >= 3)::int)::float8 AS retention
+            FROM srs_review_log
+            WHERE user_id = %(user_id)s
+              AND elapsed_days IS NOT NULL
+            GROUP BY 1
+            ORDER BY 1
+            """,
+            {"user_id": user_id, "buckets": RETENTION_BUCKETS},
+        )
+        retention = await cur.fetchall()
+
+        await cur.execute(
+            """
+            SELECT
+                round((floor(ease_factor / %(width)s) * %(width)s)::numeric, 2)::float8 AS ease_factor,
+                count(*) AS cards
+            FROM srs
+            WHERE user_id = %(user_id)s
+            GROUP BY 1
+            ORDER BY 1
+            """,
+            {"user_id": user_id, "width": EASE_BUCKET_WIDTH},
+        )
+        ease = await cur.fetchall()
+
+    mature = totals["mature_reviews"]
+    return {
+        "user_id": user_id,
+        "reviews": totals["reviews"],
+        "lapses": totals["lapses"],
+        "lapse_rate": totals["lapses"] / mature if mature else 0.0,
+        "retention": retention,
+        "ease": ease,
+    }
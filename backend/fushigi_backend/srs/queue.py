@@ -0,0 +1,234 @@
+import asyncio
+from datetime import date
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+from psycopg import AsyncConnection
+from psycopg.rows import dict_row
+
+from ..catalog.cache import fetch_summaries
+from ..catalog.sampling import GrammarSampler
+from ..db.connect import connect_to_db
+
+DAILY_QUEUE_SIZE = 5
+# (user_id, grammar_id) pairs written per enrollment statement
+ENROLL_CHUNK_SIZE = 5_000
+
+
+def chunked(items: Iterable[Tuple[int, int]], size: int) -> Iterator[List[Tuple[int, int]]]:
+    it = iter(items)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+async def enroll_cards(
+    conn: AsyncConnection,
+    cards: Iterable[Tuple[int, int]],
+    due: Optional[date] = None,
+) -> int:
+    """
+    Give (user_id, grammar_id) cards an srs row, due on `due` (today by
+    default). Cards that already have one are left alone.
+
+    srs is sparse: a card only gets a row once it is introduced in a queue or
+    reviewed, so storage follows what users actually study rather than users x
+    catalog. `cards` is consumed lazily and written a chunk per statement.
+
+    Returns:
+        number of rows created
+    """
+    created = 0
+    async with conn.cursor() as cur:
+        for chunk in chunked(cards, ENROLL_CHUNK_SIZE):
+            await cur.execute(
+                """
+                INSERT INTO srs (user_id, grammar_id, due_date)
+                SELECT user_id, grammar_id, COALESCE(%s::date, CURRENT_DATE)
+                FROM unnest(%s::int[], %s::int[]) AS c(user_id, grammar_id)
+                ON CONFLICT (user_id, grammar_id) DO NOTHING
+                """,
+                (due, [user_id for user_id, _ in chunk], [grammar_id for _, grammar_id in chunk]),
+            )
+            created += cur.rowcount
+    return created
+
+
+async def sample_new_cards(
+    conn: AsyncConnection,
+    sampler: GrammarSampler,
+    user_id: int,
+    k: int,
+) -> List[int]:
+    """
+    Pick k random grammar ids the user hasn't been introduced to yet, i.e.
+    that have no srs row.
+
+    Candidates are drawn from the in-memory catalog and checked against the
+    user's srs rows by key, instead of sorting their whole deck with
+    ORDER BY RANDOM(). Each round asks for more candidates than needed so a
+    mostly-new deck is done in one round trip.
+    """
+    query = """
+        SELECT grammar_id
+        FROM srs
+        WHERE user_id = %s
+          AND grammar_id = ANY(%s)
+    """
+    picked: List[int] = []
+    tried: Set[int] = set()
+    batch = 4 * k
+    while len(picked) < k and len(tried) < len(sampler.ids):
+        candidates = sampler.sample(batch, exclude=tried)
+        if not candidates:
+            break
+        tried.update(candidates)
+        async with conn.cursor(row_factory=dict_row) as cur:
+            await cur.execute(query, (user_id, candidates))
+            enrolled = {row["grammar_id"] for row in await cur.fetchall()}
+        picked.extend(i for i in candidates if i not in enrolled)
+        batch *= 2
+
+    return picked[:k]
+
+
+async def build_daily_queue(
+    conn: AsyncConnection,
+    sampler: GrammarSampler,
+    user_id: int,
+    day: date,
+) -> List[int]:
+    """
+    Grammar ids for the user's queue: due cards first (earliest due, lowest
+    ease), topped up with new cards. Every row is a card the user has met, so
+    introduced-but-unanswered and lapsed cards count as due.
+    """
+    query = """
+        SELECT grammar_id
+        FROM srs
+        WHERE user_id = %s
+          AND due_date <= %s
+        ORDER BY due_date, ease_factor
+        LIMIT %s
+    """
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await cur.execute(query, (user_id, day, DAILY_QUEUE_SIZE))
+        ids = [row["grammar_id"] for row in await cur.fetchall()]
+
+    if len(ids) < DAILY_QUEUE_SIZE:
+        ids.extend(await sample_new_cards(conn, sampler, user_id, DAILY_QUEUE_SIZE - len(ids)))
+    return ids
+
+
+async def get_daily_queue(
+    conn: AsyncConnection,
+    sampler: GrammarSampler,
+    user_id: int,
+    day: date,
+) -> List[int]:
+    """
+    The user's queue for `day`, built and stored on first request, minus the
+    cards already answered that day.
+
+    Once stored (here or by `materialize_daily_queues`) every later call that
+    day is a primary key lookup plus a keyed check of the queued cards.
+    """
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await cur.execute(
+            "SELECT grammar_ids FROM srs_daily_queue WHERE user_id = %s AND queue_date = %s",
+            (user_id, day),
+        )
+        row = await cur.fetchone()
+        if row is not None:
+            # a reviewed card's due date moves past today; a failed one is
+            # still due but was seen today, so it waits for tomorrow's queue
+            await cur.execute(
+                """
+                SELECT grammar_id
+                FROM srs
+                WHERE user_id = %s
+                  AND grammar_id = ANY(%s)
+                  AND (due_date > %s OR last_reviewed >= %s)
+                """,
+                (user_id, row["grammar_ids"], day, day),
+            )
+            answered = {r["grammar_id"] for r in await cur.fetchall()}
+            return [i for i in row["grammar_ids"] if i not in answered]
+
+    ids = await build_daily_queue(conn, sampler, user_id, day)
+    return await store_daily_queue(conn, user_id, day, ids)
+
+
+async def store_daily_queue(conn: AsyncConnection, user_id: int, day: date, ids: List[int]) -> List[int]:
+    """
+    Save the queue and enroll its new cards, due that day, so they come back
+    as due until answered. If a concurrent request stored a queue first, keep
+    and return theirs.
+    """
+    async with conn.transaction():
+        async with conn.cursor(row_factory=dict_row) as cur:
+            await cur.execute(
+                """
+                INSERT INTO srs_daily_queue (user_id, queue_date, grammar_ids)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (user_id, queue_date)
+                    DO UPDATE SET grammar_ids = srs_daily_queue.grammar_ids
+                RETURNING grammar_ids
+                """,
+                (user_id, day, ids),
+            )
+            row = await cur.fetchone()
+        assert row is not None
+        await enroll_cards(conn, ((user_id, i) for i in row["grammar_ids"]), due=day)
+    return row["grammar_ids"]
+
+
+async def materialize_daily_queues(
+    conn: AsyncConnection,
+    sampler: GrammarSampler,
+    day: date,
+    user_ids: Optional[Iterable[int]] = None,
+) -> int:
+    """
+    Build `day`'s queue ahead of time for every user (or just `user_ids`) who
+    doesn't have one yet, and drop queues from earlier days.
+
+    Returns:
+        number of queues built
+    """
+    only = None if user_ids is None else list(user_ids)
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await cur.execute("DELETE FROM srs_daily_queue WHERE queue_date < %s", (day,))
+        await cur.execute(
+            """
+            SELECT u.id
+            FROM users u
+            WHERE NOT EXISTS (
+                SELECT 1 FROM srs_daily_queue q WHERE q.user_id = u.id AND q.queue_date = %s
+            )
+              AND (%s::int[] IS NULL OR u.id = ANY(%s::int[]))
+            ORDER BY u.id
+            """,
+            (day, only, only),
+        )
+        pending = [row["id"] for row in await cur.fetchall()]
+    await conn.commit()
+
+    for user_id in pending:
+        ids = await build_daily_queue(conn, sampler, user_id, day)
+        await store_daily_queue(conn, user_id, day, ids)
+        await conn.commit()
+    return len(pending)
+
+
+async def main() -> None:
+    conn = await connect_to_db()
+    sampler = GrammarSampler.from_entries(await fetch_summaries(conn))
+    built = await materialize_daily_queues(conn, sampler, date.today())
+    await conn.close()
+
+    print(f"Built {built} daily review queues for {date.today()}")
+
+
+if __name__ == "__main__":
+    # run shortly after midnight so the morning spike only reads stored queues
+    asyncio.run(main())
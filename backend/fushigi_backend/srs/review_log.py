@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+
+from psycopg_pool import AsyncConnectionPool
+
+from ..db.connect import get_pool
+
+logger = logging.getLogger(__name__)
+
+# flush once this many reviews are waiting, or every this many seconds
+REVIEW_LOG_BATCH_SIZE = int(os.environ.get("REVIEW_LOG_BATCH_SIZE", "500"))
+REVIEW_LOG_FLUSH_SECONDS = float(os.environ.get("REVIEW_LOG_FLUSH_SECONDS", "5"))
+# while Postgres is unreachable keep at most this many, dropping the oldest
+REVIEW_LOG_MAX_PENDING = int(os.environ.get("REVIEW_LOG_MAX_PENDING", "100000"))
+
+COLUMNS = (
+    "user_id",
+    "grammar_id",
+    "reviewed_at",
+    "quality",
+    "elapsed_days",
+    "ease_before",
+    "interval_before",
+    "repetition_before",
+    "ease_factor",
+    "interval_days",
+    "repetition",
+)
+
+ReviewLogRow = Tuple[int, int, datetime, int, Optional[int], float, int, int, float, int, int]
+
+
+class ReviewLogBuffer:
+    """
+    Write-behind queue for `srs_review_log`.
+
+    Reviews are appended in memory after their transaction commits and COPYed
+    in batches by a background task, so keeping history costs the review path
+    no round trip. A batch goes out when it reaches `batch_size` or
+    `flush_interval` seconds pass, and `stop` flushes whatever is left on
+    shutdown. A hard crash loses at most the unflushed tail.
+    """
+
+    def __init__(
+        self,
+        pool_factory: Callable[[], AsyncConnectionPool] = get_pool,
+        batch_size: int = REVIEW_LOG_BATCH_SIZE,
+        flush_interval: float = REVIEW_LOG_FLUSH_SECONDS,
+        max_pending: int = REVIEW_LOG_MAX_PENDING,
+    ) -> None:
+        self.pool_factory = pool_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending: List[ReviewLogRow] = []
+        self._full = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task[Any]] = None
+
+    def add(self, rows: List[ReviewLogRow]) -> None:
+        self.pending.extend(rows)
+        self._trim()
+        if len(self.pending) >= self.batch_size:
+            self._full.set()
+
+    def _trim(self) -> None:
+        if len(self.pending) > self.max_pending:
+            dropped = len(self.pending) - self.max_pending
+            del self.pending[:dropped]
+            logger.error("Review log backlog full, dropped %s oldest reviews", dropped)
+
+    async def flush(self) -> int:
+        """
+        Write everything pending with one COPY. On failure the rows go back to
+        the front of the queue for the next attempt, still capped at
+        `max_pending` along with whatever was added meanwhile.
+
+        Returns:
+            number of rows written
+        """
+        async with self._lock:
+            rows, self.pending = self.pending, []
+            if not rows:
+                return 0
+            try:
+                async with (
+                    self.pool_factory().connection() as conn,
+                    conn.cursor() as cur,
+                    cur.copy(f"COPY srs_review_log ({', '.join(COLUMNS)}) FROM STDIN") as copy,
+                ):
+                    for row in rows:
+                        await copy.write_row(row)
+            except asyncio.CancelledError:
+                # stopped mid-COPY: the transaction rolled back, `stop` retries
+                self.pending[:0] = rows
+                self._trim()
+                raise
+            except Exception:
+                logger.exception("Failed to write %s reviews to srs_review_log", len(rows))
+                self.pending[:0] = rows
+                self._trim()
+                return 0
+        return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        written = await self.flush()
+        if self.pending:
+            logger.error("Lost %s reviews on shutdown, srs_review_log unreachable", len(self.pending))
+        elif written:
+            logger.info("Flushed %s reviews to srs_review_log on shutdown", written)
+
+
+review_log = ReviewLogBuffer()
@@ -0,0 +1,152 @@
+"""
+Forecast daily SRS review load for a cohort of synthetic users.
+
+Every user follows the app's daily queue: up to `daily_limit` due cards
+(earliest due, lowest ease first), topped up with cards it hasn't met yet,
+each answered with a random quality. As in the database, a card only takes
+storage once it has been served, so `srs_rows` tracks the table's size. The
+whole cohort is advanced one day at a time with array operations, so
+millions of card-days take seconds.
+
+    uv run python -m fushigi_backend.srs.simulate --users 10000 --days 180
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .sm2 import sm2_step
+
+
+def rank_within_groups(groups: NDArray[np.int64]) -> NDArray[np.int64]:
+    """
+    0, 1, 2, ... position of each element inside its run of equal, sorted group ids.
+    """
+    if groups.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    counts = np.diff(np.r_[starts, groups.size])
+    return np.arange(groups.size) - np.repeat(starts, counts)
+
+
+def simulate(
+    users: int,
+    days: int,
+    cards: int = 377,
+    daily_limit: int = 5,
+    fail_rate: float = 0.15,
+    peak_hour_share: float = 0.25,
+    seed: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Run the cohort forward and return one dict of load figures per day.
+
+    Args:
+        users: synthetic users, all starting with an empty deck on day 0
+        days: days to simulate
+        cards: grammar points in the catalog
+        daily_limit: cards served per user per day, as in /api/srs/daily
+        fail_rate: chance an answer is rated below 3
+        peak_hour_share: fraction of a day's reviews that land in the busiest hour
+        seed: makes the run reproducible
+    """
+    rng = np.random.default_rng(seed)
+    size = users * cards
+    owner = np.repeat(np.arange(users, dtype=np.int64), cards)
+    ease = np.full(size, 2.5)
+    interval = np.zeros(size, dtype=np.int64)
+    repetition = np.zeros(size, dtype=np.int64)
+    due = np.zeros(size, dtype=np.int64)
+    enrolled = np.zeros(size, dtype=bool)
+
+    forecast: List[Dict[str, Any]] = []
+    for day in range(days):
+        # cards already met (lapsed ones included) and due today, best first per user
+        due_idx = np.flatnonzero(enrolled & (due <= day))
+        due_idx = due_idx[np.lexsort((ease[due_idx], due[due_idx], owner[due_idx]))]
+        served_due = due_idx[rank_within_groups(owner[due_idx]) < daily_limit]
+
+        # top the queue up with new cards; a card's slot in its user's block stands
+        # in for the random order, and flatnonzero keeps indices grouped by user
+        needed = daily_limit - np.bincount(owner[served_due], minlength=users)
+        new_idx = np.flatnonzero(~enrolled)
+        served_new = new_idx[rank_within_groups(owner[new_idx]) < needed[owner[new_idx]]]
+
+        served = np.concatenate([served_due, served_new])
+        quality = np.where(
+            rng.random(served.size) < fail_rate,
+            rng.integers(0, 3, served.size),
+            rng.integers(3, 6, served.size),
+        )
+        ease[served], interval[served], repetition[served] = sm2_step(
+            ease[served], interval[served], repetition[served], quality
+        )
+        due[served] = day + interval[served]
+        enrolled[served] = True
+
+        reviews = int(served.size)
+        peak_hour = reviews * peak_hour_share
+        forecast.append(
+            {
+                "day": day,
+                "active_users": int(np.unique(owner[served]).size),
+                "reviews": reviews,
+                "due_reviews": int(served_due.size),
+                "new_cards": int(served_new.size),
+                "backlog": int(due_idx.size - served_due.size),
+                "lapses": int((quality < 3).sum()),
+                "srs_rows": int(enrolled.sum()),
+                "peak_hour_reviews": round(peak_hour),
+                "peak_reviews_per_second": round(peak_hour / 3600, 3),
+            }
+        )
+    return forecast
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--cards", type=int, default=377, help="grammar points in the catalog")
+    parser.add_argument("--daily-limit", type=int, default=5, help="cards served per user per day")
+    parser.add_argument("--fail-rate", type=float, default=0.15, help="chance an answer is rated below 3")
+    parser.add_argument("--peak-hour-share", type=float, default=0.25, help="share of daily reviews in the peak hour")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", help="write the per-day forecast as JSON here")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    forecast = simulate(
+        users=args.users,
+        days=args.days,
+        cards=args.cards,
+        daily_limit=args.daily_limit,
+        fail_rate=args.fail_rate,
+        peak_hour_share=args.peak_hour_share,
+        seed=args.seed,
+    )
+    elapsed = time.perf_counter() - start
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(forecast, f, indent=2)
+
+    peak = max(forecast, key=lambda d: d["reviews"])
+    print(
+        f"Simulated {args.users * args.days * args.cards:,} card-days in {elapsed:.2f}s",
+        file=sys.stderr,
+    )
+    print(
+        f"Peak day {peak['day']}: {peak['reviews']:,} reviews, "
+        f"{peak['backlog']:,} due cards left over, "
+        f"~{peak['peak_reviews_per_second']} reviews/s in the busiest hour"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+from datetime import date, timedelta
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+
+def sm2_update(
+    ease_factor: float,
+    interval_days: int,
+    repetition: int,
+    quality: int,
+) -> Dict[str, object]:
+    """
+    SM-2 SRS algorithm update.
+
+    Args:
+        ease_factor: current ease factor
+        interval_days: current interval in days
+        repetition: how many successful repetitions so far
+        quality: integer 0-5 rating (5=perfect)
+
+    Returns:
+        dict with updated ease_factor, interval_days, repetition, due_date
+    """
+    if quality < 3:
+        repetition = 0
+        interval_days = 1
+    else:
+        if repetition == 0:
+            interval_days = 1
+        elif repetition == 1:
+            interval_days = 6
+        else:
+            interval_days = int(interval_days * ease_factor)
+        repetition += 1
+
+    ease_factor += 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    ease_factor = max(ease_factor, 1.3)
+
+    due_date = date.today() + timedelta(days=interval_days)
+    return {
+        "ease_factor": ease_factor,
+        "interval_days": interval_days,
+        "repetition": repetition,
+        "due_date": due_date,
+    }
+
+
+def sm2_step(
+    ease_factor: ArrayLike,
+    interval_days: ArrayLike,
+    repetition: ArrayLike,
+    quality: ArrayLike,
+) -> Tuple[NDArray[np.float64], NDArray[np.int64], NDArray[np.int64]]:
+    """
+    `sm2_update` over whole arrays of cards at once.
+
+    Performs the same float64 operations in the same order as the scalar
+    version, so results are bit for bit identical.
+
+    Returns:
+        new (ease_factor, interval_days, repetition) arrays
+    """
+    ease = np.asarray(ease_factor, dtype=np.float64)
+    interval = np.asarray(interval_days, dtype=np.int64)
+    rep = np.asarray(repetition, dtype=np.int64)
+    q = np.asarray(quality, dtype=np.int64)
+
+    passed = q >= 3
+    grown = np.trunc(interval * ease).astype(np.int64)  # int() of a positive float
+    new_interval = np.where(passed & (rep >= 2), grown, np.where(passed & (rep == 1), 6, 1))
+    new_rep = np.where(passed, rep + 1, 0)
+
+    miss = 5 - q
+    new_ease = np.maximum(ease + (0.1 - miss * (0.08 + miss * 0.02)), 1.3)
+    return new_ease, new_interval, new_rep
+
+
+def sm2_update_batch(
+    ease_factor: ArrayLike,
+    interval_days: ArrayLike,
+    repetition: ArrayLike,
+    quality: ArrayLike,
+    today: Optional[date] = None,
+) -> Dict[str, NDArray]:
+    """
+    Vectorized `sm2_update` for rescheduling or backfilling a whole deck.
+
+    Args:
+        ease_factor: current ease factors
+        interval_days: current intervals in days
+        repetition: successful repetitions so far
+        quality: 0-5 ratings, one per card
+        today: day the reviews happened, defaults to today
+
+    Returns:
+        dict of arrays with updated ease_factor, interval_days, repetition, due_date
+    """
+    ease, interval, rep = sm2_step(ease_factor, interval_days, repetition, quality)
+    start = np.datetime64(today or date.today(), "D")
+    return {
+        "ease_factor": ease,
+        "interval_days": interval,
+        "repetition": rep,
+        "due_date": start + interval,
+    }
@@ -8,9 +8,12 @@ from .db.generate import generate_db
 async def main() -> None:
     pool = await connect_to_db()
     grammar_data = load_defaults()
-    await generate_db(pool, grammar_data)
+    summary = await generate_db(pool, grammar_data)
 
-    print("Finished loading default grammar rules into Fushigi db!")
+    print(
+        "Finished loading default grammar rules into Fushigi db! "
+        f"({summary.inserted} inserted, {summary.updated} updated, {summary.unchanged} unchanged)"
+    )
 
 
 if __name__ == "__main__":
@@ -1,9 +1,39 @@
+import argparse
+import asyncio
+import hashlib
 import json
 import os
-from typing import Any, List
+import random
+import sqlite3
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import APIConnectionError, APIStatusError, APITimeoutError, AsyncOpenAI, OpenAI
+
+TRANSLATOR_ROLE = "You are a professional translator specializing in Japanese to English translation."
+LINGUIST_ROLE = "You are an expert in Japanese linguistics and language pedagogy."
+
+NOTES_FALLBACK = {
+    "nuance": "Unable to generate detailed notes",
+    "usage_tips": "",
+    "common_mistakes": "",
+    "situation": "",
+}
+TRANSLATION_FALLBACK = {
+    "english": "Unable to generate translation.",
+    "romaji": "Unable to generate romanization.",
+}
+
+# bump when a prompt changes so cached answers to the old prompt stop matching
+TEMPLATE_VERSIONS = {"romanize": 1, "notes": 1, "translation": 1}
+REQUIRED_KEYS = {"notes": NOTES_FALLBACK.keys(), "translation": TRANSLATION_FALLBACK.keys()}
+
+DEFAULT_CACHE_PATH = ".ai_cache.sqlite3"
+DEFAULT_CACHE_MAX_MB = 64
+DEFAULT_CATALOG = Path(__file__).resolve().parent.parent / "fushigi_backend" / "data" / "grammar.json"
 
 
 def get_required_env(key: str) -> str:
@@ -16,9 +46,161 @@ def get_required_env(key: str) -> str:
     return value
 
 
-class GrammarPointEnhancer:
+def romanize_messages(japanese_text: str) -> List[Dict[str, str]]:
+    prompt = f"""I need the hepburn romanization for the following
+    example sentence in Japanese.
+
+    Sentence: {japanese_text}
+
+    Don't add any extra information other than the hepburn romanization!
+    """
+    return [{"role": "system", "content": TRANSLATOR_ROLE}, {"role": "user", "content": prompt}]
+
+
+def notes_messages(usage: str, meaning: str, tags: List[str]) -> List[Dict[str, str]]:
+    prompt = f"""I need concise notes for a Japanese grammar point.
+    Provide insights covering:
+    - Precise nuance and emotional context
+    - Usage tips
+    - Common mistakes learners make
+    - Appropriate social register
+
+    Do NOT be verbose.
+    Keep these short, concise, and no more than 1-2 sentences max.
+
+    Grammar Point: {usage}
+    Meaning: {meaning}
+    Current Tags: {", ".join(tags)}
+
+    Format your response as a JSON object with these keys:
+    {{
+        "nuance": "",
+        "usage_tips": "",
+        "common_mistakes": "",
+        "situation": ""
+    }}
+    """
+    return [{"role": "system", "content": LINGUIST_ROLE}, {"role": "user", "content": prompt}]
+
+
+def translation_messages(japanese_text: str) -> List[Dict[str, str]]:
+    prompt = f"""Provide a professional, contextually accurate English
+    translation of the following Japanese text, focusing on capturing
+    the precise meaning and nuance:
+
+    Japanese: {japanese_text}
+
+    Provide:
+    1. A direct, natural translation only. No extra notes.
+    2. The hepburn romanization of the sentence only. No extra notes.
+
+    Format your response as a JSON object with these keys:
+    {{
+        "english": "",
+        "romaji": ""
+    }}
+    """
+    return [{"role": "system", "content": TRANSLATOR_ROLE}, {"role": "user", "content": prompt}]
+
+
+class EnhancementError(Exception):
+    """
+    A completion that could not be obtained or parsed.
+    """
+
+
+def parse_json(kind: str, content: str) -> Any:
+    """
+    Decode a JSON answer and make sure it has the keys the catalog needs, so a
+    malformed answer is treated (and never cached) as a failure.
+    """
+    try:
+        value = json.loads(content)
+    except json.JSONDecodeError as e:
+        raise EnhancementError(f"Invalid JSON in completion: {content!r}") from e
+    if not isinstance(value, dict) or not REQUIRED_KEYS[kind] <= value.keys():
+        raise EnhancementError(f"Completion is missing {sorted(REQUIRED_KEYS[kind])}: {content!r}")
+    return value
+
+
+def cache_key(model: str, kind: str, *inputs: Any) -> str:
+    """
+    Content address of one call: model, prompt kind and version, and inputs.
+    """
+    raw = json.dumps([model, kind, TEMPLATE_VERSIONS[kind], inputs], ensure_ascii=False)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk SQLite cache of successful completions, keyed by `cache_key`.
+
+    Once the stored answers exceed `max_bytes`, the least recently used ones
+    are evicted. Only successes are ever stored: failures fall back to
+    placeholders and are retried on the next run.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_CACHE_MAX_MB * 2**20) -> None:
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.db = sqlite3.connect(path, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)")
+        self.size: int = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self.db.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any) -> None:
+        raw = json.dumps(value, ensure_ascii=False)
+        size = len(raw.encode())
+        old = self.db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        self.db.execute(
+            "INSERT OR REPLACE INTO responses (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+            (key, raw, size, time.time()),
+        )
+        self.size += size - (old[0] if old else 0)
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        # keep the most recently used answers that fit in max_bytes, drop the rest
+        self.db.execute(
+            """
+            DELETE FROM responses WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (ORDER BY last_used DESC, key) AS kept FROM responses
+                ) WHERE kept > ?
+            )
+            """,
+            (self.max_bytes,),
+        )
+        self.size = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        self.db.close()
 
-    def __init__(self) -> None:
+
+class GrammarPointEnhancer:
+    def __init__(self, cache: Optional[ResponseCache] = None) -> None:
         """
         Initialize keys and models to query OpenAI with.
         Requires user to create a person .env.key secret file.
@@ -29,34 +211,35 @@ class GrammarPointEnhancer:
             project=get_required_env("OPENAI_PRJ_KEY"),
         )
         self.model: str = get_required_env("OPENAI_MODEL")
+        self.cache = cache
+
+    def _complete(self, messages: List[Dict[str, str]]) -> str:
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,  # type: ignore[arg-type]
+        )
+        content = response.choices[0].message.content
+        if content is None:
+            raise EnhancementError("Empty completion")
+        return content
+
+    def _cached(self, kind: str, *inputs: Any) -> Optional[Any]:
+        return None if self.cache is None else self.cache.get(cache_key(self.model, kind, *inputs))
+
+    def _remember(self, value: Any, kind: str, *inputs: Any) -> Any:
+        if self.cache is not None:
+            self.cache.put(cache_key(self.model, kind, *inputs), value)
+        return value
 
     def romanize(self, japanese_text: str) -> str:
         """
         Convert Japanese text to romanized text using OpenAI's GPT model
         """
+        if (hit := self._cached("romanize", japanese_text)) is not None:
+            return hit
         try:
-            prompt = f"""I need the hepburn romanization for the following
-            example sentence in Japanese.
-
-            Sentence: {japanese_text}
-
-            Don't add any extra information other than the hepburn romanization!
-            """
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a professional translator specializing in Japanese to English translation.",  # noqa: E501
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-            )
-            content = response.choices[0].message.content
-            if content is None:
-                print(f"Error generating translation: {japanese_text}")
-                return f"Translation unavailable for: {japanese_text}"
-            return content.strip()
+            content = self._complete(romanize_messages(japanese_text))
+            return self._remember(content.strip(), "romanize", japanese_text)
         except Exception as e:
             print(f"Error generating translation: {e} for {japanese_text}")
             return f"Translation unavailable for: {japanese_text}"
@@ -65,107 +248,27 @@ class GrammarPointEnhancer:
         """
         Generate comprehensive notes using OpenAI's GPT model.
         """
+        if (hit := self._cached("notes", usage, meaning, tags)) is not None:
+            return hit
         try:
-            prompt = f"""I need concise notes for a Japanese grammar point.
-            Provide insights covering:
-            - Precise nuance and emotional context
-            - Usage tips
-            - Common mistakes learners make
-            - Appropriate social register
-
-            Do NOT be verbose.
-            Keep these short, concise, and no more than 1-2 sentences max.
-
-            Grammar Point: {usage}
-            Meaning: {meaning}
-            Current Tags: {', '.join(tags)}
-
-            Format your response as a JSON object with these keys:
-            {{
-                "nuance": "",
-                "usage_tips": "",
-                "common_mistakes": "",
-                "situation": ""
-            }}
-            """
-
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert in Japanese linguistics and language pedagogy.",  # noqa: E501
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-            )
-
-            content = response.choices[0].message.content
-            if content is None:
-                print(f"Error generating notes for {usage}")
-                return {
-                    "nuance": "Unable to generate detailed notes",
-                    "usage_tips": "",
-                    "common_mistakes": "",
-                    "register": "",
-                }
-            return json.loads(content)
+            content = self._complete(notes_messages(usage, meaning, tags))
+            return self._remember(parse_json("notes", content), "notes", usage, meaning, tags)
         except Exception as e:
             print(f"Error generating notes: {e} for {usage}")
-            return {
-                "nuance": "Unable to generate detailed notes",
-                "usage_tips": "",
-                "common_mistakes": "",
-                "register": "",
-            }
+            return dict(NOTES_FALLBACK)
 
     def generate_translation(self, japanese_text: str) -> Any:
         """
         Generate a high-quality translation using OpenAI's GPT model
         """
+        if (hit := self._cached("translation", japanese_text)) is not None:
+            return hit
         try:
-            prompt = f"""Provide a professional, contextually accurate English
-            translation of the following Japanese text, focusing on capturing
-            the precise meaning and nuance:
-
-            Japanese: {japanese_text}
-
-            Provide:
-            1. A direct, natural translation only. No extra notes.
-            2. The hepburn romanization of the sentence only. No extra notes.
-
-            Format your response as a JSON object with these keys:
-            {{
-                "english": "",
-                "romaji": ""
-            }}
-            """
-
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a professional translator specializing in Japanese to English translation.",  # noqa: E501
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-            )
-            content = response.choices[0].message.content
-            if content is None:
-                print(f"Error generating translations for {japanese_text}")
-                return {
-                    "english": "Unable to generate translation.",
-                    "romaji": "Unable to generate romanization.",
-                }
-            return json.loads(content)
-
+            content = self._complete(translation_messages(japanese_text))
+            return self._remember(parse_json("translation", content), "translation", japanese_text)
         except Exception as e:
             print(f"Error generating translations: {e} for {japanese_text}")
-            return {
-                "english": "Unable to generate translation.",
-                "romaji": "Unable to generate romanization.",
-            }
+            return dict(TRANSLATION_FALLBACK)
 
     def enhance_grammar_points(self, input_file: str, output_file: str) -> None:
         """
@@ -178,7 +281,6 @@ class GrammarPointEnhancer:
         # Process each grammar point
         enhanced_grammar: list[dict[str, Any]] = []
         for grammar_point in data["grammar"]:
-
             # Generate enhanced notes
             enhanced_notes = self.generate_enhanced_notes(
                 grammar_point["usage"], grammar_point["meaning"], grammar_point["tags"]
@@ -210,15 +312,380 @@ class GrammarPointEnhancer:
         print(f"Enhanced grammar points saved to {output_file}")
 
 
+class TokenBucket:
+    """
+    Allows `rate` acquisitions per second on average, with bursts of up to
+    `capacity`. Waiters are served in arrival order.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def retry_after(error: APIStatusError) -> Optional[float]:
+    """
+    Seconds the server asked us to wait, from `retry-after-ms` or `retry-after`.
+    """
+    headers = error.response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+def source_hash(grammar_point: Dict[str, Any]) -> str:
+    """
+    Hash of the hand-written fields of a grammar point, i.e. everything the
+    enhancer reads. Generated romaji, English and notes are left out.
+    """
+    source = [
+        grammar_point["usage"],
+        grammar_point["meaning"],
+        grammar_point.get("level", ""),
+        grammar_point.get("tags", []),
+        grammar_point.get("notes", ""),
+        [example["japanese"] for example in grammar_point.get("examples", [])],
+    ]
+    return hashlib.sha256(json.dumps(source, ensure_ascii=False).encode()).hexdigest()
+
+
+def natural_keys(grammar_points: List[Dict[str, Any]]) -> List[Tuple[str, str, int]]:
+    """
+    (usage, meaning, occurrence) per point, the same natural key the database
+    load uses, so repeated usage/meaning pairs stay distinct.
+    """
+    seen: Counter = Counter()
+    keys = []
+    for g in grammar_points:
+        pair = (g["usage"], g["meaning"])
+        keys.append((*pair, seen[pair]))
+        seen[pair] += 1
+    return keys
+
+
+def is_complete(grammar_point: Dict[str, Any]) -> bool:
+    """
+    False if any call for this point fell back to a placeholder.
+    """
+    if grammar_point.get("enhanced_notes") == NOTES_FALLBACK:
+        return False
+    return all(e.get("english") != TRANSLATION_FALLBACK["english"] for e in grammar_point.get("examples", []))
+
+
+def load_checkpoint(path: Path) -> Dict[str, Dict[str, Any]]:
+    """
+    Finished points from a JSONL checkpoint, keyed by source hash. A torn last
+    line from a crash mid-write is ignored.
+    """
+    done: Dict[str, Dict[str, Any]] = {}
+    if not path.exists():
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            done[record["source"]] = record["point"]
+    return done
+
+
+def append_checkpoint(path: Path, source: str, point: Dict[str, Any]) -> None:
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"source": source, "point": point}, ensure_ascii=False) + "\n")
+
+
+def read_json(path: Path) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json_atomically(path: Path, data: Any) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+class AsyncGrammarPointEnhancer:
+    """
+    Same prompts and output as `GrammarPointEnhancer`, but every notes and
+    translation call of the whole catalog is fanned out at once. At most
+    `concurrency` requests are in flight, a token bucket keeps them under
+    `requests_per_minute`, and 429/5xx/connection errors are retried with
+    exponential backoff (honoring Retry-After). Output keeps input order.
+    """
+
+    def __init__(
+        self,
+        client: Optional[AsyncOpenAI] = None,
+        model: Optional[str] = None,
+        concurrency: int = 8,
+        requests_per_minute: float = 500,
+        max_retries: int = 6,
+        base_url: Optional[str] = None,
+        cache: Optional[ResponseCache] = None,
+    ) -> None:
+        # retries are ours, so the client must not retry on its own as well
+        self.client = client or AsyncOpenAI(
+            api_key=get_required_env("OPENAI_API_KEY"),
+            organization=get_required_env("OPENAI_ORG_KEY"),
+            project=get_required_env("OPENAI_PRJ_KEY"),
+            base_url=base_url,
+            max_retries=0,
+        )
+        self.model: str = model or get_required_env("OPENAI_MODEL")
+        self.max_retries = max_retries
+        self.backoff_base = 1.0
+        self.backoff_cap = 60.0
+        self._slots = asyncio.Semaphore(concurrency)
+        self._bucket = TokenBucket(requests_per_minute / 60, capacity=concurrency)
+        self.cache = cache
+
+    async def complete(self, messages: List[Dict[str, str]]) -> str:
+        """
+        Content of one chat completion, retrying transient failures.
+        """
+        error: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            delay: Optional[float] = None
+            async with self._slots:
+                await self._bucket.acquire()
+                try:
+                    response = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,  # type: ignore[arg-type]
+                    )
+                except APIStatusError as e:
+                    if e.status_code != 429 and e.status_code < 500:
+                        raise EnhancementError(str(e)) from e
+                    delay = retry_after(e)
+                    error = e
+                except (APIConnectionError, APITimeoutError) as e:
+                    error = e
+                else:
+                    content = response.choices[0].message.content
+                    if content is None:
+                        raise EnhancementError("Empty completion")
+                    return content
+
+            # sleep outside the semaphore so other requests keep going
+            if attempt == self.max_retries:
+                break
+            if delay is None:
+                backoff = min(self.backoff_cap, self.backoff_base * 2**attempt)
+                delay = random.uniform(backoff / 2, backoff)
+            await asyncio.sleep(delay)
+        raise EnhancementError(f"Gave up after {self.max_retries + 1} attempts: {error}")
+
+    async def cached(self, kind: str, inputs: tuple, messages: List[Dict[str, str]]) -> Any:
+        """
+        Parsed answer for one call, from the cache if this exact call has
+        succeeded before. Cache hits don't touch the semaphore or rate limit.
+        """
+        key = cache_key(self.model, kind, *inputs)
+        if self.cache is not None and (hit := self.cache.get(key)) is not None:
+            return hit
+        content = await self.complete(messages)
+        value = content.strip() if kind == "romanize" else parse_json(kind, content)
+        if self.cache is not None:
+            self.cache.put(key, value)
+        return value
+
+    async def romanize(self, japanese_text: str) -> str:
+        """
+        Convert Japanese text to romanized text using OpenAI's GPT model
+        """
+        try:
+            return await self.cached("romanize", (japanese_text,), romanize_messages(japanese_text))
+        except EnhancementError as e:
+            print(f"Error generating translation: {e} for {japanese_text}")
+            return f"Translation unavailable for: {japanese_text}"
+
+    async def generate_enhanced_notes(self, usage: str, meaning: str, tags: List[str]) -> Any:
+        """
+        Generate comprehensive notes using OpenAI's GPT model.
+        """
+        try:
+            return await self.cached("notes", (usage, meaning, tags), notes_messages(usage, meaning, tags))
+        except EnhancementError as e:
+            print(f"Error generating notes: {e} for {usage}")
+            return dict(NOTES_FALLBACK)
+
+    async def generate_translation(self, japanese_text: str) -> Any:
+        """
+        Generate a high-quality translation using OpenAI's GPT model
+        """
+        try:
+            return await self.cached("translation", (japanese_text,), translation_messages(japanese_text))
+        except EnhancementError as e:
+            print(f"Error generating translations: {e} for {japanese_text}")
+            return dict(TRANSLATION_FALLBACK)
+
+    async def enhance_grammar_point(self, grammar_point: Dict[str, Any]) -> Dict[str, Any]:
+        examples = grammar_point.get("examples", [])
+        enhanced_notes, *translations = await asyncio.gather(
+            self.generate_enhanced_notes(grammar_point["usage"], grammar_point["meaning"], grammar_point["tags"]),
+            *(self.generate_translation(example["japanese"]) for example in examples),
+        )
+        enhanced = dict(grammar_point)
+        enhanced["enhanced_notes"] = enhanced_notes
+        enhanced["examples"] = [
+            {**example, "romaji": t["romaji"], "english": t["english"]} for example, t in zip(examples, translations)
+        ]
+        print(f"Finished: {grammar_point['usage']}")
+        return enhanced
+
+    async def enhance_grammar_points(self, input_file: str, output_file: str) -> None:
+        """
+        Enhance the entire grammar points dataset
+        """
+        data = await asyncio.to_thread(read_json, Path(input_file))
+
+        # gather keeps input order no matter which calls finish first
+        data["grammar"] = await asyncio.gather(*(self.enhance_grammar_point(g) for g in data["grammar"]))
+
+        await asyncio.to_thread(write_json_atomically, Path(output_file), data)
+
+        print(f"Enhanced grammar points saved to {output_file}")
+
+    async def enhance_incremental(
+        self,
+        input_file: str,
+        output_file: str,
+        catalog_file: Path = DEFAULT_CATALOG,
+        checkpoint_file: Optional[str] = None,
+    ) -> None:
+        """
+        Enhance only the input points that are new to the catalog or whose
+        hand-written fields changed, then write the whole catalog with those
+        points replaced or appended.
+
+        Every finished point is appended to a JSONL checkpoint right away, so
+        rerunning after a crash picks up where it stopped. Points where a call
+        fell back to a placeholder are not checkpointed and get retried. The
+        checkpoint is removed once everything succeeded.
+        """
+        points = (await asyncio.to_thread(read_json, Path(input_file)))["grammar"]
+        catalog = await asyncio.to_thread(read_json, Path(catalog_file))
+
+        existing = dict(zip(natural_keys(catalog["grammar"]), range(len(catalog["grammar"]))))
+        todo = [
+            (key, point)
+            for key, point in zip(natural_keys(points), points)
+            if key not in existing or source_hash(catalog["grammar"][existing[key]]) != source_hash(point)
+        ]
+
+        checkpoint = Path(checkpoint_file or f"{output_file}.checkpoint.jsonl")
+        done = await asyncio.to_thread(load_checkpoint, checkpoint)
+        pending = [point for _, point in todo if source_hash(point) not in done]
+        print(
+            f"{len(points) - len(todo)} unchanged, {len(todo)} new or changed, "
+            f"{len(todo) - len(pending)} already in {checkpoint}"
+        )
+
+        incomplete = 0
+        # appends run in worker threads now, so take turns to keep lines whole
+        checkpoint_lock = asyncio.Lock()
+
+        async def enhance_and_checkpoint(point: Dict[str, Any]) -> None:
+            nonlocal incomplete
+            enhanced = await self.enhance_grammar_point(point)
+            done[source_hash(point)] = enhanced
+            if not is_complete(enhanced):
+                incomplete += 1
+                return
+            async with checkpoint_lock:
+                await asyncio.to_thread(append_checkpoint, checkpoint, source_hash(point), enhanced)
+
+        await asyncio.gather(*(enhance_and_checkpoint(point) for point in pending))
+
+        merged = list(catalog["grammar"])
+        for key, point in todo:
+            enhanced = done[source_hash(point)]
+            if key in existing:
+                merged[existing[key]] = enhanced
+            else:
+                merged.append(enhanced)
+        await asyncio.to_thread(write_json_atomically, Path(output_file), {**catalog, "grammar": merged})
+
+        if incomplete:
+            print(f"{incomplete} points used placeholders; rerun to retry them (checkpoint kept)")
+        else:
+            await asyncio.to_thread(checkpoint.unlink, missing_ok=True)
+        print(f"Merged catalog with {len(merged)} grammar points saved to {output_file}")
+
+
 # Usage example
 if __name__ == "__main__":
     """
     This script is currently a bit manual. Moves a filled
     `../data/grammar_template.json` to this folder and calls it `indata.json`.
     It will generate an `outdata.json` that can be copy-pasted into the official
-    `../data/grammar.json` grammar source.
+    `../data/grammar.json` grammar source. With `--incremental` only new or
+    changed points are sent to the API and `outdata.json` is the whole merged
+    catalog, ready to replace `../data/grammar.json`.
     """
 
+    parser = argparse.ArgumentParser(description="Fill notes and example translations of grammar points with AI")
+    parser.add_argument("input_file", nargs="?", default="indata.json")
+    parser.add_argument("output_file", nargs="?", default="outdata.json")
+    parser.add_argument("--sequential", action="store_true", help="one call at a time with the sync client")
+    parser.add_argument("--concurrency", type=int, default=8, help="requests in flight at once")
+    parser.add_argument("--rpm", type=float, default=500, help="requests per minute allowed by the account")
+    parser.add_argument("--max-retries", type=int, default=6, help="retries per call on 429/5xx")
+    parser.add_argument("--base-url", default=None, help="alternative chat completions endpoint, e.g. a local stub")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE_PATH, help="sqlite file caching successful answers")
+    parser.add_argument("--cache-max-mb", type=float, default=DEFAULT_CACHE_MAX_MB, help="evict LRU answers above this")
+    parser.add_argument("--no-cache", action="store_true", help="always call the API")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only enhance points that are new or changed compared to --catalog, resuming from a checkpoint",
+    )
+    parser.add_argument("--catalog", default=str(DEFAULT_CATALOG), help="existing catalog to diff and merge into")
+    parser.add_argument("--checkpoint", default=None, help="JSONL checkpoint (default: OUTPUT.checkpoint.jsonl)")
+    args = parser.parse_args()
+    if args.sequential and args.incremental:
+        parser.error("--incremental only works with the async enhancer, drop --sequential")
+
     load_dotenv(".env.key")
-    enhancer = GrammarPointEnhancer()
-    enhancer.enhance_grammar_points("indata.json", "outdata.json")
+    cache = None if args.no_cache else ResponseCache(args.cache_path, int(args.cache_max_mb * 2**20))
+    if args.sequential:
+        GrammarPointEnhancer(cache=cache).enhance_grammar_points(args.input_file, args.output_file)
+    else:
+        enhancer = AsyncGrammarPointEnhancer(
+            concurrency=args.concurrency,
+            requests_per_minute=args.rpm,
+            max_retries=args.max_retries,
+            base_url=args.base_url,
+            cache=cache,
+        )
+        if args.incremental:
+            asyncio.run(
+                enhancer.enhance_incremental(args.input_file, args.output_file, Path(args.catalog), args.checkpoint)
+            )
+        else:
+            asyncio.run(enhancer.enhance_grammar_points(args.input_file, args.output_file))
+    if cache is not None:
+        print(f"Cache: {cache.hits} hits, {cache.misses} misses")
+        cache.close()
@@ -0,0 +1,12 @@
+-- Single row counter bumped whenever the grammar catalog is (re)loaded, so API
+-- processes know when their in-memory copy of the catalog is stale.
+CREATE TABLE catalog_revision (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE,
+    revision BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+
+    -- constraints
+    CONSTRAINT single_row_catalog_revision CHECK (id)
+);
+
+INSERT INTO catalog_revision DEFAULT VALUES;
@@ -0,0 +1,13 @@
+-- usage + meaning is not unique on its own (e.g. several 〜なら entries), so the
+-- natural key also carries the entry's occurrence number within that pair
+ALTER TABLE grammar ADD COLUMN variant SMALLINT NOT NULL DEFAULT 0;
+
+UPDATE grammar g
+SET variant = numbered.rn - 1
+FROM (
+    SELECT id, ROW_NUMBER() OVER (PARTITION BY usage, meaning ORDER BY id) AS rn
+    FROM grammar
+) numbered
+WHERE g.id = numbered.id;
+
+ALTER TABLE grammar ADD CONSTRAINT grammar_natural_key UNIQUE (usage, meaning, variant);
@@ -0,0 +1,2 @@
+-- Matches the journal listing's ORDER BY so keyset pages are a single index range scan
+CREATE INDEX idx_journal_entry_user_created ON journal_entry(user_id, created_at DESC, id DESC);
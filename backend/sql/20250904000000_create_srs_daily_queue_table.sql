@@ -0,0 +1,17 @@
+CREATE TABLE srs_daily_queue (
+    user_id INT NOT NULL,
+    queue_date DATE NOT NULL,
+    grammar_ids INT[] NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, queue_date),
+
+    -- constraints
+    CONSTRAINT fk_srs_daily_queue_user FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+-- Covering index for building a queue: the due-card lookup is an index-only
+-- scan already in (due_date, ease_factor) order, no heap or grammar JOIN needed
+CREATE INDEX idx_srs_user_due_ease ON srs(user_id, due_date, ease_factor) INCLUDE (grammar_id, repetition);
+
+-- superseded by the covering index above
+DROP INDEX idx_srs_user_due;
@@ -0,0 +1,4 @@
+-- The API filters tags/level from the in-memory catalog; these cover the same
+-- filters when run in SQL (tags @> ARRAY['...'] for all, tags && ARRAY['...'] for any)
+CREATE INDEX idx_grammar_tags ON grammar USING GIN (tags);
+CREATE INDEX idx_grammar_level ON grammar(level);
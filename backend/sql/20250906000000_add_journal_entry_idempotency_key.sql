@@ -0,0 +1,4 @@
+-- Client-generated key per entry so offline clients can retry a batch import
+-- safely. Entries created one at a time leave it NULL, and NULLs never collide.
+ALTER TABLE journal_entry ADD COLUMN idempotency_key UUID;
+CREATE UNIQUE INDEX idx_journal_entry_idempotency ON journal_entry(user_id, idempotency_key);
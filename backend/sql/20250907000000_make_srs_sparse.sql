@@ -0,0 +1,8 @@
+-- srs only holds cards a user has been introduced to or reviewed; any grammar
+-- point without a row is a new card. Drop the pre-filled rows nobody touched.
+DELETE FROM srs WHERE repetition = 0 AND last_reviewed IS NULL;
+
+-- The due lookup no longer filters on repetition, so the covering index only
+-- needs grammar_id next to its keys.
+DROP INDEX idx_srs_user_due_ease;
+CREATE INDEX idx_srs_user_due_ease ON srs(user_id, due_date, ease_factor) INCLUDE (grammar_id);
@@ -0,0 +1,18 @@
+-- Append-only history of every review, written in batches by the API's
+-- write-behind buffer. No foreign keys: rows are only ever bulk COPYed in and
+-- read back for analytics, so skip the per-row lookups.
+CREATE TABLE srs_review_log (
+    user_id INT NOT NULL,
+    grammar_id INT NOT NULL,
+    reviewed_at TIMESTAMPTZ NOT NULL,
+    quality SMALLINT NOT NULL,
+    elapsed_days INT,  -- since the card's previous review, NULL on its first
+    ease_before FLOAT NOT NULL,
+    interval_before INT NOT NULL,
+    repetition_before INT NOT NULL,
+    ease_factor FLOAT NOT NULL,
+    interval_days INT NOT NULL,
+    repetition INT NOT NULL
+);
+
+CREATE INDEX idx_srs_review_log_user_time ON srs_review_log(user_id, reviewed_at);
@@ -0,0 +1,25 @@
+-- Durable background jobs, claimed by `python -m fushigi_backend.jobs.worker`.
+-- A claimed job is hidden until `run_at` (now + visibility timeout); if its
+-- worker dies it simply becomes claimable again.
+CREATE TABLE job (
+    id BIGSERIAL PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}',
+    dedupe_key TEXT,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL DEFAULT 5,
+    run_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMPTZ,
+
+    -- constraints
+    CONSTRAINT chk_job_status CHECK (status IN ('queued', 'running', 'done', 'failed'))
+);
+
+-- the claim query: unfinished jobs whose time has come, oldest first
+CREATE INDEX idx_job_claimable ON job(run_at) WHERE status IN ('queued', 'running');
+
+-- at most one unfinished job per dedupe key
+CREATE UNIQUE INDEX idx_job_dedupe_key ON job(dedupe_key) WHERE status IN ('queued', 'running');
@@ -0,0 +1,66 @@
+-- Per-row change tracking so clients can sync the catalog incrementally.
+-- Every write to grammar stamps the row with the catalog revision of its
+-- transaction, and deletes leave a tombstone at that revision. The revision is
+-- bumped once per transaction, however many rows it touches, so "everything
+-- with revision > n" is exactly what a client at revision n is missing.
+ALTER TABLE grammar ADD COLUMN revision BIGINT NOT NULL DEFAULT 0;
+UPDATE grammar SET revision = (SELECT revision FROM catalog_revision);
+CREATE INDEX idx_grammar_revision ON grammar (revision);
+
+CREATE TABLE grammar_tombstone (
+    grammar_id INT PRIMARY KEY,
+    revision BIGINT NOT NULL,
+    deleted_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_grammar_tombstone_revision ON grammar_tombstone (revision);
+
+-- Bump catalog_revision on the first call in a transaction and return the same
+-- value for the rest of it. The transaction-local setting resets on commit, and
+-- the row lock on catalog_revision orders concurrent writers by revision.
+CREATE FUNCTION next_catalog_revision() RETURNS BIGINT AS $$
+DECLARE
+    txn_revision TEXT := current_setting('fushigi.catalog_revision', true);
+    rev BIGINT;
+BEGIN
+    IF txn_revision IS NOT NULL AND txn_revision <> '' THEN
+        RETURN txn_revision::BIGINT;
+    END IF;
+    UPDATE catalog_revision
+    SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+    RETURNING revision INTO rev;
+    PERFORM set_config('fushigi.catalog_revision', rev::TEXT, true);
+    RETURN rev;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION stamp_grammar_revision() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+        RETURN NEW;  -- no-op update, clients have nothing to fetch
+    END IF;
+    NEW.revision := next_catalog_revision();
+    IF TG_OP = 'INSERT' THEN
+        DELETE FROM grammar_tombstone WHERE grammar_id = NEW.id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION record_grammar_tombstone() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO grammar_tombstone (grammar_id, revision)
+    VALUES (OLD.id, next_catalog_revision())
+    ON CONFLICT (grammar_id) DO UPDATE SET
+        revision = EXCLUDED.revision,
+        deleted_at = CURRENT_TIMESTAMP;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER grammar_stamp_revision
+BEFORE INSERT OR UPDATE ON grammar
+FOR EACH ROW EXECUTE FUNCTION stamp_grammar_revision();
+
+CREATE TRIGGER grammar_record_tombstone
+AFTER DELETE ON grammar
+FOR EACH ROW EXECUTE FUNCTION record_grammar_tombstone();
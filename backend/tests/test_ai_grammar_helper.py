@@ -0,0 +1,212 @@
+import asyncio
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import pytest
+from openai import AsyncOpenAI
+
+from scripts.ai_grammar_helper import (
+    AsyncGrammarPointEnhancer,
+    ResponseCache,
+    TokenBucket,
+    cache_key,
+    source_hash,
+)
+
+
+class StubState:
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+
+def completion(content: str) -> Dict[str, Any]:
+    return {
+        "id": "stub",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "stub-model",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+    }
+
+
+def make_handler(state: StubState) -> type:
+    class ChatCompletions(BaseHTTPRequestHandler):
+        """
+        Mimics POST /v1/chat/completions: the first `failures` calls get a 429,
+        prompts mentioning 壊 always get a 400, the rest echo the prompt's
+        Japanese text or grammar point back as JSON.
+        """
+
+        def do_POST(self) -> None:
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            prompt = body["messages"][-1]["content"]
+            with state.lock:
+                state.requests += 1
+                failing = state.failures > 0
+                state.failures -= failing
+                state.in_flight += 1
+                state.max_in_flight = max(state.max_in_flight, state.in_flight)
+            time.sleep(0.01)
+            with state.lock:
+                state.in_flight -= 1
+
+            if "壊" in prompt:
+                self.send_response(400)
+                payload: Dict[str, Any] = {"error": {"message": "bad request", "type": "invalid_request_error"}}
+            elif failing:
+                self.send_response(429)
+                self.send_header("Retry-After", "0")
+                payload = {"error": {"message": "slow down", "type": "rate_limit"}}
+            else:
+                self.send_response(200)
+                if japanese := re.search(r"Japanese: (.*)", prompt):
+                    answer = {"english": f"en:{japanese.group(1)}", "romaji": f"ro:{japanese.group(1)}"}
+                else:
+                    usage = re.search(r"Grammar Point: (.*)", prompt).group(1)  # type: ignore[union-attr]
+                    answer = {"nuance": usage, "usage_tips": "", "common_mistakes": "", "situation": ""}
+                payload = completion(json.dumps(answer, ensure_ascii=False))
+            raw = json.dumps(payload).encode()
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    return ChatCompletions
+
+
+@pytest.fixture
+def stub() -> Iterator[tuple]:
+    state = StubState(failures=3)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(state))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/v1", state
+    server.shutdown()
+
+
+def write_points(path: Path, n: int) -> None:
+    points = [
+        {
+            "usage": f"〜point{i}",
+            "meaning": "m",
+            "level": "",
+            "tags": [],
+            "notes": "",
+            "examples": [{"japanese": f"文{i}-{j}", "romaji": "", "english": ""} for j in range(2)],
+        }
+        for i in range(n)
+    ]
+    path.write_text(json.dumps({"grammar": points}, ensure_ascii=False), encoding="utf-8")
+
+
+def make_enhancer(base_url: str, cache: Optional[ResponseCache] = None) -> AsyncGrammarPointEnhancer:
+    client = AsyncOpenAI(api_key="test", base_url=base_url, max_retries=0)
+    enhancer = AsyncGrammarPointEnhancer(
+        client=client, model="stub-model", concurrency=3, requests_per_minute=60_000, cache=cache
+    )
+    enhancer.backoff_base = 0.01
+    return enhancer
+
+
+def test_async_enhancer_retries_limits_concurrency_and_keeps_order(stub: tuple, tmp_path: Path) -> None:
+    # Setup
+    base_url, state = stub
+    infile, outfile = tmp_path / "in.json", tmp_path / "out.json"
+    write_points(infile, 4)
+    enhancer = make_enhancer(base_url)
+
+    # Act
+    asyncio.run(enhancer.enhance_grammar_points(str(infile), str(outfile)))
+
+    # Assert
+    result = json.loads(outfile.read_text(encoding="utf-8"))["grammar"]
+    assert [g["enhanced_notes"]["nuance"] for g in result] == [f"〜point{i}" for i in range(4)]
+    assert [e["english"] for e in result[2]["examples"]] == ["en:文2-0", "en:文2-1"]
+    assert state.requests == 12 + 3  # every call once, plus the three rate limited attempts
+    assert state.max_in_flight <= 3
+
+
+def test_token_bucket_paces_after_burst() -> None:
+    async def run() -> float:
+        bucket = TokenBucket(rate=50, capacity=2)
+        start = time.monotonic()
+        for _ in range(7):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # 2 free from the burst, 5 more at 50/s
+    assert asyncio.run(run()) >= 0.09
+
+
+def test_rerun_is_served_from_cache_and_failures_are_not_cached(stub: tuple, tmp_path: Path) -> None:
+    # Setup
+    base_url, state = stub
+    infile, outfile = tmp_path / "in.json", tmp_path / "out.json"
+    write_points(infile, 2)
+    data = json.loads(infile.read_text(encoding="utf-8"))
+    data["grammar"][1]["examples"][0]["japanese"] = "壊れた"
+    infile.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+
+    # Act
+    asyncio.run(make_enhancer(base_url, cache).enhance_grammar_points(str(infile), str(outfile)))
+    first_run_requests = state.requests
+    asyncio.run(make_enhancer(base_url, cache).enhance_grammar_points(str(infile), str(outfile)))
+
+    # Assert
+    assert state.requests == first_run_requests + 1  # only the failed translation is tried again
+    assert cache.get(cache_key("stub-model", "translation", "壊れた")) is None
+    assert cache.get(cache_key("stub-model", "translation", "文0-1")) == {"english": "en:文0-1", "romaji": "ro:文0-1"}
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), max_bytes=30)
+
+    cache.put("a", "x" * 10)
+    cache.put("b", "y" * 10)
+    cache.get("a")
+    cache.put("c", "z" * 10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 10
+    assert cache.get("c") == "z" * 10
+
+
+def test_incremental_run_skips_unchanged_resumes_and_merges(stub: tuple, tmp_path: Path) -> None:
+    # Setup
+    base_url, state = stub
+    infile, outfile, catalog_file = tmp_path / "in.json", tmp_path / "out.json", tmp_path / "grammar.json"
+    write_points(infile, 3)
+    points = json.loads(infile.read_text(encoding="utf-8"))["grammar"]
+    unchanged = {**points[0], "enhanced_notes": {"nuance": "kept"}}
+    stale = {**points[1], "notes": "old notes", "enhanced_notes": {"nuance": "stale"}}
+    catalog_file.write_text(json.dumps({"grammar": [unchanged, stale]}, ensure_ascii=False), encoding="utf-8")
+    # a previous run crashed after finishing the new point
+    checkpoint = tmp_path / "out.json.checkpoint.jsonl"
+    resumed = {**points[2], "enhanced_notes": {"nuance": "from checkpoint"}}
+    checkpoint.write_text(
+        json.dumps({"source": source_hash(points[2]), "point": resumed}, ensure_ascii=False) + "\n" + '{"source": "tor',
+        encoding="utf-8",
+    )
+
+    # Act
+    asyncio.run(make_enhancer(base_url).enhance_incremental(str(infile), str(outfile), catalog_file))
+
+    # Assert
+    merged = json.loads(outfile.read_text(encoding="utf-8"))["grammar"]
+    assert [g["enhanced_notes"]["nuance"] for g in merged] == ["kept", "〜point1", "from checkpoint"]
+    assert merged[1]["notes"] == ""
+    assert state.requests == 3 + 3  # notes and two translations for the changed point, plus rate limited retries
+    assert not checkpoint.exists()
@@ -0,0 +1,88 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple
+
+import pytest
+
+from fushigi_backend.catalog import cache
+from fushigi_backend.catalog.cache import CatalogSnapshot, GrammarCatalog
+from fushigi_backend.data.models import GrammarInDB
+
+
+class FakePool:
+    def __init__(self) -> None:
+        self.checkouts = 0
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[Any]:
+        self.checkouts += 1
+        yield None
+
+
+def test_snapshot_payload_matches_model_serialization(make_grammar: Callable[..., GrammarInDB]) -> None:
+    # Setup
+    entries = [make_grammar(1), make_grammar(2, usage="〜のに")]
+
+    # Act
+    snapshot = CatalogSnapshot(revision=3, entries=entries)
+
+    # Assert
+    assert json.loads(snapshot.payload) == [g.model_dump(mode="json") for g in entries]
+    assert snapshot.by_id[2].usage == "〜のに"
+    assert json.loads(snapshot.encode([entries[1]]))[0]["id"] == 2
+
+
+def test_catalog_reloads_only_when_revision_changes(
+    monkeypatch: pytest.MonkeyPatch, make_grammar: Callable[..., GrammarInDB]
+) -> None:
+    # Setup
+    revision = {"value": 1}
+    loads: List[int] = []
+
+    async def fake_revision(conn: Any) -> int:
+        return revision["value"]
+
+    async def fake_entries(conn: Any) -> List[GrammarInDB]:
+        loads.append(revision["value"])
+        return [make_grammar(1)]
+
+    async def fake_row_revisions(conn: Any) -> Tuple[Dict[int, int], Dict[int, int]]:
+        return {1: revision["value"]}, {}
+
+    monkeypatch.setattr(cache, "fetch_revision", fake_revision)
+    monkeypatch.setattr(cache, "fetch_entries", fake_entries)
+    monkeypatch.setattr(cache, "fetch_row_revisions", fake_row_revisions)
+    pool = FakePool()
+    catalog = GrammarCatalog(pool_factory=lambda: pool, refresh_interval=60)  # type: ignore[arg-type,return-value]
+
+    async def scenario() -> None:
+        first = await catalog.get()
+        assert await catalog.get() is first  # served from memory
+        catalog.invalidate()
+        assert await catalog.get() is first  # same revision, no reload
+        revision["value"] = 2
+        catalog.invalidate()
+        assert (await catalog.get()).revision == 2
+
+    # Act
+    asyncio.run(scenario())
+
+    # Assert
+    assert loads == [1, 2]
+    assert pool.checkouts == 3
+
+
+def test_snapshot_changes_since(make_grammar: Callable[..., GrammarInDB]) -> None:
+    # Setup
+    entries = [make_grammar(1), make_grammar(2), make_grammar(4)]
+    snapshot = CatalogSnapshot(5, entries, row_revisions={1: 2, 2: 5, 4: 4}, tombstones={3: 3, 7: 5})
+
+    # Act
+    upserts, deleted = snapshot.changes_since(3)
+
+    # Assert
+    assert [g.id for g in upserts] == [2, 4]
+    assert deleted == [7]
+    assert snapshot.changes_since(5) == ([], [])
+    assert [g.id for g in snapshot.changes_since(0)[0]] == [1, 2, 4]
@@ -0,0 +1,51 @@
+import json
+from datetime import UTC, datetime
+from typing import Callable, List
+
+import pytest
+from pydantic import TypeAdapter
+
+from fushigi_backend.catalog.cache import CatalogSnapshot
+from fushigi_backend.data.models import GrammarInDB, JournalEntryInDB
+from fushigi_backend.routes import encoding
+from fushigi_backend.routes.encoding import encode_row_lines, encode_rows
+
+journal_list_adapter = TypeAdapter(List[JournalEntryInDB])
+
+ROWS = [
+    {
+        "id": 1,
+        "user_id": 1,
+        "title": "雨",
+        "content": "雨なので、家にいます",
+        "created_at": datetime(2025, 8, 1, 12, 30, 15, 123456, tzinfo=UTC),
+        "private": False,
+    }
+]
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_encoded_rows_match_model_serialization(monkeypatch: pytest.MonkeyPatch, trusted: bool) -> None:
+    # Setup
+    monkeypatch.setattr(encoding, "TRUST_DB_ROWS", trusted)
+    expected = [JournalEntryInDB.model_validate(row).model_dump(mode="json") for row in ROWS]
+
+    # Act
+    body = encode_rows(journal_list_adapter, ROWS)
+    lines = encode_row_lines(journal_list_adapter, ROWS).splitlines()
+
+    # Assert
+    assert json.loads(body) == expected
+    assert [json.loads(line) for line in lines] == expected
+    assert b"12:30:15.123456Z" in body
+
+
+def test_snapshot_encoding_is_byte_identical(make_grammar: Callable[..., GrammarInDB]) -> None:
+    entries = [make_grammar(1), make_grammar(2, usage="〜のに"), make_grammar(3)]
+    adapter = TypeAdapter(List[GrammarInDB])
+
+    snapshot = CatalogSnapshot(1, entries)
+
+    assert snapshot.payload == adapter.dump_json(entries)
+    assert snapshot.encode([entries[2], entries[0]]) == adapter.dump_json([entries[2], entries[0]])
+    assert snapshot.encode([]) == b"[]"
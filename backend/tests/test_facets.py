@@ -0,0 +1,96 @@
+import time
+from typing import Callable, Iterator, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from fushigi_backend.catalog.cache import CatalogSnapshot, catalog
+from fushigi_backend.catalog.facets import FacetIndex
+from fushigi_backend.data.models import GrammarInDB
+from fushigi_backend.routes.grammar import router as grammar_router
+from fushigi_backend.routes.pagination import NEXT_CURSOR_HEADER
+
+
+@pytest.fixture
+def entries(make_grammar: Callable[..., GrammarInDB]) -> List[GrammarInDB]:
+    return [
+        make_grammar(1, level="N5", tags=["causal", "polite"]),
+        make_grammar(2, level="N5", tags=["causal"]),
+        make_grammar(3, level="N4", tags=["polite"]),
+        make_grammar(4, level="N4", tags=["causal", "polite"]),
+        make_grammar(5, level="", tags=["temporal"]),
+    ]
+
+
+@pytest.fixture
+def client(entries: List[GrammarInDB]) -> Iterator[TestClient]:
+    catalog.snapshot = CatalogSnapshot(1, entries)
+    catalog._checked_at = time.monotonic()
+    app = FastAPI()
+    app.include_router(grammar_router)
+    yield TestClient(app)
+    catalog.snapshot = None
+
+
+def test_filter_all_any_and_level(entries: List[GrammarInDB]) -> None:
+    facets = FacetIndex(entries)
+
+    def ids(bits: int) -> List[int]:
+        return [g.id for g in facets.members(bits)]
+
+    assert ids(facets.filter(["causal", "polite"])) == [1, 4]
+    assert ids(facets.filter(["polite", "temporal"], match="any")) == [1, 3, 4, 5]
+    assert ids(facets.filter(["causal"], ["N4", "N5"])) == [1, 2, 4]
+    assert ids(facets.filter(["missing"])) == []
+    assert ids(facets.filter()) == [1, 2, 3, 4, 5]
+
+
+def test_counts_within_filter(entries: List[GrammarInDB]) -> None:
+    facets = FacetIndex(entries)
+
+    counts = facets.counts(facets.filter(levels=["N5"]))
+
+    assert counts == {"tags": {"causal": 2, "polite": 1}, "levels": {"N5": 2}}
+
+
+def test_filter_ids_are_decoded_once_per_combination(entries: List[GrammarInDB]) -> None:
+    facets = FacetIndex(entries)
+
+    first = facets.ids(["causal"], ["N4", "N5"])
+
+    assert first == [1, 2, 4]
+    assert facets.ids(["causal"], ["N4", "N5"]) is first
+    assert facets.ids(["causal"], ["N4", "N5"], match="any") is not first
+
+
+def test_list_filters_and_pages(client: TestClient) -> None:
+    # Act
+    first = client.get("/api/grammar", params={"tags": "polite", "page_size": "2"})
+    second = client.get(
+        "/api/grammar",
+        params={"tags": "polite", "page_size": "2", "after": first.headers[NEXT_CURSOR_HEADER]},
+    )
+
+    # Assert
+    assert [g["id"] for g in first.json()] == [1, 3]
+    assert [g["id"] for g in second.json()] == [4]
+    assert NEXT_CURSOR_HEADER not in second.headers
+
+
+def test_random_draw_respects_any_match(client: TestClient) -> None:
+    response = client.get("/api/grammar", params={"limit": "true", "tags": "temporal,missing", "match": "any"})
+
+    assert [g["id"] for g in response.json()] == [5]
+
+
+def test_random_draw_from_ids_within_a_filter(client: TestClient) -> None:
+    response = client.get("/api/grammar", params={"limit": "true", "tags": "polite", "ids": "2,3,4,99"})
+
+    assert sorted(g["id"] for g in response.json()) == [3, 4]
+
+
+def test_facets_endpoint(client: TestClient) -> None:
+    response = client.get("/api/grammar/facets", params={"tags": "causal"})
+
+    assert response.json() == {"total": 3, "tags": {"causal": 3, "polite": 2}, "levels": {"N5": 2, "N4": 1}}
@@ -0,0 +1,25 @@
+from typing import Callable
+
+from fushigi_backend.data.models import Grammar, GrammarInDB
+from fushigi_backend.db.generate import with_variants
+
+
+def test_with_variants_numbers_repeated_usage_and_meaning(make_grammar: Callable[..., GrammarInDB]) -> None:
+    # Setup
+    data = [
+        Grammar(**make_grammar(1, usage="〜なら", meaning="if").model_dump(exclude={"id"})),
+        Grammar(**make_grammar(2, usage="〜ので", meaning="because").model_dump(exclude={"id"})),
+        Grammar(**make_grammar(3, usage="〜なら", meaning="if").model_dump(exclude={"id"})),
+        Grammar(**make_grammar(4, usage="〜なら", meaning="if it's this").model_dump(exclude={"id"})),
+    ]
+
+    # Act
+    result = [(variant, g.usage, g.meaning) for variant, g in with_variants(data)]
+
+    # Assert
+    assert result == [
+        (0, "〜なら", "if"),
+        (0, "〜ので", "because"),
+        (1, "〜なら", "if"),
+        (0, "〜なら", "if it's this"),
+    ]
@@ -0,0 +1,123 @@
+import gzip
+import json
+import time
+from typing import Callable, Iterator, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from fushigi_backend.catalog.cache import CatalogSnapshot, catalog
+from fushigi_backend.data.models import GrammarInDB, GrammarProjection
+from fushigi_backend.routes.grammar import router as grammar_router
+
+projection_list = TypeAdapter(List[GrammarProjection])
+
+
+@pytest.fixture
+def client(make_grammar: Callable[..., GrammarInDB]) -> Iterator[TestClient]:
+    # revision 6: point 2 changed at 4, point 5 added at 6, point 3 deleted at 5
+    entries = [make_grammar(1), make_grammar(2), make_grammar(4), make_grammar(5)]
+    catalog.snapshot = CatalogSnapshot(6, entries, row_revisions={1: 1, 2: 4, 4: 1, 5: 6}, tombstones={3: 5})
+    catalog._checked_at = time.monotonic()
+    app = FastAPI()
+    app.include_router(grammar_router)
+    yield TestClient(app)
+    catalog.snapshot = None
+
+
+def test_changes_since_client_revision(client: TestClient) -> None:
+    # Act
+    response = client.get("/api/grammar/changes", params={"since": "3"})
+
+    # Assert
+    body = response.json()
+    assert body["revision"] == 6
+    assert body["reset"] is False
+    assert [g["id"] for g in body["upserts"]] == [2, 5]
+    assert body["deleted"] == [3]
+
+
+def test_changes_at_current_revision_are_empty(client: TestClient) -> None:
+    response = client.get("/api/grammar/changes", params={"since": "6"})
+
+    assert response.json() == {"revision": 6, "reset": False, "upserts": [], "deleted": []}
+
+
+def test_changes_from_ahead_of_catalog_resets(client: TestClient) -> None:
+    response = client.get("/api/grammar/changes", params={"since": "9"})
+
+    body = response.json()
+    assert body["reset"] is True
+    assert [g["id"] for g in body["upserts"]] == [1, 2, 4, 5]
+
+
+def test_full_list_is_gzipped_and_revalidates(client: TestClient) -> None:
+    # Act
+    first = client.get("/api/grammar", headers={"Accept-Encoding": "gzip"})
+    etag = first.headers["etag"]
+    second = client.get("/api/grammar", headers={"If-None-Match": etag})
+
+    # Assert
+    assert first.headers["content-encoding"] == "gzip"
+    assert [g["id"] for g in first.json()] == [1, 2, 4, 5]
+    assert catalog.snapshot is not None
+    assert gzip.decompress(catalog.snapshot.payload_gzip) == catalog.snapshot.payload
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+
+
+def test_full_list_without_gzip_or_with_stale_etag(client: TestClient) -> None:
+    response = client.get("/api/grammar", headers={"Accept-Encoding": "identity", "If-None-Match": '"5-0000"'})
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert len(json.loads(response.content)) == 4
+
+
+def test_summary_projection_drops_notes_and_examples(client: TestClient) -> None:
+    # Act
+    response = client.get("/api/grammar", params={"fields": "summary"})
+
+    # Assert
+    body = response.json()
+    assert [g["id"] for g in body] == [1, 2, 4, 5]
+    assert set(body[0]) == {"id", "usage", "meaning", "level", "tags"}
+    assert "etag" not in response.headers
+
+
+def test_projection_always_keeps_id_and_rejects_unknown_fields(client: TestClient) -> None:
+    assert client.get("/api/grammar", params={"fields": "usage", "page_size": "2"}).json() == [
+        {"usage": "〜ので", "id": 1},
+        {"usage": "〜ので", "id": 2},
+    ]
+    assert client.get("/api/grammar", params={"fields": "usage,secret"}).status_code == 400
+
+
+def test_projected_list_matches_the_declared_response(client: TestClient) -> None:
+    # Act
+    response = client.get("/api/grammar", params={"fields": "usage,tags"})
+    schema = client.get("/openapi.json").json()
+
+    # Assert
+    assert [g.model_dump(exclude_unset=True) for g in projection_list.validate_python(response.json())] == [
+        {"id": i, "usage": "〜ので", "tags": ["causal"]} for i in (1, 2, 4, 5)
+    ]
+    listed = schema["paths"]["/api/grammar"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert {"$ref": "#/components/schemas/GrammarProjection"} in [variant["items"] for variant in listed["anyOf"]]
+
+
+def test_batch_ids_and_detail(client: TestClient) -> None:
+    # Act
+    batch = client.get("/api/grammar", params={"ids": "5,2,99"})
+    detail = client.get("/api/grammar/4")
+    missing = client.get("/api/grammar/99")
+
+    # Assert
+    assert [g["id"] for g in batch.json()] == [2, 5]
+    assert detail.json()["id"] == 4
+    assert "examples" in detail.json()
+    assert missing.status_code == 404
+    assert client.get("/api/grammar", params={"ids": "1,x"}).status_code == 400
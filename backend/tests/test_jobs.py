@@ -0,0 +1,103 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import pytest
+
+from fushigi_backend.jobs import worker
+from fushigi_backend.jobs.handlers import PermanentJobError
+from fushigi_backend.jobs.queue import RETRY_MAX_SECONDS, Job, retry_delay
+
+
+class FakePool:
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[None]:
+        yield None
+
+
+class FakeQueue:
+    """
+    In-memory stand-in for the job table's claim/complete/fail statements.
+    """
+
+    def __init__(self, jobs: List[Job]) -> None:
+        self.queued = list(jobs)
+        self.results: Dict[int, Tuple[str, Any]] = {}
+
+    async def claim(self, conn: Any, limit: int, visibility_timeout: float) -> List[Job]:
+        claimed, self.queued = self.queued[:limit], self.queued[limit:]
+        return claimed
+
+    async def complete(self, conn: Any, job: Job) -> None:
+        self.results[job.id] = ("done", None)
+
+    async def fail(self, conn: Any, job: Job, error: str, retry: bool = True) -> None:
+        self.results[job.id] = ("retry" if retry else "failed", error)
+
+    async def reap(self, conn: Any, keep_days: int) -> None:
+        pass
+
+
+def job(id: int, kind: str) -> Job:
+    return Job(id=id, kind=kind, payload={"n": id}, attempts=1, max_attempts=5)
+
+
+@pytest.fixture
+def queue(monkeypatch: pytest.MonkeyPatch) -> FakeQueue:
+    queue = FakeQueue([job(1, "ok"), job(2, "bad_payload"), job(3, "flaky"), job(4, "slow"), job(5, "unknown")])
+    monkeypatch.setattr(worker, "claim_jobs", queue.claim)
+    monkeypatch.setattr(worker, "complete_job", queue.complete)
+    monkeypatch.setattr(worker, "fail_job", queue.fail)
+    monkeypatch.setattr(worker, "reap_jobs", queue.reap)
+    return queue
+
+
+def test_worker_records_each_outcome_and_drains_on_stop(queue: FakeQueue) -> None:
+    # Setup
+    seen: List[int] = []
+
+    async def ok(payload: Dict[str, Any]) -> None:
+        seen.append(payload["n"])
+
+    async def bad_payload(payload: Dict[str, Any]) -> None:
+        raise PermanentJobError("payload needs entry_ids")
+
+    async def flaky(payload: Dict[str, Any]) -> None:
+        raise ConnectionError("database went away")
+
+    async def slow(payload: Dict[str, Any]) -> None:
+        await asyncio.sleep(10)
+
+    handlers = {"ok": ok, "bad_payload": bad_payload, "flaky": flaky, "slow": slow}
+    w = worker.Worker(
+        concurrency=2,
+        visibility_timeout=0.2,
+        poll_interval=0.01,
+        handlers=handlers,
+        pool_factory=FakePool,  # type: ignore[arg-type]
+    )
+
+    async def scenario() -> None:
+        stop = asyncio.Event()
+        loop = asyncio.create_task(w.run(stop))
+        while len(queue.results) < 5:
+            await asyncio.sleep(0.01)
+        stop.set()
+        await loop
+
+    # Act
+    asyncio.run(scenario())
+
+    # Assert
+    assert seen == [1]
+    assert queue.results[1] == ("done", None)
+    assert queue.results[2] == ("failed", "payload needs entry_ids")
+    assert queue.results[3] == ("retry", "ConnectionError: database went away")
+    assert queue.results[4][0] == "retry" and "timed out" in queue.results[4][1]
+    assert queue.results[5] == ("failed", "no handler for 'unknown'")
+
+
+def test_retry_delay_backs_off_and_caps() -> None:
+    assert 5 <= retry_delay(1) <= 10
+    assert 20 <= retry_delay(3) <= 40
+    assert retry_delay(30) <= RETRY_MAX_SECONDS
@@ -0,0 +1,101 @@
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Iterator, List, Sequence
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from fushigi_backend.data.models import JournalEntryImport, JournalImportResult
+from fushigi_backend.db.connect import get_connection
+from fushigi_backend.routes import journal
+from fushigi_backend.routes.users import get_current_user_id
+
+
+class FakeStore:
+    """
+    Stands in for the journal table: remembers keys per user like the unique index.
+    """
+
+    def __init__(self) -> None:
+        self.ids: dict = {}
+        self.tagged: List[int] = []
+
+    async def import_entries(
+        self, conn: Any, user_id: int, entries: Sequence[JournalEntryImport]
+    ) -> List[JournalImportResult]:
+        results = []
+        for e in entries:
+            key = (user_id, e.idempotency_key)
+            created = key not in self.ids
+            if created:
+                self.ids[key] = len(self.ids) + 1
+            results.append(JournalImportResult(idempotency_key=e.idempotency_key, id=self.ids[key], created=created))
+        return results
+
+    async def enqueue_tagging(self, conn: Any, entry_ids: List[int]) -> None:
+        self.tagged.extend(entry_ids)
+
+
+class FakeConnection:
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        yield
+
+
+@pytest.fixture
+def store(monkeypatch: pytest.MonkeyPatch) -> FakeStore:
+    store = FakeStore()
+    monkeypatch.setattr(journal, "import_journal_entries", store.import_entries)
+    monkeypatch.setattr(journal, "enqueue_tagging", store.enqueue_tagging)
+    return store
+
+
+@pytest.fixture
+def client(store: FakeStore) -> Iterator[TestClient]:
+    async def no_connection() -> Any:
+        yield FakeConnection()
+
+    app = FastAPI()
+    app.include_router(journal.router)
+    app.dependency_overrides[get_connection] = no_connection
+    app.dependency_overrides[get_current_user_id] = lambda: 7
+    yield TestClient(app)
+
+
+def entry(key: uuid.UUID, content: str = "雨なので、家にいます。") -> dict:
+    return {"idempotency_key": str(key), "title": "offline", "content": content, "private": False}
+
+
+def test_batch_returns_ids_in_request_order_and_retries_safely(client: TestClient, store: FakeStore) -> None:
+    # Setup
+    keys = [uuid.uuid4() for _ in range(3)]
+    body = {"entries": [entry(k, content=f"文{i}。") for i, k in enumerate(keys)]}
+
+    # Act
+    first = client.post("/api/journal/batch", json=body)
+    retry = client.post("/api/journal/batch", json=body)
+
+    # Assert
+    assert first.status_code == 200
+    assert [r["idempotency_key"] for r in first.json()] == [str(k) for k in keys]
+    assert all(r["created"] for r in first.json())
+    assert [r["id"] for r in retry.json()] == [r["id"] for r in first.json()]
+    assert not any(r["created"] for r in retry.json())
+    assert store.tagged == [1, 2, 3]  # only new entries are queued for tagging
+    assert {user for user, _ in store.ids} == {7}
+
+
+def test_batch_rejects_duplicate_keys(client: TestClient, store: FakeStore) -> None:
+    key = uuid.uuid4()
+
+    response = client.post("/api/journal/batch", json={"entries": [entry(key), entry(key)]})
+
+    assert response.status_code == 400
+    assert store.ids == {}
+
+
+def test_batch_size_is_bounded(client: TestClient) -> None:
+    assert client.post("/api/journal/batch", json={"entries": []}).status_code == 422
+    too_many = {"entries": [entry(uuid.uuid4()) for _ in range(1001)]}
+    assert client.post("/api/journal/batch", json=too_many).status_code == 422
@@ -0,0 +1,32 @@
+from fushigi_backend.catalog.matcher import GrammarMatcher, expand_usage, segment_sentences
+
+
+def test_segment_sentences_splits_on_japanese_punctuation_and_newlines() -> None:
+    result = segment_sentences("雨なので、家にいます。明日は晴れるかな？\n そうですね！")
+
+    assert result == ["雨なので、家にいます。", "明日は晴れるかな？", "そうですね！"]
+
+
+def test_expand_usage_handles_placeholders_and_alternatives() -> None:
+    assert expand_usage("〜から〜にかけて") == [("から", "にかけて")]
+    assert expand_usage("〜こそ・〜からこそ") == [("からこそ",), ("こそ",)]
+    assert expand_usage("〜（でしょう・だろう）") == [("だろう",), ("でしょう",)]
+    assert expand_usage("〜一方（で）") == [("一方",), ("一方で",)]
+    assert expand_usage("〜はずだ") == [("はずだ",)]
+    assert expand_usage("〜で") == []  # a lone particle would tag everything
+
+
+def test_matcher_requires_fragments_in_order() -> None:
+    # Setup
+    matcher = GrammarMatcher(
+        [
+            (1, ("から", "にかけて")),
+            (2, ("ので",)),
+            (3, ("はずがない",)),
+        ]
+    )
+
+    # Act / Assert
+    assert matcher.match("東京から大阪にかけて雨です。") == [1]
+    assert matcher.match("大阪にかけて、東京から。") == []
+    assert matcher.match("雨なので、来るはずがない。") == [2, 3]
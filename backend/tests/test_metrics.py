@@ -0,0 +1,51 @@
+import time
+from typing import Callable, Iterator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from fushigi_backend.catalog.cache import CatalogSnapshot, catalog
+from fushigi_backend.data.models import GrammarInDB
+from fushigi_backend.metrics import TimingMiddleware, statement_label
+from fushigi_backend.routes.grammar import router as grammar_router
+from fushigi_backend.routes.metrics import router as metrics_router
+
+
+@pytest.fixture
+def client(make_grammar: Callable[..., GrammarInDB]) -> Iterator[TestClient]:
+    catalog.snapshot = CatalogSnapshot(1, [make_grammar(i) for i in range(1, 4)])
+    catalog._checked_at = time.monotonic()
+    app = FastAPI()
+    app.include_router(grammar_router)
+    app.include_router(metrics_router)
+    app.add_middleware(TimingMiddleware)
+    yield TestClient(app)
+    catalog.snapshot = None
+
+
+def test_statement_label() -> None:
+    assert statement_label("\n  SELECT id, usage\n  FROM grammar\n  ORDER BY id") == "SELECT GRAMMAR"
+    assert statement_label(b"UPDATE srs SET ease_factor = 2.5") == "UPDATE SRS"
+    assert statement_label("INSERT INTO journal_entry (title) VALUES (%s)") == "INSERT JOURNAL_ENTRY"
+
+
+def test_server_timing_header_splits_phases(client: TestClient) -> None:
+    response = client.get("/api/grammar", params={"page_size": "2"})
+
+    timing = response.headers["server-timing"]
+    assert "serialize;dur=" in timing
+    assert "total;dur=" in timing
+
+
+def test_metrics_exposes_route_latency(client: TestClient) -> None:
+    # Setup
+    client.get("/api/grammar/search", params={"q": "ので"})
+
+    # Act
+    body = client.get("/metrics").text
+
+    # Assert
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/grammar/search",status="200"}' in body
+    assert "serialization_duration_seconds_bucket" in body
+    assert "db_requests_waiting" in body
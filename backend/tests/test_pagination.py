@@ -0,0 +1,58 @@
+import json
+import time
+from typing import Callable, Iterator
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from fushigi_backend.catalog.cache import CatalogSnapshot, catalog
+from fushigi_backend.data.models import GrammarInDB
+from fushigi_backend.routes.grammar import router as grammar_router
+from fushigi_backend.routes.pagination import NDJSON, NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def client(make_grammar: Callable[..., GrammarInDB]) -> Iterator[TestClient]:
+    # serve a fixed catalog without postgres
+    catalog.snapshot = CatalogSnapshot(1, [make_grammar(i, usage=f"usage-{i}") for i in range(1, 8)])
+    catalog._checked_at = time.monotonic()
+    app = FastAPI()
+    app.include_router(grammar_router)
+    yield TestClient(app)
+    catalog.snapshot = None
+
+
+def test_cursor_round_trip() -> None:
+    cursor = encode_cursor("2025-08-01T12:00:00+00:00", 42)
+
+    assert decode_cursor(cursor, 2) == ["2025-08-01T12:00:00+00:00", 42]
+
+
+def test_decode_cursor_rejects_garbage() -> None:
+    with pytest.raises(HTTPException):
+        decode_cursor("not-a-cursor", 2)
+
+
+def test_grammar_pages_follow_next_cursor(client: TestClient) -> None:
+    # Act
+    seen = []
+    params = {"page_size": "3"}
+    while True:
+        response = client.get("/api/grammar", params=params)
+        seen.extend(g["id"] for g in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+        params["after"] = cursor
+
+    # Assert
+    assert seen == [1, 2, 3, 4, 5, 6, 7]
+
+
+def test_grammar_streams_ndjson(client: TestClient) -> None:
+    response = client.get("/api/grammar", headers={"Accept": NDJSON})
+
+    lines = response.text.splitlines()
+    assert response.headers["content-type"].startswith(NDJSON)
+    assert [json.loads(line)["id"] for line in lines] == [1, 2, 3, 4, 5, 6, 7]
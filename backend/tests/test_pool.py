@@ -0,0 +1,34 @@
+from typing import Iterator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from fushigi_backend.db import connect
+from fushigi_backend.routes.internal import router as internal_router
+
+
+@pytest.fixture
+def closed_pool() -> Iterator[None]:
+    # the pool is created closed, so building it needs no postgres
+    connect._pool = None
+    yield
+    connect._pool = None
+
+
+def test_pool_is_sized_from_settings(closed_pool: None) -> None:
+    pool = connect.get_pool()
+
+    assert (pool.min_size, pool.max_size) == (connect.DB_POOL_MIN_SIZE, connect.DB_POOL_MAX_SIZE)
+    assert pool.closed
+    assert connect.get_pool() is pool
+
+
+def test_internal_pool_reports_stats(closed_pool: None) -> None:
+    app = FastAPI()
+    app.include_router(internal_router)
+
+    response = TestClient(app).get("/internal/pool")
+
+    assert response.json()["pool_max"] == connect.DB_POOL_MAX_SIZE
+    assert response.json()["requests_waiting"] == 0
@@ -0,0 +1,129 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import pytest
+
+from fushigi_backend.catalog.sampling import GrammarSampler
+from fushigi_backend.srs import queue
+from fushigi_backend.srs.queue import enroll_cards, get_daily_queue, sample_new_cards
+from fushigi_backend.srs.sm2 import sm2_update
+
+
+class FakeCursor:
+    def __init__(self, conn: "FakeConnection") -> None:
+        self.conn = conn
+        self.rowcount = 0
+        self.result: List[dict] = []
+
+    async def execute(self, query: str, params: Tuple[Any, ...]) -> None:
+        self.conn.statements.append(params)
+        if query.lstrip().startswith("INSERT"):
+            _, user_ids, grammar_ids = params
+            new = set(zip(user_ids, grammar_ids)) - self.conn.srs
+            self.conn.srs |= new
+            self.rowcount = len(new)
+        else:
+            user_id, candidates = params
+            self.result = [{"grammar_id": g} for u, g in self.conn.srs if u == user_id and g in candidates]
+
+    async def fetchall(self) -> List[dict]:
+        return self.result
+
+
+class FakeConnection:
+    """
+    Just enough of an srs table: the set of enrolled (user_id, grammar_id) cards.
+    """
+
+    def __init__(self, srs: Set[Tuple[int, int]]) -> None:
+        self.srs = srs
+        self.statements: List[Tuple[Any, ...]] = []
+
+    @asynccontextmanager
+    async def cursor(self, **kwargs: Any) -> AsyncIterator[FakeCursor]:
+        yield FakeCursor(self)
+
+
+def test_new_cards_are_the_ones_without_a_row() -> None:
+    # Setup
+    sampler = GrammarSampler(range(1, 21))
+    conn = FakeConnection({(1, i) for i in range(1, 16)} | {(2, 16)})
+
+    # Act
+    picked = asyncio.run(sample_new_cards(conn, sampler, user_id=1, k=10))  # type: ignore[arg-type]
+
+    # Assert
+    assert sorted(picked) == [16, 17, 18, 19, 20]
+
+
+def test_enroll_cards_streams_in_chunks_and_skips_existing(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Setup
+    monkeypatch.setattr(queue, "ENROLL_CHUNK_SIZE", 4)
+    conn = FakeConnection({(1, 3)})
+    cards = ((1, i) for i in range(1, 11))
+
+    # Act
+    created = asyncio.run(enroll_cards(conn, cards))  # type: ignore[arg-type]
+
+    # Assert
+    assert created == 9
+    assert len(conn.statements) == 3
+    assert conn.srs == {(1, i) for i in range(1, 11)}
+
+
+class QueueCursor:
+    def __init__(self, conn: "QueueConnection") -> None:
+        self.conn = conn
+        self.result: List[dict] = []
+
+    async def execute(self, query: str, params: Tuple[Any, ...]) -> None:
+        if "srs_daily_queue" in query:
+            self.result = [{"grammar_ids": self.conn.queue}]
+        else:
+            _, grammar_ids, day, _ = params
+            self.result = [
+                {"grammar_id": g}
+                for g, row in self.conn.srs.items()
+                if g in grammar_ids and (row["due_date"] > day or (row["last_reviewed"] or date.min) >= day)
+            ]
+
+    async def fetchone(self) -> Optional[dict]:
+        return self.result[0]
+
+    async def fetchall(self) -> List[dict]:
+        return self.result
+
+
+class QueueConnection:
+    """
+    One user's stored daily queue and srs rows, keyed by grammar id.
+    """
+
+    def __init__(self, queue: List[int], srs: Dict[int, Dict[str, Any]]) -> None:
+        self.queue = queue
+        self.srs = srs
+
+    @asynccontextmanager
+    async def cursor(self, **kwargs: Any) -> AsyncIterator[QueueCursor]:
+        yield QueueCursor(self)
+
+
+@pytest.mark.parametrize("quality", [5, 1])
+def test_reviewed_card_leaves_the_daily_queue(quality: int) -> None:
+    # Setup
+    today = date.today()
+    sampler = GrammarSampler(range(1, 4))
+    srs = {g: {"due_date": today, "last_reviewed": None} for g in (1, 2, 3)}
+    conn = QueueConnection([1, 2, 3], srs)
+    before = asyncio.run(get_daily_queue(conn, sampler, 1, today))  # type: ignore[arg-type]
+
+    # Act
+    update = sm2_update(2.5, 0, 0, quality)
+    srs[2] = {"due_date": update["due_date"], "last_reviewed": today}
+    after = asyncio.run(get_daily_queue(conn, sampler, 1, today))  # type: ignore[arg-type]
+
+    # Assert
+    assert before == [1, 2, 3]
+    assert after == [1, 3]
@@ -0,0 +1,102 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from typing import Any, AsyncIterator, Callable, List
+
+from fushigi_backend.srs.review_log import ReviewLogBuffer, ReviewLogRow
+
+
+class FakeCopy:
+    def __init__(self, pool: "FakePool") -> None:
+        self.pool = pool
+
+    async def write_row(self, row: Any) -> None:
+        self.pool.on_write()
+        if self.pool.fail:
+            raise OSError("connection lost")
+        self.pool.written.append(row)
+
+
+class FakePool:
+    def __init__(self) -> None:
+        self.written: List[Any] = []
+        self.copies = 0
+        self.fail = False
+        self.on_write: Callable[[], None] = lambda: None
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator["FakePool"]:
+        yield self
+
+    @asynccontextmanager
+    async def cursor(self) -> AsyncIterator["FakePool"]:
+        yield self
+
+    @asynccontextmanager
+    async def copy(self, statement: str) -> AsyncIterator[FakeCopy]:
+        assert statement.startswith("COPY srs_review_log (user_id, grammar_id, reviewed_at")
+        self.copies += 1
+        yield FakeCopy(self)
+
+
+def review(grammar_id: int) -> ReviewLogRow:
+    return (1, grammar_id, datetime(2025, 9, 1, tzinfo=UTC), 4, 6, 2.5, 6, 2, 2.5, 15, 3)
+
+
+def test_full_batch_is_flushed_without_waiting_for_the_timer() -> None:
+    pool = FakePool()
+
+    async def scenario() -> None:
+        buffer = ReviewLogBuffer(lambda: pool, batch_size=3, flush_interval=60)  # type: ignore[arg-type,return-value]
+        buffer.start()
+        buffer.add([review(1), review(2)])
+        await asyncio.sleep(0.05)
+        assert pool.written == []  # below the batch size, waits for the timer
+        buffer.add([review(3)])
+        await asyncio.sleep(0.05)
+        assert [row[1] for row in pool.written] == [1, 2, 3]
+        assert pool.copies == 1
+        await buffer.stop()
+
+    asyncio.run(scenario())
+
+
+def test_failed_flush_keeps_rows_and_stop_writes_them() -> None:
+    pool = FakePool()
+
+    async def scenario() -> None:
+        buffer = ReviewLogBuffer(lambda: pool, batch_size=100, flush_interval=60)  # type: ignore[arg-type,return-value]
+        buffer.start()
+        buffer.add([review(1)])
+        pool.fail = True
+        assert await buffer.flush() == 0
+        buffer.add([review(2)])
+        assert [row[1] for row in buffer.pending] == [1, 2]  # order kept for the retry
+        pool.fail = False
+        await buffer.stop()
+
+    asyncio.run(scenario())
+
+    assert [row[1] for row in pool.written[-2:]] == [1, 2]
+
+
+def test_backlog_is_bounded() -> None:
+    buffer = ReviewLogBuffer(FakePool, batch_size=100, max_pending=3)  # type: ignore[arg-type]
+
+    buffer.add([review(i) for i in range(5)])
+
+    assert [row[1] for row in buffer.pending] == [2, 3, 4]
+
+
+def test_requeue_after_failed_flush_stays_bounded() -> None:
+    pool = FakePool()
+    buffer = ReviewLogBuffer(lambda: pool, batch_size=100, max_pending=3)  # type: ignore[arg-type,return-value]
+    buffer.add([review(1), review(2)])
+    pool.fail = True
+    # reviews keep arriving while the COPY is in flight
+    pool.on_write = lambda: buffer.add([review(3), review(4)])
+
+    written = asyncio.run(buffer.flush())
+
+    assert written == 0
+    assert [row[1] for row in buffer.pending] == [2, 3, 4]
@@ -0,0 +1,34 @@
+from fushigi_backend.catalog.sampling import GrammarSampler
+
+
+def make_sampler() -> GrammarSampler:
+    return GrammarSampler([1, 2, 3, 4, 5])
+
+
+def test_sample_returns_distinct_ids() -> None:
+    sampler = make_sampler()
+
+    result = sampler.sample(5)
+
+    assert sorted(result) == [1, 2, 3, 4, 5]
+
+
+def test_sample_with_seed_is_reproducible() -> None:
+    sampler = make_sampler()
+
+    assert sampler.sample(3, seed=42) == sampler.sample(3, seed=42)
+
+
+def test_sample_draws_only_from_within() -> None:
+    sampler = make_sampler()
+
+    assert sorted(sampler.sample(5, within=[1, 4])) == [1, 4]
+    assert sampler.sample(5, within=[]) == []
+
+
+def test_sample_respects_exclusions_even_when_they_dominate() -> None:
+    sampler = make_sampler()
+
+    result = sampler.sample(5, exclude={1, 2, 3, 4})
+
+    assert result == [5]
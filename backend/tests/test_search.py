@@ -0,0 +1,166 @@
+import re
+from typing import Callable, List
+
+import pytest
+
+from fushigi_backend.catalog.search import GrammarSearchIndex, compact, normalize, romanize
+from fushigi_backend.data.load import load_defaults
+from fushigi_backend.data.models import GrammarInDB
+
+
+def example(japanese: str, romaji: str, english: str) -> dict:
+    return {"japanese": japanese, "romaji": romaji, "english": english}
+
+
+def test_normalize_folds_width_katakana_and_macrons() -> None:
+    assert normalize("ノデ") == "ので"
+    assert normalize("Ｋonshūmatsu") == "konshumatsu"
+    assert normalize("ダ") == "だ"  # dakuten survive
+
+
+def test_romanize_reads_kana_as_hepburn() -> None:
+    assert romanize("かもしれません") == "kamoshiremasen"
+    assert romanize("ちょっと") == "chotto"
+    assert romanize("しゃしん") == "shashin"
+
+
+def test_romanize_never_lets_kanji_into_a_reading() -> None:
+    # Act
+    reading = romanize(normalize("〜と言っても"))
+
+    # Assert
+    assert reading.isascii()
+    assert [compact(line) for line in reading.split("\n") if compact(line)] == ["to", "ttemo"]
+
+
+def test_search_ranks_usage_hits_first_and_tolerates_typos(make_grammar: Callable[..., GrammarInDB]) -> None:
+    # Setup
+    index = GrammarSearchIndex(
+        [
+            make_grammar(1, usage="〜のに", meaning="even though"),
+            make_grammar(2, usage="〜ので", meaning="because"),
+            make_grammar(3, usage="〜ながら", meaning="while doing"),
+        ]
+    )
+
+    # Act / Assert
+    assert index.search("ので")[0].id == 2
+    assert index.search("ノデ")[0].id == 2
+    assert index.search("node")[0].id == 2
+    assert index.search("becuase")[0].id == 2
+    assert [g.id for g in index.search("while")] == [3]
+    assert index.search("") == []
+
+
+def test_empty_index_finds_nothing() -> None:
+    assert GrammarSearchIndex([]).search("because") == []
+
+
+def test_exact_gloss_outranks_a_mention_in_an_example(make_grammar: Callable[..., GrammarInDB]) -> None:
+    # Setup
+    mentioned = make_grammar(1, usage="〜ばかり", meaning="only", examples=[example("a", "a", "Only because of you.")])
+    glossed = make_grammar(2, usage="〜から", meaning="since; because", examples=[])
+
+    # Act
+    results = GrammarSearchIndex([mentioned, glossed]).search("because")
+
+    # Assert
+    assert [g.id for g in results] == [2, 1]
+
+
+def test_contiguous_phrase_outranks_scattered_words(make_grammar: Callable[..., GrammarInDB]) -> None:
+    # Setup
+    scattered = make_grammar(1, usage="〜らしい", meaning="that it seems; it is what was said", examples=[])
+    phrase = make_grammar(2, usage="〜そうだ", meaning="it is said that", examples=[])
+
+    # Act
+    results = GrammarSearchIndex([scattered, phrase]).search("it is said that")
+
+    # Assert
+    assert [g.id for g in results] == [2, 1]
+
+
+def test_query_starting_like_a_usage_finds_it(make_grammar: Callable[..., GrammarInDB]) -> None:
+    # Setup
+    entries = [
+        make_grammar(1, usage="〜ても", meaning="even if", examples=[]),
+        make_grammar(2, usage="〜ことだし", meaning="since", examples=[example("天気もいい", "Tenki mo ii", "")]),
+    ]
+
+    # Act / Assert
+    assert GrammarSearchIndex(entries).search("te mo ii")[0].id == 1
+    assert GrammarSearchIndex(entries).search("てもいい")[0].id == 1
+
+
+def test_example_translations_align_a_word_with_a_usage(make_grammar: Callable[..., GrammarInDB]) -> None:
+    # Setup: no meaning says "if", but なら keeps being translated that way
+    naru = [example(f"{w}なら行きます", f"{w} nara ikimasu", f"If it is {w}, I will go") for w in ("雨", "雪", "晴れ")]
+    other = [example("食べたり", "tabetari", f"I eat {n}") for n in range(5)] + [example("a", "a", "If only")]
+    entries = [
+        make_grammar(1, usage="〜たり", meaning="listing actions", examples=other),
+        make_grammar(2, usage="〜なら", meaning="conditional on a topic", examples=naru),
+    ]
+
+    # Act / Assert
+    assert GrammarSearchIndex(entries).search("if")[0].id == 2
+
+
+@pytest.fixture(scope="module")
+def catalog_entries() -> List[GrammarInDB]:
+    # the shipped catalog: toy catalogs are too small to expose ranking problems
+    return [GrammarInDB(id=i, **g.model_dump()) for i, g in enumerate(load_defaults(use_snapshot=False), start=1)]
+
+
+@pytest.fixture(scope="module")
+def catalog_index(catalog_entries: List[GrammarInDB]) -> GrammarSearchIndex:
+    return GrammarSearchIndex(catalog_entries)
+
+
+QUERIES = ["because", "becuase", "no", "it is said that", "kamoshiremasen", "ので", "te mo ii", "to itte", "か"]
+
+
+def test_catalog_order_does_not_change_results(
+    catalog_entries: List[GrammarInDB], catalog_index: GrammarSearchIndex
+) -> None:
+    # Setup
+    reversed_index = GrammarSearchIndex(catalog_entries[::-1])
+
+    # Act / Assert
+    for query in QUERIES:
+        assert [g.id for g in reversed_index.search(query)] == [g.id for g in catalog_index.search(query)], query
+
+
+def test_catalog_usages_find_themselves(catalog_entries: List[GrammarInDB], catalog_index: GrammarSearchIndex) -> None:
+    # usages can repeat (〜なら) or differ only in punctuation (〜たら, 〜たら、〜), so compare the kana
+    for entry in catalog_entries:
+        usage = normalize(entry.usage)
+        top = catalog_index.search(entry.usage, limit=1)
+        assert top and compact(normalize(top[0].usage)) == compact(usage), entry.usage
+        # and read in romaji, the reading is one of the top result's forms (の of 〜向き（だ・に・の） for "no")
+        reading = compact(romanize(usage))
+        if reading and reading.isascii() and "\n" not in romanize(usage).strip("\n"):
+            top = catalog_index.search(reading, limit=1)
+            top_usage = normalize(top[0].usage)
+            forms = [compact(romanize(form)) for form in re.split(r"\W+", top_usage)]
+            assert reading == compact(romanize(top_usage)) or reading in forms, reading
+
+
+def test_catalog_usage_readings_are_romaji(catalog_entries: List[GrammarInDB]) -> None:
+    for entry in catalog_entries:
+        assert romanize(normalize(entry.usage)).isascii(), entry.usage
+
+
+@pytest.mark.parametrize("word", ["because", "if", "while", "even"])
+def test_catalog_english_results_say_the_word(catalog_index: GrammarSearchIndex, word: str) -> None:
+    for g in catalog_index.search(word, limit=5):
+        text = " ".join([g.meaning] + [e.english for e in g.examples])
+        assert word in re.split(r"\W+", normalize(text)), g.usage
+
+
+def test_catalog_typo_finds_the_same_points(catalog_index: GrammarSearchIndex) -> None:
+    # Act
+    correct = {g.id for g in catalog_index.search("because", limit=5)}
+    typo = {g.id for g in catalog_index.search("becuase", limit=5)}
+
+    # Assert
+    assert len(correct & typo) >= 3
@@ -0,0 +1,42 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from fushigi_backend.serve import configure_environment, pool_size_for
+
+
+def test_pool_size_splits_budget_across_workers() -> None:
+    assert pool_size_for(80, 4) == 20
+    assert pool_size_for(10, 3) == 3
+    with pytest.raises(ValueError):
+        pool_size_for(3, 4)
+
+
+def test_configure_environment_sizes_pools_and_metrics(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    # Setup
+    for key in ("DB_POOL_MAX_SIZE", "DB_POOL_MIN_SIZE"):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    (tmp_path / "histogram_123.db").write_bytes(b"stale")
+
+    # Act
+    configure_environment(workers=8, budget=12)
+
+    # Assert
+    assert os.environ["DB_POOL_MAX_SIZE"] == "1"
+    assert os.environ["DB_POOL_MIN_SIZE"] == "1"
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_configure_environment_keeps_smaller_explicit_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Setup
+    monkeypatch.setenv("DB_POOL_MAX_SIZE", "5")
+    monkeypatch.setenv("DB_POOL_MIN_SIZE", "2")
+
+    # Act
+    configure_environment(workers=1, budget=80)
+
+    # Assert
+    assert os.environ["DB_POOL_MAX_SIZE"] == "5"
+    assert os.environ["DB_POOL_MIN_SIZE"] == "2"
@@ -0,0 +1,47 @@
+import itertools
+from datetime import date, timedelta
+
+import numpy as np
+
+from fushigi_backend.srs.simulate import simulate
+from fushigi_backend.srs.sm2 import sm2_update, sm2_update_batch
+
+
+def test_batch_matches_scalar_sm2_exactly() -> None:
+    # Setup: every quality against a spread of card states
+    states = list(itertools.product([1.3, 1.7, 2.36, 2.5, 3.1], [0, 1, 6, 15, 41], [0, 1, 2, 7], range(6)))
+    ease, interval, repetition, quality = (np.array(column) for column in zip(*states))
+
+    # Act
+    batch = sm2_update_batch(ease, interval, repetition, quality)
+
+    # Assert
+    for i, (e, n, r, q) in enumerate(states):
+        expected = sm2_update(ease_factor=e, interval_days=n, repetition=r, quality=q)
+        assert batch["ease_factor"][i] == expected["ease_factor"]
+        assert batch["interval_days"][i] == expected["interval_days"]
+        assert batch["repetition"][i] == expected["repetition"]
+        assert batch["due_date"][i] == np.datetime64(expected["due_date"])
+
+
+def test_batch_due_dates_start_from_given_day() -> None:
+    result = sm2_update_batch([2.5], [6], [2], [4], today=date(2025, 1, 1))
+
+    assert result["due_date"][0] == np.datetime64(date(2025, 1, 1) + timedelta(days=15))
+
+
+def test_simulate_respects_daily_limit() -> None:
+    forecast = simulate(users=20, days=30, cards=50, daily_limit=5, seed=0)
+
+    assert len(forecast) == 30
+    assert all(day["reviews"] <= 20 * 5 for day in forecast)
+    assert forecast[0]["new_cards"] == 100
+    assert sum(day["due_reviews"] for day in forecast) > 0
+
+
+def test_simulate_only_stores_cards_that_were_served() -> None:
+    forecast = simulate(users=20, days=30, cards=50, daily_limit=5, seed=0)
+
+    # a row per card ever introduced, not users x catalog
+    assert forecast[-1]["srs_rows"] == sum(day["new_cards"] for day in forecast)
+    assert forecast[-1]["srs_rows"] < 20 * 50
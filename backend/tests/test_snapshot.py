@@ -0,0 +1,90 @@
+import json
+import os
+from pathlib import Path
+from typing import Callable
+
+from fushigi_backend.data.load import load_defaults
+from fushigi_backend.data.models import GrammarInDB
+from fushigi_backend.data.snapshot import GrammarSnapshot, build_snapshot, open_snapshot
+
+
+def write_catalog(path: Path, make_grammar: Callable[..., GrammarInDB], n: int) -> Path:
+    grammar = [make_grammar(i, usage=f"〜{i}", tags=[f"tag-{i % 3}"]).model_dump(exclude={"id"}) for i in range(n)]
+    path.write_text(json.dumps({"grammar": grammar}, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def test_snapshot_matches_json(tmp_path: Path, make_grammar: Callable[..., GrammarInDB]) -> None:
+    # Setup
+    source = write_catalog(tmp_path / "grammar.json", make_grammar, 25)
+    expected = load_defaults(source)
+    build_snapshot(source)
+
+    # Act
+    result = load_defaults(source)
+
+    # Assert
+    assert isinstance(result, GrammarSnapshot)
+    assert len(result) == 25
+    assert list(result) == list(expected)
+    assert result[-1] == expected[-1]
+    assert result[3:6] == list(expected[3:6])
+
+
+def test_snapshot_decodes_lazily(tmp_path: Path, make_grammar: Callable[..., GrammarInDB]) -> None:
+    # Setup
+    source = write_catalog(tmp_path / "grammar.json", make_grammar, 10)
+    snapshot = GrammarSnapshot(build_snapshot(source))
+
+    # Act
+    first = snapshot[7]
+
+    # Assert
+    assert first.usage == "〜7"
+    assert snapshot[7] is first
+    assert sum(g is not None for g in snapshot._decoded) == 1
+
+
+def test_stale_snapshot_is_ignored(tmp_path: Path, make_grammar: Callable[..., GrammarInDB]) -> None:
+    # Setup
+    source = write_catalog(tmp_path / "grammar.json", make_grammar, 5)
+    build_snapshot(source)
+    write_catalog(source, make_grammar, 6)
+
+    # Act
+    result = load_defaults(source)
+
+    # Assert
+    assert open_snapshot(source) is None
+    assert isinstance(result, list)
+    assert len(result) == 6
+
+
+def test_touched_but_unchanged_source_keeps_snapshot(
+    tmp_path: Path, make_grammar: Callable[..., GrammarInDB]
+) -> None:
+    # Setup
+    source = write_catalog(tmp_path / "grammar.json", make_grammar, 5)
+    build_snapshot(source)
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    # Act
+    result = open_snapshot(source)
+
+    # Assert
+    assert result is not None
+    assert len(result) == 5
+
+
+def test_corrupt_snapshot_falls_back_to_json(tmp_path: Path, make_grammar: Callable[..., GrammarInDB]) -> None:
+    # Setup
+    source = write_catalog(tmp_path / "grammar.json", make_grammar, 3)
+    (tmp_path / "grammar.snapshot").write_bytes(b"not a snapshot at all")
+
+    # Act
+    result = load_defaults(source)
+
+    # Assert
+    assert isinstance(result, list)
+    assert len(result) == 3